@@ -0,0 +1,188 @@
+"""
+Este archivo permite medir el tiempo de cada etapa de ModuloProducciones.correr_programa y de
+AnalizadorSuministros.correr_programa, con entradas sintéticas de distintos tamaños (ver
+generador_sintetico.py).
+
+Uso: python benchmark.py [cantidad_movimientos ...]
+Por defecto mide con 10.000, 100.000 y 1.000.000 de movimientos, y guarda los resultados en
+resultados_benchmark.csv.
+"""
+
+import io
+import os
+import sys
+import time
+import shutil
+import tempfile
+import contextlib
+
+import pandas as pd
+
+from generador_sintetico import generar_entradas
+from modulo_producciones import ModuloProducciones
+from modulo_suministros import AnalizadorSuministros
+
+ESCALAS = [10_000, 100_000, 1_000_000]
+MES_A_MEDIR = "DICIEMBRE"
+RUTA_RESULTADOS = "resultados_benchmark.csv"
+
+
+class Benchmark:
+    """
+    Esta clase permite medir las etapas de los programas para una cantidad de movimientos.
+    """
+
+    def __init__(self, cantidad_movimientos, carpeta_base):
+        self.cantidad_movimientos = cantidad_movimientos
+        self.carpeta = os.path.join(carpeta_base, f"movimientos_{cantidad_movimientos}")
+        self.carpeta_input = os.path.join(self.carpeta, "input")
+        self.resultados = []
+
+    def medir(self, programa, etapa, funcion, *args, **kwargs):
+        """
+        Esta función permite correr una etapa y guardar su tiempo. Lo que imprima la etapa en
+        consola NO se muestra.
+        """
+        inicio = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            resultado = funcion(*args, **kwargs)
+
+        self.resultados.append(
+            {
+                "movimientos": self.cantidad_movimientos,
+                "programa": programa,
+                "etapa": etapa,
+                "segundos": time.perf_counter() - inicio,
+            }
+        )
+
+        return resultado
+
+    def correr(self):
+        """
+        Esta función permite generar las entradas y medir todas las etapas. Retorna los
+        resultados como DataFrame.
+        """
+        ruta_resoluciones = self.medir(
+            "generador",
+            "generar_entradas",
+            generar_entradas,
+            self.carpeta_input,
+            self.cantidad_movimientos,
+        )
+
+        producciones_del_mes = self.medir_producciones()
+        self.medir_suministros(producciones_del_mes, ruta_resoluciones)
+
+        return pd.DataFrame(self.resultados)
+
+    def medir_producciones(self):
+        """
+        Esta función permite medir las etapas de ModuloProducciones.correr_programa.
+        """
+        modulo = ModuloProducciones(
+            [MES_A_MEDIR],
+            carpeta_input=self.carpeta_input,
+            carpeta_salida=self.carpeta,
+            medir_memoria=False,
+        )
+
+        df_hosp, df_prod = self.medir("producciones", "cargar_archivo", modulo.cargar_archivo)
+        producciones_por_unidad = self.medir(
+            "producciones",
+            "obtener_desglose_por_unidad",
+            modulo.obtener_desglose_por_unidad,
+            df_prod,
+        )
+        producciones_por_mes = self.medir(
+            "producciones", "separar_por_mes", modulo.separar_por_mes, producciones_por_unidad
+        )
+        self.medir(
+            "producciones",
+            "guardar_archivos",
+            modulo.guardar_archivos,
+            producciones_por_mes[MES_A_MEDIR],
+            df_hosp[["SERVICIOS FINALES", MES_A_MEDIR]],
+            modulo.obtener_nombre_archivo_salida(MES_A_MEDIR),
+        )
+
+        return producciones_por_mes[MES_A_MEDIR]
+
+    def medir_suministros(self, producciones_del_mes, ruta_resoluciones):
+        """
+        Esta función permite medir las etapas de AnalizadorSuministros.correr_programa. La
+        lectura de la cartola se mide dos veces: sin caché y con caché.
+        """
+        analizador = AnalizadorSuministros(
+            carpeta_input=self.carpeta_input,
+            carpeta_salida=self.carpeta,
+            archivo_resoluciones=ruta_resoluciones,
+            medir_memoria=False,
+        )
+
+        self.medir(
+            "suministros",
+            "leer_asociar_y_filtrar_cartola (sin caché)",
+            analizador.leer_asociar_y_filtrar_cartola,
+        )
+        df_cartola = self.medir(
+            "suministros",
+            "leer_asociar_y_filtrar_cartola (con caché)",
+            analizador.leer_asociar_y_filtrar_cartola,
+        )
+        df_completa = self.medir(
+            "suministros", "rellenar_destinos", analizador.rellenar_destinos, df_cartola
+        )
+        formato_relleno = self.medir(
+            "suministros",
+            "convertir_a_tabla_din_y_rellenar_formato",
+            analizador.convertir_a_tabla_din_y_rellenar_formato,
+            df_completa,
+        )
+        formato_desglosado = self.medir(
+            "suministros",
+            "desglosar_por_produccion",
+            analizador.desglosar_por_produccion,
+            formato_relleno.copy(),
+            producciones_del_mes,
+        )
+        self.medir(
+            "suministros",
+            "guardar_archivos",
+            analizador.guardar_archivos,
+            formato_desglosado=formato_desglosado,
+            formato_relleno=formato_relleno,
+            df_completa=df_completa,
+            no_traducidos=analizador.reporte_no_traducidos,
+        )
+
+
+def correr_benchmarks(escalas=ESCALAS):
+    """
+    Esta función permite correr el benchmark para cada escala, en una carpeta temporal que se
+    borra al final. Retorna todos los resultados como DataFrame.
+    """
+    carpeta_base = tempfile.mkdtemp(prefix="benchmark_sigcom_")
+    try:
+        resultados = [
+            Benchmark(cantidad_movimientos, carpeta_base).correr()
+            for cantidad_movimientos in escalas
+        ]
+
+    finally:
+        shutil.rmtree(carpeta_base, ignore_errors=True)
+
+    return pd.concat(resultados, ignore_index=True)
+
+
+if __name__ == "__main__":
+    escalas = [int(argumento) for argumento in sys.argv[1:]] or ESCALAS
+    df_resultados = correr_benchmarks(escalas)
+    df_resultados.to_csv(RUTA_RESULTADOS, index=False)
+
+    etapas = pd.MultiIndex.from_frame(df_resultados[["programa", "etapa"]].drop_duplicates())
+    tabla_tiempos = df_resultados.pivot_table(
+        index=["programa", "etapa"], columns="movimientos", values="segundos"
+    ).reindex(etapas)
+
+    print(tabla_tiempos.to_markdown())
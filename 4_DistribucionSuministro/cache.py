@@ -0,0 +1,60 @@
+"""
+Este archivo contiene las funciones de apoyo para los cachés en disco utilizados por los
+archivos "modulo_suministros.py" y "modulo_producciones.py".
+"""
+
+import hashlib
+import os
+
+import pandas as pd
+
+TAMANO_BLOQUE_LECTURA = 1 << 20
+
+
+def calcular_huella(*rutas):
+    """
+    Esta función permite obtener la huella (hash SHA-256) del contenido de uno o más archivos.
+    Si cambia cualquiera de los archivos, entonces cambia la huella, y el caché asociado
+    queda obsoleto.
+    """
+    huella = hashlib.sha256()
+    for ruta in rutas:
+        huella.update(str(os.path.getsize(ruta)).encode())
+        with open(ruta, "rb") as archivo:
+            for bloque in iter(lambda: archivo.read(TAMANO_BLOQUE_LECTURA), b""):
+                huella.update(bloque)
+
+    return huella.hexdigest()
+
+
+def leer_cache(ruta_cache, huella):
+    """
+    Esta función permite leer un caché en Parquet. Si el caché NO existe, o si fue generado
+    con otra huella (los archivos de entrada cambiaron), entonces retorna None.
+    """
+    ruta_huella = f"{ruta_cache}.huella"
+    if not (os.path.exists(ruta_cache) and os.path.exists(ruta_huella)):
+        return None
+
+    with open(ruta_huella, encoding="utf-8") as archivo:
+        huella_guardada = archivo.read().strip()
+
+    if huella_guardada != huella:
+        return None
+
+    return pd.read_parquet(ruta_cache)
+
+
+def guardar_cache(df, ruta_cache, huella):
+    """
+    Esta función permite guardar un DataFrame como caché en Parquet, junto con la huella de
+    los archivos que lo generaron. La huella se escribe al final, por lo que un caché a medio
+    escribir nunca se considera vigente.
+    """
+    ruta_huella = f"{ruta_cache}.huella"
+    if os.path.exists(ruta_huella):
+        os.remove(ruta_huella)
+
+    df.to_parquet(ruta_cache)
+    with open(ruta_huella, "w", encoding="utf-8") as archivo:
+        archivo.write(huella)
@@ -3,6 +3,21 @@ Este archivo contiene las constantes utilizadas por los archivos "modulo_suminis
 "modulo_producciones.py"
 """
 
+MESES = [
+    "ENERO",
+    "FEBRERO",
+    "MARZO",
+    "ABRIL",
+    "MAYO",
+    "JUNIO",
+    "JULIO",
+    "AGOSTO",
+    "SEPTIEMBRE",
+    "OCTUBRE",
+    "NOVIEMBRE",
+    "DICIEMBRE",
+]
+
 DESTINO_INT_CC_SIGCOM = {
     "ANATOMIA PATOLOGICA": "544-ANATOMÍA PATOLÓGICA",
     "APNEA": "15010-CONSULTA OTROS PROFESIONALES",
@@ -86,6 +101,33 @@ DESTINO_INT_CC_SIGCOM = {
     "SECRE. AUDITORIA": "670-ADMINISTRACIÓN",
 }
 
+# Columnas que se leen de "Cartola valorizada.csv", con sus tipos de dato. Son las columnas
+# que se usan para filtrar, traducir y sumar, y deben estar en la cartola.
+COLUMNAS_CARTOLA = {
+    "Codigo Articulo": "object",
+    "Nombre": "object",
+    "Movimiento": "category",
+    "Destino": "category",
+    "Motivo": "category",
+    "Neto Total": "float64",
+}
+
+# Columnas de la cartola que NO se usan en los cálculos, pero que se conservan en la cartola
+# completa (y en la trazabilidad) para revisar cada movimiento. Si NO están, se omiten. El
+# resto de las columnas de la cartola NO se leen.
+COLUMNAS_CARTOLA_ADICIONALES = {
+    "Fecha": "object",
+    "Bodega": "category",
+    "Cantidad": "float64",
+}
+
+# Cantidad de filas de la cartola que se leen y filtran a la vez.
+TAMANO_CHUNK_CARTOLA = 100_000
+
+# Columnas que identifican un movimiento de la cartola en el modo incremental. Si varios
+# movimientos tienen la misma llave, entonces se distinguen por su orden en la cartola.
+COLUMNAS_LLAVE_MOVIMIENTO = ["Fecha", "Codigo Articulo", "Destino", "Movimiento", "Motivo"]
+
 TRADUCTOR_ITEM_SIGFE_ITEM_SIGCOM_JSON = {
     "Equipos menores": "8-EQUIPOS MENORES",
     "Insumos, repuestos y accesorios computacionales": "27-MATERIALES INFORMATICOS",
@@ -202,6 +244,45 @@ DICCIONARIO_PRODUCIONES_SIGCOM = {
     "LABORATORIO CLINICO": "518-LABORATORIO CLÍNICO",
 }
 
+# Reglas para clasificar cada fila de "SERVICIOS FINALES" de la planilla de Producción en su
+# producción SIGCOM. Una fila pertenece a la producción si su nombre es igual a "igual", o si
+# contiene el texto "contiene" y NO contiene el texto "no_contiene".
+REGLAS_PRODUCCIONES_SIGCOM = {
+    "41107-TOMOGRAFÍA": {"contiene": "TOMOGRAFIA"},
+    "41108-IMAGENOLOGÍA": {"contiene": "IMAGENOLOGIA"},
+    "464-QUIRÓFANOS CARDIOVASCULAR": {"igual": "QUIROFANOS CARDIOVASCULAR"},
+    "484-QUIRÓFANOS TORACICA": {"igual": "QUIROFANOS CIRUGIA TORACICA"},
+    "51001-BANCO DE SANGRE": {"igual": "BANCO DE SANGRE"},
+    "518-LABORATORIO CLÍNICO": {"igual": "LABORATORIO CLINICO"},
+    "90-HOSPITALIZACIÓN QUIRÚRGICA": {"contiene": "HOSPITALIZACION QUIRURGICA"},
+    "66-HOSPITALIZACIÓN MEDICINA INTERNA": {"contiene": "HOSPITALIZACION MEDICINA INTERNA"},
+    "270-PROCEDIMIENTOS TAVI": {"contiene": "TAVI"},
+    "264-PROCEDIMIENTOS EBUS": {"igual": "PROCEDIMIENTO EBUS"},
+    "15022-PROCEDIMIENTO DE NEUMOLOGÍA": {
+        "igual": "PROCEDIMIENTO DE NEUMOLOGIA (apnea del sueño)"
+    },
+    "253-PROCEDIMIENTOS DE HEMODINAMIA": {"igual": "PROCEDIMIENTOS DE HEMODINAMIA"},
+    "265-PROCEDIMIENTOS ECMO": {"contiene": "PROCEDIMIENTO ECMO"},
+    "15105-CONSULTA CARDIOLOGÍA": {"igual": "CONSULTA CARDIOLOGIA"},
+    "15220-CONSULTA CIRUGIA CARDIACA": {"igual": "CONSULTA CIRUGIA CARDIACA"},
+    "15201-CONSULTA CIRUGÍA GENERAL": {"igual": "CONSULTA CIRUGIA GENERAL (cirugía torax)"},
+    "15026-PROCEDIMIENTOS DE CARDIOLOGÍA": {"igual": "PROCEDIMIENTO DE CARDIOLOGIA"},
+    "195-UNIDAD DE TRATAMIENTO INTENSIVO ADULTO": {
+        "contiene": "UNIDAD DE TRATAMIENTO INTENSIVO",
+        "no_contiene": "+",
+    },
+    "166-UNIDAD DE CUIDADOS INTENSIVOS": {
+        "contiene": "UNIDAD DE CUIDADOS INTENSIVOS",
+        "no_contiene": "+",
+    },
+    "15123-PROGRAMA MANEJO DEL DOLOR": {"igual": "CONSULTA MANEJO DEL DOLOR"},
+    "15107-CONSULTA ONCOLOGÍA": {"igual": "CONSULTA ONCOLOGIA"},
+    "15038-PROCEDIMIENTO ONCOLOGÍA": {"igual": "PROCEDIMIENTO ONCOLOGIA"},
+    "15008-CONSULTA NUTRICIÓN": {"igual": "CONSULTA NUTRICION"},
+    "15010-CONSULTA OTROS PROFESIONALES": {"igual": "CONSULTA OTROS PROFESIONALES"},
+    "15111-CONSULTA NEUMOLOGÍA": {"igual": "CONSULTA NEUMOLOGIA (broncopulmonar)"},
+}
+
 VALOR_TAVI_SUMINISTROS = 22784797
 VALOR_EBUS_SUMINISTROS = 4408972
 VALOR_ECMO_SUMINISTROS = 3092453
@@ -241,3 +322,11 @@ WINSIG_SERVICIO_FARMACIA_CC_SIGCOM = {
     "CONSULTA ONCOLOGIA": "15107-CONSULTA ONCOLOGÍA",
     "CONSULTA OTROS PROFESIONALES": "15010-CONSULTA OTROS PROFESIONALES",
 }
+
+# Planilla de consumo de Farmacia (WINSIG). Cada fila es un servicio WINSIG con su consumo
+# valorizado del mes. Los servicios se traducen a centros de costo SIGCOM con
+# WINSIG_SERVICIO_FARMACIA_CC_SIGCOM, y el consumo se suma al ítem ITEM_SIGCOM_FARMACIA.
+FILA_ENCABEZADO_FARMACIA = 0
+COLUMNA_SERVICIO_FARMACIA = "Servicio"
+COLUMNA_MONTO_FARMACIA = "Total"
+ITEM_SIGCOM_FARMACIA = "30-MEDICAMENTOS"
@@ -0,0 +1,199 @@
+"""
+Este archivo contiene el registro central de las dimensiones del SIGCOM: los centros de costo
+(Ej: "66-HOSPITALIZACIÓN MEDICINA INTERNA") y los ítems SIGCOM (Ej: "18-MATERIAL MEDICO
+QUIRURGICO").
+
+Cada etiqueta de una dimensión tiene un código entero. Los programas trabajan con estos códigos
+(como categóricos de pandas o arreglos de NumPy), y las etiquetas de texto se ponen solamente al
+entregar los resultados.
+
+Los códigos quedan registrados en un archivo por dimensión (carpeta registro_dimensiones, una
+etiqueta por línea, en el orden de su código). El registro solamente crece: las etiquetas
+nuevas se agregan al final con los códigos siguientes, por lo que agregar un centro de costo o
+un ítem NO cambia el código de las etiquetas anteriores (Ej: en el estado guardado del modo
+incremental). Por lo mismo, ordenar por código NO es lo mismo que ordenar por texto: los
+resultados se ordenan por etiqueta al entregarlos.
+
+Los registros de la carpeta (Ej: centros_de_costo.txt) están en el control de versiones, y los
+programas NO los modifican. Las etiquetas que aparecen al correr y que NO están en ellos se
+agregan a un registro local (Ej: centros_de_costo.local.txt, fuera del control de versiones),
+que se lee a continuación del registro versionado. Para que una etiqueta nueva quede igual para
+todos, se debe agregar al final del registro versionado.
+"""
+
+import os
+import functools
+
+import numpy as np
+import pandas as pd
+
+from maestro_articulos import obtener_maestro_articulos
+from constantes import (
+    DESTINO_INT_CC_SIGCOM,
+    DICCIONARIO_PRODUCIONES_SIGCOM,
+    DICCIONARIO_UNIDADES_A_DESGLOSAR,
+    TRADUCTOR_ITEM_SIGFE_ITEM_SIGCOM_JSON,
+    WINSIG_SERVICIO_FARMACIA_CC_SIGCOM,
+)
+
+CARPETA_REGISTRO_DIMENSIONES = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), "registro_dimensiones"
+)
+NOMBRE_REGISTRO_CENTROS_DE_COSTO = "centros_de_costo.txt"
+NOMBRE_REGISTRO_ITEMS_SIGCOM = "items_sigcom.txt"
+SUFIJO_REGISTRO_LOCAL = ".local"
+
+
+def obtener_ruta_registro_local(ruta_registro):
+    """
+    Esta función permite obtener la ruta del registro local de una dimensión (Ej:
+    centros_de_costo.local.txt para centros_de_costo.txt).
+    """
+    base, extension = os.path.splitext(ruta_registro)
+    return f"{base}{SUFIJO_REGISTRO_LOCAL}{extension}"
+
+
+def leer_registro(ruta_registro):
+    """
+    Esta función permite leer las etiquetas de un archivo de registro (una por línea). Si el
+    archivo NO existe, entonces retorna una lista vacía.
+    """
+    if not os.path.exists(ruta_registro):
+        return []
+
+    with open(ruta_registro, encoding="utf-8") as file:
+        return [linea.rstrip("\n") for linea in file if linea.strip()]
+
+
+def registrar_etiquetas(ruta_registro, etiquetas):
+    """
+    Esta función permite obtener las etiquetas de una dimensión en el orden de sus códigos:
+    primero las del registro versionado, y luego las del registro local. Las etiquetas ya
+    registradas mantienen su código, y las nuevas (que sean texto) se agregan al final del
+    registro local, ordenadas, con los códigos siguientes.
+
+    El registro local solamente se abre para agregar líneas. Si dos procesos agregan las
+    mismas etiquetas a la vez, las líneas repetidas se ignoran al leer (vale la primera).
+    """
+    ruta_registro_local = obtener_ruta_registro_local(ruta_registro)
+    registradas = list(
+        dict.fromkeys(leer_registro(ruta_registro) + leer_registro(ruta_registro_local))
+    )
+
+    nuevas = sorted(
+        {etiqueta for etiqueta in etiquetas if isinstance(etiqueta, str)} - set(registradas)
+    )
+    if nuevas:
+        os.makedirs(os.path.dirname(ruta_registro_local), exist_ok=True)
+        with open(ruta_registro_local, "a", encoding="utf-8") as file:
+            file.writelines(f"{etiqueta}\n" for etiqueta in nuevas)
+
+    return registradas + nuevas
+
+
+class Dimension:
+    """
+    Esta clase representa una dimensión del SIGCOM, con un código entero por cada etiqueta.
+    Recibe las etiquetas en el orden de sus códigos (ver registrar_etiquetas).
+    """
+
+    def __init__(self, nombre, etiquetas):
+        self.nombre = nombre
+        self.etiquetas = pd.Index(list(etiquetas), dtype=object)
+        self.tipo = pd.CategoricalDtype(self.etiquetas)
+
+    def __len__(self):
+        return len(self.etiquetas)
+
+    def codificar(self, etiquetas):
+        """
+        Esta función permite obtener el código de cada etiqueta. Las etiquetas vacías, o que NO
+        están en la dimensión, quedan con el código -1.
+        """
+        return self.etiquetas.get_indexer(pd.Index(etiquetas, dtype=object)).astype(np.int32)
+
+    def categorizar(self, codigos):
+        """
+        Esta función permite convertir un arreglo de códigos en un categórico de la dimensión.
+        Los códigos -1 quedan como NaN.
+        """
+        return pd.Categorical.from_codes(codigos, dtype=self.tipo)
+
+    def etiquetar(self, indice):
+        """
+        Esta función permite volver a poner las etiquetas de texto en un índice categórico (Ej:
+        el índice de una tabla dinámica), para entregarlo como resultado.
+        """
+        return pd.Index(np.asarray(indice, dtype=object), dtype=object, name=indice.name)
+
+
+def ordenar_por_etiqueta(columna):
+    """
+    Esta función permite ordenar por texto las columnas categóricas de las dimensiones (se
+    usa como key de sort_values). Las demás columnas se ordenan igual que siempre.
+    """
+    if isinstance(columna.dtype, pd.CategoricalDtype):
+        return columna.astype(object)
+
+    return columna
+
+
+@functools.lru_cache(maxsize=None)
+def obtener_centros_de_costo():
+    """
+    Esta función entrega la dimensión de centros de costo SIGCOM. Se arma con todos los
+    centros de costo de constantes.py: los destinos INT, las producciones, los servicios de
+    Farmacia, y las unidades a desglosar y sus subunidades.
+    """
+    centros_de_costo = (
+        list(DESTINO_INT_CC_SIGCOM.values())
+        + list(DICCIONARIO_PRODUCIONES_SIGCOM.values())
+        + list(WINSIG_SERVICIO_FARMACIA_CC_SIGCOM.values())
+        + list(DICCIONARIO_UNIDADES_A_DESGLOSAR)
+        + [cc for subunidades in DICCIONARIO_UNIDADES_A_DESGLOSAR.values() for cc in subunidades]
+    )
+
+    return Dimension(
+        "Centro de Costo",
+        registrar_etiquetas(
+            os.path.join(CARPETA_REGISTRO_DIMENSIONES, NOMBRE_REGISTRO_CENTROS_DE_COSTO),
+            centros_de_costo,
+        ),
+    )
+
+
+@functools.lru_cache(maxsize=None)
+def obtener_items_sigcom():
+    """
+    Esta función entrega la dimensión de ítems SIGCOM. Se arma con los ítems del maestro de
+    artículos y los del traductor de ítems SIGFE de constantes.py.
+    """
+    maestro_articulos = obtener_maestro_articulos()
+    items_sigcom = list(maestro_articulos.categorias["Total_SIGCOM"]) + list(
+        TRADUCTOR_ITEM_SIGFE_ITEM_SIGCOM_JSON.values()
+    )
+
+    return Dimension(
+        "Item SIGCOM",
+        registrar_etiquetas(
+            os.path.join(CARPETA_REGISTRO_DIMENSIONES, NOMBRE_REGISTRO_ITEMS_SIGCOM),
+            items_sigcom,
+        ),
+    )
+
+
+def obtener_rutas_dimensiones():
+    """
+    Esta función entrega los archivos de registro de las dimensiones que existen (versionados
+    y locales, después de registrar las etiquetas actuales). Sirve para calcular la huella de
+    los cachés y del estado del modo incremental.
+    """
+    obtener_centros_de_costo()
+    obtener_items_sigcom()
+
+    rutas = []
+    for nombre_registro in [NOMBRE_REGISTRO_CENTROS_DE_COSTO, NOMBRE_REGISTRO_ITEMS_SIGCOM]:
+        ruta_registro = os.path.join(CARPETA_REGISTRO_DIMENSIONES, nombre_registro)
+        rutas += [ruta_registro, obtener_ruta_registro_local(ruta_registro)]
+
+    return [ruta for ruta in rutas if os.path.exists(ruta)]
@@ -0,0 +1,313 @@
+"""
+Este archivo permite evaluar escenarios de los parámetros de desglose (Ej: ¿cómo cambia el
+formato 4 si el valor de suministros del TAVI fuera otro?), sin editar constantes.py ni volver
+a correr los programas.
+
+Las entradas del mes (producciones y formato relleno) se leen una sola vez. Luego, todos los
+escenarios se evalúan juntos: los porcentajes de producción se calculan con una columna por
+escenario (ver ModuloProducciones.obtener_porcentajes), y los desgloses se aplican a todos los
+escenarios a la vez (ver matriz_asignacion.desglosar_escenarios).
+
+Además de la comparación del formato 4, se entregan los porcentajes de producción de cada
+escenario para todos los desgloses de constantes.py, incluyendo los que NO se aplican al formato
+4 (Ej: TAVI_ECMO_EBUS) o que NO usan los parámetros (Ej: cardiología, que es proporcional a la
+producción). Si los parámetros de un escenario NO cambian ninguno de los desgloses aplicados,
+entonces se avisa con un warning, ya que su formato 4 es igual al del escenario BASE.
+
+Uso: python escenarios.py MES escenarios.csv [archivo_resoluciones]
+
+El archivo de escenarios tiene una fila por escenario, y una columna por cada parámetro de
+PARAMETROS_DESGLOSE que se quiera cambiar (los parámetros que NO estén quedan con el valor de
+constantes.py). Si tiene la columna "Escenario", se usa como nombre de cada escenario.
+"""
+
+import sys
+import warnings
+import itertools
+
+import numpy as np
+import pandas as pd
+
+from escritura import escribir_detalle, escribir_libro
+from matriz_asignacion import desglosar_escenarios
+from modulo_producciones import PARAMETROS_DESGLOSE, ModuloProducciones
+from modulo_suministros import DICCIONARIO_UNIDADES_A_DESGLOSAR, AnalizadorSuministros
+
+ESCENARIO_BASE = "BASE"
+NOMBRE_SALIDA_ESCENARIOS = "output_escenarios.xlsx"
+NOMBRE_COMPARACION_ESCENARIOS = "output_escenarios_comparacion"
+
+
+def generar_grilla(**valores_parametros):
+    """
+    Esta función permite generar todas las combinaciones de los valores entregados para cada
+    parámetro (Ej: generar_grilla(VALOR_TAVI_SUMINISTROS=[2e7, 2.5e7], ...)), como un
+    DataFrame con un escenario por fila.
+    """
+    combinaciones = itertools.product(*valores_parametros.values())
+    return pd.DataFrame(list(combinaciones), columns=list(valores_parametros))
+
+
+def completar_escenarios(escenarios):
+    """
+    Esta función permite dejar los escenarios con todos los parámetros de
+    PARAMETROS_DESGLOSE (los que faltan quedan con el valor de constantes.py), y con el nombre
+    de cada escenario como índice. Se agrega al inicio el escenario BASE, con todos los
+    parámetros de constantes.py, que sirve para comparar.
+    """
+    parametros_desconocidos = set(escenarios.columns) - set(PARAMETROS_DESGLOSE) - {"Escenario"}
+    if parametros_desconocidos:
+        raise ValueError(
+            f"Los parámetros {sorted(parametros_desconocidos)} NO son parámetros de desglose. "
+            f"Deben ser alguno de: {', '.join(PARAMETROS_DESGLOSE)}"
+        )
+
+    escenarios = escenarios.copy()
+    if "Escenario" in escenarios.columns:
+        escenarios = escenarios.set_index("Escenario")
+    else:
+        escenarios.index = [f"ESCENARIO {i + 1}" for i in range(len(escenarios))]
+
+    escenario_base = pd.DataFrame(PARAMETROS_DESGLOSE, index=[ESCENARIO_BASE])
+    escenarios = pd.concat([escenario_base, escenarios.reindex(columns=list(PARAMETROS_DESGLOSE))])
+    escenarios.index = escenarios.index.astype(str).rename("Escenario")
+
+    return escenarios.fillna(escenario_base.iloc[0]).astype(float)
+
+
+class EvaluadorEscenarios:
+    """
+    Esta clase permite evaluar muchos escenarios de parámetros de desglose para un mes,
+    reutilizando las entradas ya leídas.
+    """
+
+    def __init__(self, mes, carpeta_input="input", archivo_resoluciones=None, verbose=False):
+        self.mes = mes
+        self.carpeta_input = carpeta_input
+        self.analizador = AnalizadorSuministros(
+            carpeta_input=carpeta_input,
+            archivo_resoluciones=archivo_resoluciones,
+            verbose=verbose,
+            medir_memoria=False,
+        )
+        self.verbose = verbose
+        self.df_produccion = None
+        self.formato_relleno = None
+
+    def cargar_entradas(self):
+        """
+        Esta función permite leer las producciones del mes y rellenar el formato 4 con la
+        cartola y el consumo de Farmacia. Se leen una sola vez, aunque se evalúen varios grupos
+        de escenarios.
+        """
+        if self.formato_relleno is not None:
+            return
+
+        modulo_producciones = ModuloProducciones([self.mes], carpeta_input=self.carpeta_input)
+        _, self.df_produccion = modulo_producciones.cargar_archivo()
+
+        df_cartola = self.analizador.leer_asociar_y_filtrar_cartola()
+        df_completa = self.analizador.rellenar_destinos(df_cartola)
+        self.formato_relleno = self.analizador.convertir_a_tabla_din_y_rellenar_formato(
+            df_completa, self.analizador.leer_consumo_farmacia()
+        )
+
+    def obtener_porcentajes_escenarios(self, escenarios):
+        """
+        Esta función permite obtener los porcentajes de cada desglose de producción para todos
+        los escenarios a la vez. La producción del mes se repite una vez por escenario (una
+        columna por escenario), y cada parámetro se entrega como una Series con un valor por
+        escenario.
+
+        Retorna un diccionario ordenado del tipo {unidad_a_desglosar: DataFrame de porcentajes
+        (servicios finales x escenarios)}, con todos los desgloses de constantes.py.
+        """
+        nombres_escenarios = list(escenarios.index)
+        producciones = pd.DataFrame(
+            np.repeat(self.df_produccion[[self.mes]].to_numpy(), len(nombres_escenarios), axis=1),
+            index=self.df_produccion.index,
+            columns=nombres_escenarios,
+        )
+        df_produccion = pd.concat([self.df_produccion[["SERVICIOS FINALES"]], producciones], axis=1)
+
+        modulo_producciones = ModuloProducciones(
+            nombres_escenarios,
+            carpeta_input=self.carpeta_input,
+            medir_memoria=False,
+            parametros={parametro: escenarios[parametro] for parametro in escenarios.columns},
+        )
+        producciones_por_unidad = modulo_producciones.obtener_desglose_por_unidad(df_produccion)
+
+        return {
+            unidad_a_desglosar: porcentajes.astype(float).set_axis(
+                pd.Index(df_unidad["SERVICIOS FINALES"], name="SERVICIOS FINALES")
+            )
+            for unidad_a_desglosar, (df_unidad, porcentajes) in producciones_por_unidad.items()
+        }
+
+    def obtener_desgloses_escenarios(self, porcentajes_escenarios):
+        """
+        Esta función permite obtener los porcentajes de los desgloses que se aplican al
+        formato 4, sumados por centro de costo SIGCOM igual que en el programa de suministros
+        (ver AnalizadorSuministros.sumar_porcentajes_por_centro_de_costo).
+
+        Retorna un diccionario ordenado del tipo {cc_a_desglosar: DataFrame de porcentajes
+        (centros de costo x escenarios)}.
+        """
+        desgloses_escenarios = {}
+        for cc_a_desglosar in DICCIONARIO_UNIDADES_A_DESGLOSAR:
+            porcentajes = porcentajes_escenarios[cc_a_desglosar]
+            desgloses_escenarios[cc_a_desglosar] = (
+                self.analizador.sumar_porcentajes_por_centro_de_costo(
+                    porcentajes.index.to_series(index=porcentajes.index), porcentajes
+                )
+            )
+
+        return desgloses_escenarios
+
+    def avisar_escenarios_sin_efecto(self, escenarios, desgloses_escenarios):
+        """
+        Esta función permite avisar (con un warning) los escenarios cuyos parámetros son
+        distintos a los del escenario BASE, pero que NO cambian ninguno de los desgloses que se
+        aplican al formato 4. Retorna la mask de esos escenarios.
+        """
+        parametros_distintos = (escenarios != escenarios.loc[ESCENARIO_BASE]).any(axis=1)
+
+        cambia_desgloses = pd.Series(False, index=escenarios.index)
+        for porcentajes in desgloses_escenarios.values():
+            iguales_a_base = np.isclose(
+                porcentajes.to_numpy(),
+                porcentajes[[ESCENARIO_BASE]].to_numpy(),
+                equal_nan=True,
+            )
+            cambia_desgloses |= ~iguales_a_base.all(axis=0)
+
+        sin_efecto = parametros_distintos & ~cambia_desgloses
+        if sin_efecto.any():
+            warnings.warn(
+                f"Los parámetros de los escenarios {list(escenarios.index[sin_efecto])} NO "
+                "cambian ninguno de los desgloses que se aplican al formato 4 "
+                f"({', '.join(DICCIONARIO_UNIDADES_A_DESGLOSAR)}), por lo que su formato 4 es "
+                "igual al del escenario BASE. Revisa los cambios en los porcentajes de "
+                "producción."
+            )
+
+        return sin_efecto
+
+    def evaluar(self, escenarios):
+        """
+        Esta función permite evaluar todos los escenarios (un DataFrame con un escenario por
+        fila, ver completar_escenarios), y compararlos con el escenario BASE.
+
+        Retorna:
+
+        - Los escenarios completos.
+        - Un DataFrame ordenado (una fila por escenario, centro de costo e ítem SIGCOM) con el
+        monto del formato 4 de cada escenario, el monto del escenario BASE y la diferencia. Las
+        celdas vacías en todos los escenarios NO se incluyen.
+        - Un DataFrame ordenado (una fila por escenario, desglose y servicio final) con los
+        porcentajes de producción de cada escenario, los del escenario BASE, la diferencia y si
+        el desglose se aplica al formato 4.
+        """
+        self.cargar_entradas()
+        escenarios = completar_escenarios(escenarios)
+
+        porcentajes_escenarios = self.obtener_porcentajes_escenarios(escenarios)
+        desgloses_escenarios = self.obtener_desgloses_escenarios(porcentajes_escenarios)
+        self.avisar_escenarios_sin_efecto(escenarios, desgloses_escenarios)
+
+        desglosados = desglosar_escenarios(self.formato_relleno, desgloses_escenarios)
+        centros_de_costo = desglosados.loc[ESCENARIO_BASE].index
+        montos = desglosados.to_numpy().reshape(
+            len(escenarios), len(centros_de_costo), len(desglosados.columns)
+        )
+
+        comparacion = pd.DataFrame(
+            {
+                "Monto": montos.ravel(),
+                "Monto Base": np.tile(montos[0].ravel(), len(escenarios)),
+            },
+            index=pd.MultiIndex.from_product(
+                [escenarios.index, centros_de_costo, desglosados.columns],
+                names=["Escenario", "Centro de Costo", "Item SIGCOM"],
+            ),
+        )
+        comparacion["Diferencia"] = comparacion["Monto"].fillna(0) - comparacion[
+            "Monto Base"
+        ].fillna(0)
+
+        con_monto = ~np.isnan(montos).all(axis=0).ravel()
+        comparacion = comparacion[np.tile(con_monto, len(escenarios))]
+
+        return (
+            escenarios,
+            comparacion.reset_index(),
+            comparar_porcentajes(porcentajes_escenarios),
+        )
+
+
+def comparar_porcentajes(porcentajes_escenarios):
+    """
+    Esta función permite ordenar los porcentajes de producción de todos los escenarios
+    ({unidad_a_desglosar: DataFrame de porcentajes (servicios finales x escenarios)}) en un
+    DataFrame con una fila por escenario, desglose y servicio final, y compararlos con los del
+    escenario BASE.
+    """
+    comparaciones = []
+    for unidad_a_desglosar, porcentajes in porcentajes_escenarios.items():
+        porcentajes = porcentajes.rename_axis(index="Servicio Final", columns="Escenario")
+        comparacion = porcentajes.T.stack(future_stack=True).rename("Porcentaje").reset_index()
+        comparacion["Porcentaje Base"] = np.tile(
+            porcentajes[ESCENARIO_BASE].to_numpy(), porcentajes.shape[1]
+        )
+        comparacion.insert(1, "Desglose", unidad_a_desglosar)
+        comparacion["Aplicado"] = unidad_a_desglosar in DICCIONARIO_UNIDADES_A_DESGLOSAR
+        comparaciones.append(comparacion)
+
+    comparacion = pd.concat(comparaciones, ignore_index=True)
+    comparacion.insert(
+        len(comparacion.columns) - 1,
+        "Diferencia",
+        comparacion["Porcentaje"].fillna(0) - comparacion["Porcentaje Base"].fillna(0),
+    )
+
+    return comparacion
+
+
+def resumir_escenarios(escenarios, comparacion):
+    """
+    Esta función permite obtener un resumen con una fila por escenario: sus parámetros, el
+    monto total, la suma de las diferencias absolutas con el escenario BASE, y la cantidad de
+    celdas que cambian.
+    """
+    diferencias = comparacion.groupby("Escenario", sort=False).agg(
+        **{
+            "Monto Total": ("Monto", "sum"),
+            "Diferencia Absoluta": ("Diferencia", lambda diferencia: diferencia.abs().sum()),
+            "Celdas Distintas": ("Diferencia", lambda diferencia: (diferencia != 0).sum()),
+        }
+    )
+
+    return escenarios.join(diferencias)
+
+
+if __name__ == "__main__":
+    mes = sys.argv[1]
+    archivo_resoluciones = sys.argv[3] if len(sys.argv) > 3 else None
+
+    evaluador = EvaluadorEscenarios(mes, archivo_resoluciones=archivo_resoluciones)
+    escenarios_evaluados, comparacion_escenarios, comparacion_porcentajes = evaluador.evaluar(
+        pd.read_csv(sys.argv[2])
+    )
+    resumen_escenarios = resumir_escenarios(escenarios_evaluados, comparacion_escenarios)
+
+    escribir_libro(
+        NOMBRE_SALIDA_ESCENARIOS,
+        {"resumen": resumen_escenarios, "porcentajes": comparacion_porcentajes},
+    )
+    escribir_detalle(
+        NOMBRE_COMPARACION_ESCENARIOS,
+        comparacion_escenarios.set_index(["Escenario", "Centro de Costo", "Item SIGCOM"]),
+        "csv",
+    )
+    print(resumen_escenarios.to_markdown())
@@ -0,0 +1,104 @@
+"""
+Este archivo permite escribir los archivos de salida de los programas:
+
+- Los libros Excel pequeños se escriben con pd.ExcelWriter, como siempre.
+- Los libros Excel grandes se escriben fila por fila con xlsxwriter en modo "constant_memory",
+que va escribiendo cada fila al disco en vez de mantener todo el libro en memoria.
+- El detalle por movimiento (la cartola completa) se puede escribir como CSV o Parquet, al lado
+del reporte Excel.
+- Los archivos que NO dependen entre sí se pueden escribir en paralelo.
+"""
+
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import pandas as pd
+import xlsxwriter
+
+FILAS_ESCRITURA_STREAMING = 20_000
+FORMATOS_DETALLE = ["xlsx", "csv", "parquet"]
+
+
+def escribir_hoja_streaming(libro, nombre_hoja, df, incluir_indice):
+    """
+    Esta función permite escribir un DataFrame en una hoja nueva del libro, fila por fila. Los
+    valores vacíos (NaN/None) quedan como celdas vacías.
+    """
+    hoja = libro.add_worksheet(nombre_hoja)
+    formato_encabezado = libro.add_format({"bold": True, "border": 1})
+
+    encabezado = [str(columna) for columna in df.columns]
+    if incluir_indice:
+        nombres_indice = ["" if nombre is None else str(nombre) for nombre in df.index.names]
+        encabezado = nombres_indice + encabezado
+        df = df.reset_index()
+
+    hoja.write_row(0, 0, encabezado, formato_encabezado)
+
+    columnas = [
+        serie.astype(object).where(serie.notna(), None).tolist() for _, serie in df.items()
+    ]
+    for numero_fila, valores_fila in enumerate(zip(*columnas), start=1):
+        hoja.write_row(numero_fila, 0, valores_fila)
+
+
+def escribir_libro(ruta_libro, hojas, incluir_indice=True):
+    """
+    Esta función permite escribir un libro Excel con varias hojas ({nombre_hoja: DataFrame}).
+    Si el libro tiene menos de FILAS_ESCRITURA_STREAMING filas, entonces se escribe con
+    pd.ExcelWriter. Si no, se escribe fila por fila con xlsxwriter.
+    """
+    if sum(len(df) for df in hojas.values()) < FILAS_ESCRITURA_STREAMING:
+        with pd.ExcelWriter(ruta_libro) as writer:
+            for nombre_hoja, df in hojas.items():
+                df.to_excel(writer, sheet_name=nombre_hoja, index=incluir_indice)
+
+        return ruta_libro
+
+    opciones_libro = {
+        "constant_memory": True,
+        "nan_inf_to_errors": True,
+        "default_date_format": "yyyy-mm-dd",
+    }
+    with xlsxwriter.Workbook(ruta_libro, opciones_libro) as libro:
+        for nombre_hoja, df in hojas.items():
+            escribir_hoja_streaming(libro, nombre_hoja, df, incluir_indice)
+
+    return ruta_libro
+
+
+def escribir_detalle(ruta_sin_extension, df, formato_detalle):
+    """
+    Esta función permite escribir el detalle por movimiento como CSV o Parquet. Retorna la
+    ruta del archivo escrito.
+    """
+    if formato_detalle not in FORMATOS_DETALLE[1:]:
+        raise ValueError(
+            f"El formato de detalle {formato_detalle} NO es válido. Debe ser uno de: "
+            f"{', '.join(FORMATOS_DETALLE)}"
+        )
+
+    ruta_detalle = f"{ruta_sin_extension}.{formato_detalle}"
+    if formato_detalle == "csv":
+        df.to_csv(ruta_detalle, encoding="utf-8-sig")
+
+    else:
+        df.to_parquet(ruta_detalle)
+
+    return ruta_detalle
+
+
+def escribir_en_paralelo(escrituras):
+    """
+    Esta función permite correr varias escrituras independientes a la vez, cada una en un
+    hilo. Recibe una lista de tuplas (funcion, *argumentos), y retorna lo que retorna cada
+    escritura, en el mismo orden. Si una escritura falla, entonces se levanta su error.
+    """
+    if not escrituras:
+        return []
+
+    cantidad_hilos = min(len(escrituras), os.cpu_count() or 1)
+    with ThreadPoolExecutor(max_workers=cantidad_hilos) as ejecutor:
+        futuros = [ejecutor.submit(funcion, *argumentos) for funcion, *argumentos in escrituras]
+
+        return [futuro.result() for futuro in futuros]
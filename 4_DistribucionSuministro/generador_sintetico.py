@@ -0,0 +1,186 @@
+"""
+Este archivo permite generar entradas sintéticas, pero realistas, para medir los programas de
+producciones y suministros a distintas escalas:
+
+- "Cartola valorizada.csv": movimientos con códigos de artículo del maestro de artículos y
+destinos de DESTINO_INT_CC_SIGCOM.
+- "Producción <año>.xlsx": planilla con el formato de "SERVICIOS FINALES" que espera
+ModuloProducciones.cargar_archivo.
+- "Formato 4_Distribución Suministro 2022-12.xlsx": formato del SIGCOM con todos los centros de
+costo e ítems SIGCOM.
+- "Consumo Farmacia.xlsx": consumo valorizado de cada servicio WINSIG de Farmacia.
+- "resoluciones_sinteticas.csv": resoluciones de destino para los artículos que quedan sin
+centro de costo, para correr sin preguntas.
+"""
+
+import os
+
+import numpy as np
+import pandas as pd
+
+from constantes import (
+    DESTINO_INT_CC_SIGCOM,
+    DICCIONARIO_PRODUCIONES_SIGCOM,
+    DICCIONARIO_UNIDADES_A_DESGLOSAR,
+    WINSIG_SERVICIO_FARMACIA_CC_SIGCOM,
+    COLUMNA_SERVICIO_FARMACIA,
+    COLUMNA_MONTO_FARMACIA,
+    MESES,
+)
+from maestro_articulos import leer_maestro_completo
+from modulo_suministros import NOMBRE_CARTOLA, NOMBRE_FORMATO, NOMBRE_CONSUMO_FARMACIA
+
+NOMBRE_PRODUCCION = "Producción 2022.xlsx"
+NOMBRE_RESOLUCIONES_SINTETICAS = "resoluciones_sinteticas.csv"
+
+MOVIMIENTOS = ["Salida", "Entrada"]
+PROBABILIDADES_MOVIMIENTOS = [0.8, 0.2]
+MOTIVOS = ["Consumo", "Traspaso", "Merma", "Préstamo", "Devolución al Proveedor"]
+PROBABILIDADES_MOTIVOS = [0.8, 0.1, 0.04, 0.03, 0.03]
+
+FILAS_HOSPITALIZACION = ["DIAS CAMA OCUPADOS", "EGRESOS"]
+PRODUCCIONES_ADICIONALES = [
+    "PROCEDIMIENTO ECMO (1,5 horas c/u/)",
+    "PROCEDIMIENTO TAVI (4 horas c/u)",
+    "PROCEDIMIENTO EBUS",
+    "CONSULTA OTROS PROFESIONALES",
+]
+
+
+def leer_articulos_maestro():
+    """
+    Esta función permite obtener los códigos y descripciones de los artículos del maestro que
+    tienen un ítem SIGCOM asociado.
+    """
+    maestro = leer_maestro_completo()
+
+    return pd.DataFrame(
+        [
+            (codigo, articulo.get("Descripción"))
+            for codigo, articulo in maestro.items()
+            if articulo.get("Total_SIGCOM") is not None
+        ],
+        columns=["Codigo Articulo", "Nombre"],
+    )
+
+
+def generar_cartola(ruta_cartola, cantidad_movimientos, generador):
+    """
+    Esta función permite generar la cartola valorizada sintética. Retorna la cartola generada.
+    """
+    articulos = leer_articulos_maestro()
+    posiciones_articulos = generador.integers(0, len(articulos), cantidad_movimientos)
+
+    df_cartola = pd.DataFrame(
+        {
+            "Fecha": pd.Timestamp("2022-12-01")
+            + pd.to_timedelta(generador.integers(0, 31, cantidad_movimientos), unit="D"),
+            "Bodega": "BODEGA CENTRAL",
+            "Codigo Articulo": articulos["Codigo Articulo"].to_numpy()[posiciones_articulos],
+            "Nombre": articulos["Nombre"].to_numpy()[posiciones_articulos],
+            "Movimiento": generador.choice(
+                MOVIMIENTOS, cantidad_movimientos, p=PROBABILIDADES_MOVIMIENTOS
+            ),
+            "Destino": generador.choice(list(DESTINO_INT_CC_SIGCOM), cantidad_movimientos),
+            "Motivo": generador.choice(MOTIVOS, cantidad_movimientos, p=PROBABILIDADES_MOTIVOS),
+            "Cantidad": generador.integers(1, 50, cantidad_movimientos),
+            "Neto Total": generador.integers(100, 500_000, cantidad_movimientos).astype(float),
+        }
+    )
+    df_cartola.to_csv(ruta_cartola, index=False)
+
+    return df_cartola
+
+
+def generar_resoluciones(ruta_resoluciones, df_cartola):
+    """
+    Esta función permite generar las resoluciones de destino para todos los artículos que
+    quedan sin centro de costo SIGCOM.
+    """
+    destinos_sin_cc = [destino for destino, cc in DESTINO_INT_CC_SIGCOM.items() if cc is None]
+    nombres_sin_cc = df_cartola.loc[df_cartola["Destino"].isin(destinos_sin_cc), "Nombre"]
+
+    pd.DataFrame(
+        {"Nombre": nombres_sin_cc.unique(), "Destino": "BODEGA CENTRAL ABASTECIMIENTO"}
+    ).to_csv(ruta_resoluciones, index=False)
+
+
+def generar_produccion(ruta_produccion, generador):
+    """
+    Esta función permite generar la planilla de producción sintética. Las dos primeras filas
+    son de hospitalización, la tercera está vacía, y desde la cuarta están las producciones.
+    """
+    servicios_finales = (
+        FILAS_HOSPITALIZACION
+        + [None]
+        + list(DICCIONARIO_PRODUCIONES_SIGCOM)
+        + PRODUCCIONES_ADICIONALES
+    )
+
+    df_produccion = pd.DataFrame({"SERVICIOS FINALES": servicios_finales})
+    for mes in MESES:
+        df_produccion[mes] = generador.integers(1, 1_000, len(servicios_finales))
+    df_produccion["TOTAL AÑO"] = df_produccion[MESES].sum(axis=1)
+
+    df_produccion.to_excel(ruta_produccion, index=False)
+
+
+def generar_formato(ruta_formato):
+    """
+    Esta función permite generar el formato 4 del SIGCOM sintético, con todos los centros de
+    costo e ítems SIGCOM conocidos, y sin montos.
+    """
+    maestro = leer_maestro_completo()
+
+    items_sigcom = sorted(
+        {
+            articulo.get("Total_SIGCOM")
+            for articulo in maestro.values()
+            if articulo.get("Total_SIGCOM")
+        }
+    )
+    centros_de_costo = sorted(
+        {cc for cc in DESTINO_INT_CC_SIGCOM.values() if cc is not None}
+        | set(DICCIONARIO_PRODUCIONES_SIGCOM.values())
+        | {cc for subunidades in DICCIONARIO_UNIDADES_A_DESGLOSAR.values() for cc in subunidades}
+    )
+
+    df_formato = pd.DataFrame(np.nan, index=centros_de_costo, columns=items_sigcom)
+    df_formato.index.name = "Centro de Costo"
+    df_formato.reset_index().to_excel(ruta_formato, index=False)
+
+
+def generar_consumo_farmacia(ruta_farmacia, generador):
+    """
+    Esta función permite generar la planilla de consumo de Farmacia sintética, con un monto por
+    cada servicio WINSIG y una fila TOTAL al final.
+    """
+    servicios = [servicio for servicio in WINSIG_SERVICIO_FARMACIA_CC_SIGCOM if servicio != "TOTAL"]
+    montos = generador.integers(100_000, 50_000_000, len(servicios))
+
+    pd.DataFrame(
+        {
+            COLUMNA_SERVICIO_FARMACIA: servicios + ["TOTAL"],
+            COLUMNA_MONTO_FARMACIA: np.append(montos, montos.sum()),
+        }
+    ).to_excel(ruta_farmacia, index=False)
+
+
+def generar_entradas(carpeta_input, cantidad_movimientos, semilla=0):
+    """
+    Esta función permite generar todas las entradas sintéticas en la carpeta de input.
+    Retorna la ruta del archivo de resoluciones generado.
+    """
+    generador = np.random.default_rng(semilla)
+    os.makedirs(carpeta_input, exist_ok=True)
+
+    df_cartola = generar_cartola(
+        os.path.join(carpeta_input, NOMBRE_CARTOLA), cantidad_movimientos, generador
+    )
+    ruta_resoluciones = os.path.join(carpeta_input, NOMBRE_RESOLUCIONES_SINTETICAS)
+    generar_resoluciones(ruta_resoluciones, df_cartola)
+    generar_produccion(os.path.join(carpeta_input, NOMBRE_PRODUCCION), generador)
+    generar_formato(os.path.join(carpeta_input, NOMBRE_FORMATO))
+    generar_consumo_farmacia(os.path.join(carpeta_input, NOMBRE_CONSUMO_FARMACIA), generador)
+
+    return ruta_resoluciones
@@ -0,0 +1,375 @@
+"""
+Este archivo permite guardar los resultados de cada ejecución en un histórico local (SQLite),
+para analizar tendencias sin abrir los Excel archivados de cada mes: el formato relleno (la
+tabla dinámica), el formato 4 desglosado y los porcentajes de producción de cada periodo.
+
+Cada ejecución se agrega al histórico, y la última ejecución de cada periodo es la vigente. Los
+montos quedan indexados por etapa, centro de costo, ítem SIGCOM y periodo. Los resúmenes
+mensuales (por centro de costo) y anuales (por centro de costo e ítem SIGCOM) se recalculan al
+guardar cada periodo, por lo que las consultas NO suman los montos de cada mes.
+
+Uso:
+python historico.py importar AAAA-MM output_suministros.xlsx [output_producciones.xlsx]
+python historico.py consultar "CENTRO DE COSTO" "ITEM SIGCOM" [desde AAAA-MM] [hasta AAAA-MM]
+python historico.py mensual "CENTRO DE COSTO" [desde AAAA-MM] [hasta AAAA-MM]
+python historico.py anual "CENTRO DE COSTO" ["ITEM SIGCOM"]
+
+Con --historico=ruta.sqlite se usa otro archivo de histórico.
+"""
+
+import sys
+import sqlite3
+import datetime
+
+import pandas as pd
+
+from constantes import DICCIONARIO_UNIDADES_A_DESGLOSAR, MESES
+
+RUTA_HISTORICO = "historico_sigcom.sqlite"
+ETAPAS_HISTORICO = ["formato_relleno", "formato_desglosado"]
+SEGUNDOS_ESPERA_BLOQUEO = 60
+
+ESQUEMA_HISTORICO = """
+CREATE TABLE IF NOT EXISTS ejecuciones (
+    id_ejecucion INTEGER PRIMARY KEY AUTOINCREMENT,
+    periodo TEXT NOT NULL,
+    fecha TEXT NOT NULL,
+    origen TEXT
+);
+
+CREATE TABLE IF NOT EXISTS periodos_vigentes (
+    periodo TEXT PRIMARY KEY,
+    id_ejecucion INTEGER NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS montos (
+    id_ejecucion INTEGER NOT NULL,
+    periodo TEXT NOT NULL,
+    etapa TEXT NOT NULL,
+    centro_de_costo TEXT NOT NULL,
+    item_sigcom TEXT NOT NULL,
+    monto REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_montos_celda
+    ON montos (etapa, centro_de_costo, item_sigcom, periodo);
+CREATE INDEX IF NOT EXISTS idx_montos_ejecucion ON montos (id_ejecucion);
+
+CREATE TABLE IF NOT EXISTS porcentajes_produccion (
+    id_ejecucion INTEGER NOT NULL,
+    periodo TEXT NOT NULL,
+    cc_a_desglosar TEXT NOT NULL,
+    servicio TEXT NOT NULL,
+    produccion REAL,
+    porcentaje REAL
+);
+CREATE INDEX IF NOT EXISTS idx_porcentajes_desglose
+    ON porcentajes_produccion (cc_a_desglosar, periodo);
+CREATE INDEX IF NOT EXISTS idx_porcentajes_ejecucion ON porcentajes_produccion (id_ejecucion);
+
+CREATE TABLE IF NOT EXISTS resumen_mensual (
+    etapa TEXT NOT NULL,
+    centro_de_costo TEXT NOT NULL,
+    periodo TEXT NOT NULL,
+    monto REAL NOT NULL,
+    PRIMARY KEY (etapa, centro_de_costo, periodo)
+);
+
+CREATE TABLE IF NOT EXISTS resumen_anual (
+    etapa TEXT NOT NULL,
+    centro_de_costo TEXT NOT NULL,
+    item_sigcom TEXT NOT NULL,
+    anio TEXT NOT NULL,
+    monto REAL NOT NULL,
+    meses INTEGER NOT NULL,
+    PRIMARY KEY (etapa, centro_de_costo, item_sigcom, anio)
+);
+"""
+
+
+def obtener_periodo(mes, anio):
+    """
+    Esta función permite obtener el periodo (AAAA-MM) de un mes (Ej: "DICIEMBRE") y un año.
+    Los periodos en este formato se ordenan igual como texto y como fecha.
+    """
+    if mes not in MESES:
+        raise ValueError(f"El mes {mes} NO es válido. Debe ser uno de: {', '.join(MESES)}")
+
+    return f"{int(anio):04d}-{MESES.index(mes) + 1:02d}"
+
+
+def obtener_montos_largos(formato):
+    """
+    Esta función permite pasar un formato (un centro de costo por fila y un ítem SIGCOM por
+    columna) a formato largo, con una fila por cada celda con monto distinto de 0.
+    """
+    montos = formato.apply(pd.to_numeric, errors="coerce")
+    montos = montos.rename_axis(index="centro_de_costo", columns="item_sigcom").stack()
+    montos = montos[montos.notna() & (montos != 0)]
+
+    return montos.rename("monto").reset_index()
+
+
+def obtener_porcentajes_largos(producciones):
+    """
+    Esta función permite juntar los desgloses de producción ({cc_a_desglosar: DataFrame del
+    desglose}, como los entrega ModuloProducciones) en una sola tabla. La última fila de cada
+    desglose (el total) NO se considera, y la producción es la segunda columna (el mes).
+    """
+    porcentajes = [
+        pd.DataFrame(
+            {
+                "cc_a_desglosar": cc_a_desglosar,
+                "servicio": df_desglose["SERVICIOS FINALES"].iloc[:-1].astype(str),
+                "produccion": pd.to_numeric(df_desglose.iloc[:-1, 1], errors="coerce"),
+                "porcentaje": pd.to_numeric(
+                    df_desglose["PORCENTAJES"].iloc[:-1], errors="coerce"
+                ),
+            }
+        )
+        for cc_a_desglosar, df_desglose in producciones.items()
+    ]
+
+    return pd.concat(porcentajes, ignore_index=True)
+
+
+class HistoricoResultados:
+    """
+    Esta clase permite guardar y consultar los resultados de cada periodo en el histórico.
+    Se puede usar con "with", para cerrar la conexión al terminar.
+    """
+
+    def __init__(self, ruta=RUTA_HISTORICO):
+        self.ruta = ruta
+        self.conexion = sqlite3.connect(ruta, timeout=SEGUNDOS_ESPERA_BLOQUEO)
+        self.conexion.executescript(ESQUEMA_HISTORICO)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *_):
+        self.cerrar()
+
+    def cerrar(self):
+        self.conexion.close()
+
+    def guardar_ejecucion(self, periodo, resultados, producciones=None, origen=None):
+        """
+        Esta función permite agregar una ejecución al histórico, y dejarla como la vigente de
+        su periodo. Recibe los resultados de AnalizadorSuministros (se guardan las etapas de
+        ETAPAS_HISTORICO que estén) y, si se entregan, los desgloses de producción del mes.
+
+        Todo se guarda en una sola transacción, junto con los resúmenes del periodo y de su
+        año. Retorna el id de la ejecución.
+        """
+        with self.conexion:
+            cursor = self.conexion.execute(
+                "INSERT INTO ejecuciones (periodo, fecha, origen) VALUES (?, ?, ?)",
+                (periodo, datetime.datetime.now().isoformat(timespec="seconds"), origen),
+            )
+            id_ejecucion = cursor.lastrowid
+
+            for etapa in ETAPAS_HISTORICO:
+                if resultados.get(etapa) is None:
+                    continue
+
+                montos = obtener_montos_largos(resultados[etapa])
+                self.conexion.executemany(
+                    "INSERT INTO montos (id_ejecucion, periodo, etapa, centro_de_costo, "
+                    "item_sigcom, monto) VALUES (?, ?, ?, ?, ?, ?)",
+                    (
+                        (id_ejecucion, periodo, etapa, cc, item, float(monto))
+                        for cc, item, monto in montos.itertuples(index=False)
+                    ),
+                )
+
+            if producciones:
+                porcentajes = obtener_porcentajes_largos(producciones)
+                self.conexion.executemany(
+                    "INSERT INTO porcentajes_produccion (id_ejecucion, periodo, cc_a_desglosar, "
+                    "servicio, produccion, porcentaje) VALUES (?, ?, ?, ?, ?, ?)",
+                    (
+                        (id_ejecucion, periodo, *fila)
+                        for fila in porcentajes.astype(object)
+                        .where(porcentajes.notna(), None)
+                        .itertuples(index=False)
+                    ),
+                )
+
+            self.conexion.execute(
+                "INSERT OR REPLACE INTO periodos_vigentes (periodo, id_ejecucion) VALUES (?, ?)",
+                (periodo, id_ejecucion),
+            )
+            self.actualizar_resumenes(periodo, id_ejecucion)
+
+        return id_ejecucion
+
+    def actualizar_resumenes(self, periodo, id_ejecucion):
+        """
+        Esta función permite recalcular el resumen mensual del periodo (con la ejecución
+        vigente) y el resumen anual de su año (con las ejecuciones vigentes de cada mes).
+        """
+        anio = periodo[:4]
+        self.conexion.execute("DELETE FROM resumen_mensual WHERE periodo = ?", (periodo,))
+        self.conexion.execute(
+            """
+            INSERT INTO resumen_mensual (etapa, centro_de_costo, periodo, monto)
+            SELECT etapa, centro_de_costo, periodo, SUM(monto)
+            FROM montos
+            WHERE id_ejecucion = ?
+            GROUP BY etapa, centro_de_costo
+            """,
+            (id_ejecucion,),
+        )
+
+        self.conexion.execute("DELETE FROM resumen_anual WHERE anio = ?", (anio,))
+        self.conexion.execute(
+            """
+            INSERT INTO resumen_anual (etapa, centro_de_costo, item_sigcom, anio, monto, meses)
+            SELECT m.etapa, m.centro_de_costo, m.item_sigcom, ?, SUM(m.monto),
+                COUNT(DISTINCT m.periodo)
+            FROM periodos_vigentes AS v
+            JOIN montos AS m ON m.id_ejecucion = v.id_ejecucion
+            WHERE v.periodo BETWEEN ? AND ?
+            GROUP BY m.etapa, m.centro_de_costo, m.item_sigcom
+            """,
+            (anio, f"{anio}-01", f"{anio}-12"),
+        )
+
+    def consultar(self, consulta, parametros):
+        """
+        Esta función permite correr una consulta SQL sobre el histórico. parametros es la tupla
+        con los valores de los "?" de la consulta, en el mismo orden (así los valores NO se
+        escriben dentro del SQL). Retorna el resultado como DataFrame, con una columna por
+        cada columna del SELECT.
+        """
+        return pd.read_sql_query(consulta, self.conexion, params=parametros)
+
+    def consultar_serie(
+        self, centro_de_costo, item_sigcom, etapa="formato_desglosado", desde=None, hasta=None
+    ):
+        """
+        Esta función permite obtener el monto vigente de una celda (centro de costo e ítem
+        SIGCOM) en cada periodo entre desde y hasta (AAAA-MM, ambos incluidos). Los periodos
+        sin monto en la celda NO aparecen.
+        """
+        return self.consultar(
+            """
+            SELECT m.periodo AS Periodo, m.monto AS Monto
+            FROM montos AS m
+            JOIN periodos_vigentes AS v
+                ON v.periodo = m.periodo AND v.id_ejecucion = m.id_ejecucion
+            WHERE m.etapa = ? AND m.centro_de_costo = ? AND m.item_sigcom = ?
+                AND m.periodo BETWEEN ? AND ?
+            ORDER BY m.periodo
+            """,
+            (etapa, centro_de_costo, item_sigcom, desde or "0000-00", hasta or "9999-99"),
+        )
+
+    def consultar_resumen_mensual(
+        self, centro_de_costo, etapa="formato_desglosado", desde=None, hasta=None
+    ):
+        """
+        Esta función permite obtener el monto total (todos los ítems SIGCOM) de un centro de
+        costo en cada periodo entre desde y hasta.
+        """
+        return self.consultar(
+            """
+            SELECT periodo AS Periodo, monto AS Monto
+            FROM resumen_mensual
+            WHERE etapa = ? AND centro_de_costo = ? AND periodo BETWEEN ? AND ?
+            ORDER BY periodo
+            """,
+            (etapa, centro_de_costo, desde or "0000-00", hasta or "9999-99"),
+        )
+
+    def consultar_resumen_anual(
+        self, centro_de_costo, item_sigcom=None, etapa="formato_desglosado"
+    ):
+        """
+        Esta función permite obtener el monto anual de un centro de costo, por ítem SIGCOM (o
+        de un solo ítem, si se entrega), junto con la cantidad de meses con monto.
+        """
+        consulta = """
+            SELECT anio AS Año, item_sigcom AS "Item SIGCOM", monto AS Monto, meses AS Meses
+            FROM resumen_anual
+            WHERE etapa = ? AND centro_de_costo = ?
+        """
+        parametros = [etapa, centro_de_costo]
+        if item_sigcom is not None:
+            consulta += " AND item_sigcom = ?"
+            parametros.append(item_sigcom)
+
+        return self.consultar(f"{consulta} ORDER BY anio, item_sigcom", parametros)
+
+    def consultar_porcentajes(self, cc_a_desglosar, desde=None, hasta=None):
+        """
+        Esta función permite obtener los porcentajes de producción vigentes de un desglose, con
+        un servicio por fila y un periodo por columna.
+        """
+        porcentajes = self.consultar(
+            """
+            SELECT p.periodo, p.servicio, p.porcentaje
+            FROM porcentajes_produccion AS p
+            JOIN periodos_vigentes AS v
+                ON v.periodo = p.periodo AND v.id_ejecucion = p.id_ejecucion
+            WHERE p.cc_a_desglosar = ? AND p.periodo BETWEEN ? AND ?
+            """,
+            (cc_a_desglosar, desde or "0000-00", hasta or "9999-99"),
+        )
+
+        return porcentajes.pivot_table(
+            index="servicio", columns="periodo", values="porcentaje", aggfunc="sum"
+        )
+
+
+def importar_libros(historico, periodo, ruta_suministros, ruta_producciones=None):
+    """
+    Esta función permite agregar al histórico un periodo ya archivado, desde su
+    output_suministros.xlsx (y su output_producciones.xlsx, si se entrega). Los nombres de las
+    hojas de producciones están cortados a 31 caracteres.
+    """
+    resultados = pd.read_excel(ruta_suministros, sheet_name=ETAPAS_HISTORICO, index_col=0)
+
+    producciones = None
+    if ruta_producciones is not None:
+        hojas = pd.read_excel(ruta_producciones, sheet_name=None)
+        producciones = {
+            cc_a_desglosar: hojas[cc_a_desglosar[:31]]
+            for cc_a_desglosar in DICCIONARIO_UNIDADES_A_DESGLOSAR
+            if cc_a_desglosar[:31] in hojas
+        }
+
+    return historico.guardar_ejecucion(
+        periodo, resultados, producciones, origen=f"importar:{ruta_suministros}"
+    )
+
+
+if __name__ == "__main__":
+    ruta_historico = RUTA_HISTORICO
+    for argumento in sys.argv[1:]:
+        if argumento.startswith("--historico="):
+            ruta_historico = argumento.split("=", 1)[1]
+
+    argumentos = [argumento for argumento in sys.argv[1:] if not argumento.startswith("--")]
+    comando, argumentos = argumentos[0], argumentos[1:]
+
+    with HistoricoResultados(ruta_historico) as historico:
+        if comando == "importar":
+            id_ejecucion = importar_libros(historico, *argumentos)
+            print(f"Se agregó el periodo {argumentos[0]} (ejecución {id_ejecucion})")
+
+        else:
+            if comando == "consultar":
+                desde, hasta = (argumentos[2:] + [None, None])[:2]
+                resultado = historico.consultar_serie(
+                    argumentos[0], argumentos[1], desde=desde, hasta=hasta
+                )
+            elif comando == "mensual":
+                desde, hasta = (argumentos[1:] + [None, None])[:2]
+                resultado = historico.consultar_resumen_mensual(
+                    argumentos[0], desde=desde, hasta=hasta
+                )
+            else:
+                resultado = historico.consultar_resumen_anual(*argumentos)
+
+            print(resultado.to_markdown(index=False))
@@ -0,0 +1,489 @@
+"""
+Este archivo permite correr AnalizadorSuministros en modo incremental. La cartola valorizada
+se exporta de forma acumulada, por lo que en cada ejecución la mayoría de los movimientos ya
+fueron procesados antes.
+
+En cada ejecución se guarda un estado con:
+
+- La llave y la huella de cada movimiento, junto con su aporte a la tabla dinámica (centro de
+costo, ítem SIGCOM y monto).
+- La tabla dinámica agregada (suma y cantidad de movimientos por centro de costo e ítem).
+- El formato relleno y el formato desglosado.
+
+En la siguiente ejecución solamente se filtran, traducen y rellenan los movimientos nuevos o
+que cambiaron. Su diferencia se aplica a la tabla dinámica guardada, y solamente se vuelven a
+calcular los desgloses de los centros de costo que cambiaron (ver matriz_asignacion.py).
+"""
+
+import os
+import sys
+import json
+import hashlib
+
+import numpy as np
+import pandas as pd
+from pandas.api.types import union_categoricals
+
+import constantes
+import dimensiones
+from cache import calcular_huella
+from matriz_asignacion import (
+    desglosar_cambios,
+    desglosar_formato,
+    obtener_centros_de_costo_cambiados,
+    obtener_desgloses_afectados,
+)
+from modulo_suministros import NOMBRE_CARTOLA, AnalizadorSuministros
+from maestro_articulos import obtener_rutas_maestro
+from dimensiones import obtener_centros_de_costo, obtener_items_sigcom, obtener_rutas_dimensiones
+from constantes import COLUMNAS_CARTOLA, COLUMNAS_LLAVE_MOVIMIENTO, TAMANO_CHUNK_CARTOLA
+
+CARPETA_ESTADO_INCREMENTAL = "estado_incremental"
+VERSION_ESTADO = 1
+NOMBRE_METADATOS_ESTADO = "metadatos.json"
+ARCHIVOS_ESTADO = {
+    "movimientos": "movimientos.parquet",
+    "tabla": "tabla.parquet",
+    "formato_relleno": "formato_relleno.parquet",
+    "formato_desglosado": "formato_desglosado.parquet",
+}
+
+
+def calcular_llaves_movimientos(df_cartola, ocurrencias_previas=None):
+    """
+    Esta función permite obtener la llave (según COLUMNAS_LLAVE_MOVIMIENTO) y la huella (según
+    todas las columnas leídas) de cada movimiento, como enteros de 64 bits. Los movimientos
+    con la misma llave se distinguen por su orden de aparición.
+
+    Si la cartola se lee por partes, entonces ocurrencias_previas tiene cuántas veces apareció
+    cada llave en las partes anteriores. Retorna las llaves, las huellas y las ocurrencias
+    actualizadas.
+    """
+    llaves_base = pd.util.hash_pandas_object(df_cartola[COLUMNAS_LLAVE_MOVIMIENTO], index=False)
+    ocurrencias = llaves_base.groupby(llaves_base).cumcount()
+
+    if ocurrencias_previas is None:
+        ocurrencias_previas = pd.Series(dtype=np.int64)
+    ocurrencias += (
+        ocurrencias_previas.reindex(llaves_base.to_numpy()).fillna(0).astype(np.int64).to_numpy()
+    )
+
+    llaves = pd.util.hash_pandas_object(
+        pd.DataFrame({"llave": llaves_base, "ocurrencia": ocurrencias}), index=False
+    )
+    huellas = pd.util.hash_pandas_object(df_cartola, index=False)
+    ocurrencias_previas = ocurrencias_previas.add(llaves_base.value_counts(), fill_value=0)
+
+    return llaves.to_numpy(), huellas.to_numpy(), ocurrencias_previas.astype(np.int64)
+
+
+def unir_chunks_cartola(partes):
+    """
+    Esta función permite unir partes de la cartola. Cada parte se lee con sus propias
+    categorías, y pd.concat convierte a texto las columnas categóricas con categorías
+    distintas, por lo que estas se unen con union_categoricals.
+    """
+    df_cartola = pd.concat(partes)
+    for columna in df_cartola.columns:
+        if isinstance(partes[0][columna].dtype, pd.CategoricalDtype):
+            df_cartola[columna] = union_categoricals([parte[columna] for parte in partes])
+
+    return df_cartola
+
+
+def calcular_huella_desgloses(desgloses):
+    """
+    Esta función permite obtener la huella (hash SHA-256) de los porcentajes de los
+    desgloses. Si cambian los porcentajes, entonces el desglose se calcula completo.
+    """
+    contenido = {
+        cc_a_desglosar: {cc: float(porcentaje) for cc, porcentaje in porcentajes.items()}
+        for cc_a_desglosar, porcentajes in desgloses.items()
+    }
+    return hashlib.sha256(json.dumps(contenido, ensure_ascii=False).encode()).hexdigest()
+
+
+class ActualizadorIncremental:
+    """
+    Esta clase permite correr el programa de suministros en modo incremental, utilizando las
+    etapas de un AnalizadorSuministros.
+    """
+
+    def __init__(self, analizador):
+        self.analizador = analizador
+        self.carpeta_estado = os.path.join(analizador.carpeta_input, CARPETA_ESTADO_INCREMENTAL)
+
+    def ruta_estado(self, nombre):
+        """
+        Esta función permite obtener la ruta de un archivo del estado incremental.
+        """
+        return os.path.join(self.carpeta_estado, nombre)
+
+    def obtener_huella_base(self):
+        """
+        Esta función permite obtener la huella de los archivos que definen cómo se traduce un
+        movimiento: el maestro de artículos, constantes.py, dimensiones.py, el registro de
+        códigos de las dimensiones y las resoluciones de destinos. Si cambia alguno, entonces
+        el estado guardado NO se usa.
+        """
+        rutas = [
+            *obtener_rutas_maestro(),
+            constantes.__file__,
+            dimensiones.__file__,
+            *obtener_rutas_dimensiones(),
+        ]
+        rutas_resoluciones = [
+            self.analizador.almacen_resoluciones.ruta_resoluciones,
+            self.analizador.archivo_resoluciones,
+        ]
+        rutas += [ruta for ruta in rutas_resoluciones if ruta and os.path.exists(ruta)]
+
+        return calcular_huella(*rutas)
+
+    def cargar_estado(self):
+        """
+        Esta función permite cargar el estado de la ejecución anterior. Si NO existe, o si
+        cambió la forma de traducir los movimientos, entonces retorna None.
+        """
+        ruta_metadatos = self.ruta_estado(NOMBRE_METADATOS_ESTADO)
+        if not os.path.exists(ruta_metadatos):
+            return None
+
+        with open(ruta_metadatos, encoding="utf-8") as archivo:
+            metadatos = json.load(archivo)
+
+        if metadatos.get("version") != VERSION_ESTADO:
+            return None
+
+        if metadatos["huella_base"] != self.obtener_huella_base():
+            if self.analizador.verbose:
+                print("- Cambió el maestro, constantes.py o las resoluciones: se procesa todo -\n")
+            return None
+
+        estado = {
+            nombre: pd.read_parquet(self.ruta_estado(nombre_archivo))
+            for nombre, nombre_archivo in ARCHIVOS_ESTADO.items()
+        }
+        # Parquet entrega los nombres de las columnas como texto de pandas (StringDtype). Se
+        # dejan como object, igual que en una ejecución completa.
+        for nombre in ["formato_relleno", "formato_desglosado"]:
+            estado[nombre].columns = estado[nombre].columns.astype(object)
+        estado["huella_desgloses"] = metadatos["huella_desgloses"]
+
+        return estado
+
+    def guardar_estado(self, estado, huella_desgloses):
+        """
+        Esta función permite guardar el estado de la ejecución. Los metadatos se escriben al
+        final, por lo que un estado a medio escribir nunca se considera vigente.
+        """
+        os.makedirs(self.carpeta_estado, exist_ok=True)
+
+        ruta_metadatos = self.ruta_estado(NOMBRE_METADATOS_ESTADO)
+        if os.path.exists(ruta_metadatos):
+            os.remove(ruta_metadatos)
+
+        for nombre, nombre_archivo in ARCHIVOS_ESTADO.items():
+            estado[nombre].to_parquet(self.ruta_estado(nombre_archivo))
+
+        metadatos = {
+            "version": VERSION_ESTADO,
+            "huella_base": self.obtener_huella_base(),
+            "huella_desgloses": huella_desgloses,
+        }
+        with open(ruta_metadatos, "w", encoding="utf-8") as archivo:
+            json.dump(metadatos, archivo, ensure_ascii=False)
+
+    def leer_chunks_cartola(self):
+        """
+        Esta función entrega, una por una, las partes de la cartola, con las columnas de
+        COLUMNAS_CARTOLA y las de la llave de los movimientos. Todas deben estar en la
+        cartola, ya que sin la llave NO se pueden comparar los movimientos entre ejecuciones.
+        """
+        ruta_cartola = self.analizador.ruta_input(NOMBRE_CARTOLA)
+        encabezado = pd.read_csv(ruta_cartola, nrows=0).columns
+
+        columnas_llave = {
+            columna: "object"
+            for columna in COLUMNAS_LLAVE_MOVIMIENTO
+            if columna not in COLUMNAS_CARTOLA
+        }
+        tipos_columnas = {**COLUMNAS_CARTOLA, **columnas_llave}
+
+        columnas_faltantes = [columna for columna in tipos_columnas if columna not in encabezado]
+        if columnas_faltantes:
+            raise ValueError(
+                f"A {NOMBRE_CARTOLA} le faltan las columnas: {', '.join(columnas_faltantes)}. "
+                f"El modo incremental necesita las columnas de COLUMNAS_LLAVE_MOVIMIENTO "
+                f"({', '.join(COLUMNAS_LLAVE_MOVIMIENTO)}) para identificar cada movimiento."
+            )
+
+        yield from pd.read_csv(
+            ruta_cartola,
+            usecols=list(tipos_columnas),
+            dtype=tipos_columnas,
+            chunksize=TAMANO_CHUNK_CARTOLA,
+        )
+
+    def leer_cartola(self, movimientos_previos):
+        """
+        Esta función permite leer la cartola por partes y obtener la llave y la huella de cada
+        movimiento. De cada parte se guardan solamente los movimientos nuevos o que cambiaron,
+        por lo que NO se mantiene la cartola completa en memoria.
+
+        Retorna las llaves y huellas de todos los movimientos, y los movimientos nuevos o que
+        cambiaron.
+        """
+        llaves, huellas, partes_cambiadas = [], [], []
+        ocurrencias = None
+
+        for chunk_cartola in self.leer_chunks_cartola():
+            llaves_chunk, huellas_chunk, ocurrencias = calcular_llaves_movimientos(
+                chunk_cartola, ocurrencias
+            )
+            mask_cambiados, _ = self.separar_movimientos(
+                llaves_chunk, huellas_chunk, movimientos_previos
+            )
+
+            llaves.append(llaves_chunk)
+            huellas.append(huellas_chunk)
+            partes_cambiadas.append(chunk_cartola[mask_cambiados])
+
+        llaves = np.concatenate(llaves) if llaves else np.array([], dtype=np.uint64)
+        huellas = np.concatenate(huellas) if huellas else np.array([], dtype=np.uint64)
+        df_cambiados = unir_chunks_cartola(partes_cambiadas) if partes_cambiadas else pd.DataFrame()
+
+        return llaves, huellas, df_cambiados
+
+    def obtener_aportes(self, df_movimientos):
+        """
+        Esta función permite filtrar, traducir y rellenar los destinos de los movimientos
+        entregados, y obtener el aporte de cada uno a la tabla dinámica: códigos de centro de
+        costo e ítem SIGCOM (-1 si el movimiento se filtró o NO se pudo traducir) y monto.
+
+        Retorna el DataFrame de aportes (alineado con los movimientos) y los movimientos
+        procesados.
+        """
+        df_procesada = self.analizador.filtrar_y_traducir_chunk(df_movimientos)
+        if not df_procesada.empty:
+            df_procesada = self.analizador.rellenar_destinos(df_procesada)
+
+        aportes = pd.DataFrame(
+            {
+                "cc": np.full(len(df_movimientos), -1, dtype=np.int32),
+                "item": np.full(len(df_movimientos), -1, dtype=np.int32),
+                "neto": np.zeros(len(df_movimientos)),
+            }
+        )
+
+        posiciones = df_movimientos.index.get_indexer(df_procesada.index)
+        aportes.loc[posiciones, "cc"] = obtener_centros_de_costo().codificar(
+            df_procesada["CC SIGCOM"]
+        )
+        aportes.loc[posiciones, "item"] = obtener_items_sigcom().codificar(
+            df_procesada["Tipo_Articulo_SIGCOM"]
+        )
+        aportes.loc[posiciones, "neto"] = df_procesada["Neto Total"].fillna(0.0).to_numpy()
+
+        return aportes, df_procesada
+
+    def separar_movimientos(self, llaves, huellas, movimientos_previos):
+        """
+        Esta función permite comparar los movimientos actuales con los de la ejecución
+        anterior. Retorna:
+
+        - La mask de los movimientos actuales que son nuevos o que cambiaron.
+        - La mask de los movimientos anteriores que cambiaron o que ya NO están en la cartola.
+        """
+        llaves_previas = pd.Index(movimientos_previos["llave"].to_numpy())
+        huellas_previas = movimientos_previos["huella"].to_numpy()
+
+        posiciones_previas = llaves_previas.get_indexer(llaves)
+        encontrados = posiciones_previas >= 0
+        mask_actuales_cambiados = ~encontrados
+        mask_actuales_cambiados[encontrados] = (
+            huellas_previas[posiciones_previas[encontrados]] != huellas[encontrados]
+        )
+
+        mask_previos_salientes = pd.Index(llaves).get_indexer(llaves_previas) < 0
+        mask_previos_salientes[posiciones_previas[encontrados & mask_actuales_cambiados]] = True
+
+        return mask_actuales_cambiados, mask_previos_salientes
+
+    def actualizar_tabla(self, tabla_previa, aportes_entrantes, aportes_salientes):
+        """
+        Esta función permite aplicar la diferencia de los movimientos a la tabla dinámica
+        agregada: suma los aportes entrantes y resta los salientes. Las celdas que quedan sin
+        movimientos se eliminan.
+        """
+        partes = [tabla_previa]
+        for aportes, signo in [(aportes_entrantes, 1), (aportes_salientes, -1)]:
+            aportes = aportes[(aportes["cc"] >= 0) & (aportes["item"] >= 0)]
+            partes.append(
+                pd.DataFrame(
+                    {
+                        "cc": aportes["cc"],
+                        "item": aportes["item"],
+                        "suma": signo * aportes["neto"],
+                        "cantidad": signo,
+                    }
+                )
+            )
+
+        tabla = pd.concat(partes, ignore_index=True).groupby(["cc", "item"], as_index=False).sum()
+        return tabla[tabla["cantidad"] > 0].reset_index(drop=True)
+
+    def convertir_tabla_a_formato(self, tabla):
+        """
+        Esta función permite convertir la tabla dinámica agregada (códigos de centro de costo
+        e ítem) en una tabla al estilo wide con etiquetas de texto, igual a la que se obtiene
+        con pd.pivot_table.
+        """
+        tabla_dinamica = tabla.pivot(index="cc", columns="item", values="suma")
+        tabla_dinamica.index = obtener_centros_de_costo().etiquetas[tabla_dinamica.index]
+        tabla_dinamica.columns = obtener_items_sigcom().etiquetas[tabla_dinamica.columns]
+        tabla_dinamica = tabla_dinamica.sort_index().sort_index(axis=1)
+
+        return tabla_dinamica.rename_axis(index="CC SIGCOM", columns="Tipo_Articulo_SIGCOM")
+
+    def correr(self, producciones_por_unidad=None, guardar_excel=True):
+        """
+        Esta es la función principal del modo incremental:
+
+        1 - Lee la cartola por partes y obtiene la llave y huella de cada movimiento.
+        2 - Filtra, traduce y rellena solamente los movimientos nuevos o que cambiaron.
+        3 - Aplica la diferencia a la tabla dinámica guardada, y rellena el formato.
+        4 - Si los porcentajes de los desgloses NO cambiaron, entonces actualiza el formato
+        desglosado anterior solamente con los desgloses afectados. Si no, lo calcula completo.
+        5 - Guarda el estado y los archivos generados (si se pide).
+
+        Si NO hay un estado anterior, entonces todos los movimientos se consideran nuevos.
+        Retorna un diccionario con los DataFrames generados. En vez de la cartola completa,
+        entrega los movimientos procesados en esta ejecución ("df_cambios").
+        """
+        registro = self.analizador.registro
+        estado = self.cargar_estado()
+
+        if estado is None:
+            movimientos_previos = pd.DataFrame(
+                {
+                    "llave": np.array([], dtype=np.uint64),
+                    "huella": np.array([], dtype=np.uint64),
+                    "cc": np.array([], dtype=np.int32),
+                    "item": np.array([], dtype=np.int32),
+                    "neto": np.array([], dtype=float),
+                }
+            )
+            tabla_previa = movimientos_previos[["cc", "item"]].assign(suma=0.0, cantidad=0)
+
+        else:
+            movimientos_previos = estado["movimientos"]
+            tabla_previa = estado["tabla"]
+
+        try:
+            with registro.etapa("leer") as informar_filas_salida:
+                llaves, huellas, df_cambiados = self.leer_cartola(movimientos_previos)
+                informar_filas_salida(len(llaves))
+
+            mask_cambiados, mask_salientes = self.separar_movimientos(
+                llaves, huellas, movimientos_previos
+            )
+            if self.analizador.verbose:
+                print(
+                    f"- Modo incremental: {mask_cambiados.sum()} movimientos nuevos o "
+                    f"modificados, {mask_salientes.sum()} movimientos anteriores reemplazados "
+                    f"o eliminados -\n"
+                )
+
+            with registro.etapa("procesar_cambios", int(mask_cambiados.sum())):
+                aportes, df_cambios = self.obtener_aportes(df_cambiados)
+                self.analizador.informar_no_traducidos()
+
+            with registro.etapa("tabla_dinamica", len(aportes)):
+                tabla = self.actualizar_tabla(
+                    tabla_previa, aportes, movimientos_previos[mask_salientes]
+                )
+                consumo_farmacia = self.analizador.leer_consumo_farmacia()
+                formato_relleno = self.analizador.rellenar_formato(
+                    self.convertir_tabla_a_formato(tabla), consumo_farmacia
+                )
+
+            with registro.etapa("desglose", len(formato_relleno)):
+                desgloses = self.analizador.obtener_desgloses(producciones_por_unidad)
+                huella_desgloses = calcular_huella_desgloses(desgloses)
+                formato_desglosado = self.desglosar(
+                    formato_relleno, desgloses, huella_desgloses, estado
+                )
+
+            aportes.insert(0, "llave", llaves[mask_cambiados])
+            aportes.insert(1, "huella", huellas[mask_cambiados])
+            movimientos = pd.concat(
+                [movimientos_previos[~mask_salientes], aportes], ignore_index=True
+            )
+            with registro.etapa("guardar_estado", len(movimientos)):
+                self.guardar_estado(
+                    {
+                        "movimientos": movimientos,
+                        "tabla": tabla,
+                        "formato_relleno": formato_relleno,
+                        "formato_desglosado": formato_desglosado,
+                    },
+                    huella_desgloses,
+                )
+
+            resultados = {
+                "formato_desglosado": formato_desglosado,
+                "formato_relleno": formato_relleno,
+                "df_cambios": df_cambios,
+                "no_traducidos": self.analizador.reporte_no_traducidos,
+            }
+            if consumo_farmacia is not None:
+                resultados["consumo_farmacia"] = consumo_farmacia
+
+            if guardar_excel:
+                registro.medir("guardar", self.analizador.guardar_archivos, **resultados)
+
+        finally:
+            registro.guardar()
+
+        return resultados
+
+    def desglosar(self, formato_relleno, desgloses, huella_desgloses, estado):
+        """
+        Esta función permite obtener el formato desglosado. Si los porcentajes de los
+        desgloses y las filas y columnas del formato NO cambiaron desde la ejecución anterior,
+        entonces solamente se aplica la diferencia con los desgloses afectados.
+        """
+        if (
+            estado is None
+            or estado["huella_desgloses"] != huella_desgloses
+            or not formato_relleno.index.equals(estado["formato_relleno"].index)
+            or not formato_relleno.columns.equals(estado["formato_relleno"].columns)
+        ):
+            return desglosar_formato(formato_relleno, desgloses)
+
+        centros_de_costo_cambiados = obtener_centros_de_costo_cambiados(
+            formato_relleno, estado["formato_relleno"]
+        )
+        desgloses_afectados = obtener_desgloses_afectados(desgloses, centros_de_costo_cambiados)
+        if self.analizador.verbose:
+            print(
+                f"- Cambiaron {len(centros_de_costo_cambiados)} centros de costo, se recalculan "
+                f"{len(desgloses_afectados)} de {len(desgloses)} desgloses -\n"
+            )
+
+        return desglosar_cambios(
+            formato_relleno,
+            estado["formato_relleno"],
+            estado["formato_desglosado"],
+            desgloses,
+        )
+
+
+if __name__ == "__main__":
+    verbose = "--verbose" in sys.argv
+    argumentos = [argumento for argumento in sys.argv[1:] if not argumento.startswith("--")]
+
+    archivo_resoluciones = argumentos[0] if argumentos else None
+    analizador = AnalizadorSuministros(archivo_resoluciones=archivo_resoluciones, verbose=verbose)
+    ActualizadorIncremental(analizador).correr()
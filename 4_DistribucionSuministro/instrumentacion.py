@@ -0,0 +1,163 @@
+"""
+Este archivo permite medir cada etapa de los programas (leer, filtrar, traducir, rellenar
+destinos, tabla dinámica, desglose y guardar): tiempo, filas de entrada y salida, y memoria
+máxima utilizada. Las mediciones se agregan a un registro de ejecuciones en formato JSON Lines
+(un JSON por línea), para revisarlas sin usar un profiler.
+
+La memoria máxima se mide solamente si se pide (medir_memoria=True), ya que tracemalloc hace
+varias veces más lenta la ejecución, y los tiempos medidos pasan a ser en su mayoría el costo de
+medir. tracemalloc es uno solo para todo el proceso, por lo que solamente se mide en las etapas
+del hilo que creó el registro que NO están dentro de otra etapa: las etapas anidadas o que
+corren en otros hilos (Ej: las lecturas de lectura.py) quedan sin memoria máxima, y su memoria
+queda en la etapa que las contiene. Si la etapa inició tracemalloc, entonces lo detiene al
+terminar.
+"""
+
+import json
+import time
+import datetime
+import threading
+import tracemalloc
+import contextlib
+
+NOMBRE_REGISTRO_EJECUCIONES = "registro_ejecuciones.jsonl"
+
+
+def contar_filas(objeto):
+    """
+    Esta función permite contar las filas de un DataFrame, o de un diccionario de DataFrames.
+    Si el objeto no tiene filas, entonces retorna None.
+    """
+    if isinstance(objeto, dict):
+        return sum(len(valor) for valor in objeto.values())
+
+    if hasattr(objeto, "__len__"):
+        return len(objeto)
+
+    return None
+
+
+class MedicionEtapa:
+    """
+    Esta clase acumula las mediciones de una etapa. Si una etapa se mide varias veces (Ej: una
+    vez por cada parte de la cartola), entonces se suman los tiempos y las filas, y se guarda
+    la memoria máxima.
+    """
+
+    def __init__(self, etapa):
+        self.etapa = etapa
+        self.segundos = 0.0
+        self.filas_entrada = None
+        self.filas_salida = None
+        self.memoria_maxima_mb = None
+
+    def sumar_filas(self, atributo, filas):
+        """
+        Esta función permite sumar filas de entrada o de salida a la etapa.
+        """
+        if filas is not None:
+            setattr(self, atributo, (getattr(self, atributo) or 0) + filas)
+
+    def a_diccionario(self):
+        """
+        Esta función permite obtener la medición como diccionario, para guardarla.
+        """
+        return {
+            "etapa": self.etapa,
+            "segundos": round(self.segundos, 6),
+            "filas_entrada": self.filas_entrada,
+            "filas_salida": self.filas_salida,
+            "memoria_maxima_mb": self.memoria_maxima_mb,
+        }
+
+
+class RegistroEtapas:
+    """
+    Esta clase permite medir las etapas de una ejecución de un programa, y guardarlas en el
+    registro de ejecuciones.
+    """
+
+    def __init__(self, programa, ruta_registro, medir_memoria=False):
+        self.programa = programa
+        self.ruta_registro = ruta_registro
+        self.medir_memoria = medir_memoria
+        self.mediciones = {}
+        self.hilo_registro = threading.get_ident()
+        self.estado_hilos = threading.local()
+        self.candado = threading.Lock()
+
+    @contextlib.contextmanager
+    def etapa(self, nombre_etapa, filas_entrada=None):
+        """
+        Esta función permite medir una etapa con un bloque with. El bloque recibe una función
+        para informar las filas de salida de la etapa:
+
+        with registro.etapa("filtrar", len(df)) as informar_filas_salida:
+            ...
+            informar_filas_salida(len(df_filtrada))
+        """
+        with self.candado:
+            medicion = self.mediciones.setdefault(nombre_etapa, MedicionEtapa(nombre_etapa))
+            medicion.sumar_filas("filas_entrada", filas_entrada)
+
+        profundidad = getattr(self.estado_hilos, "profundidad", 0)
+        medir_memoria = (
+            self.medir_memoria
+            and profundidad == 0
+            and threading.get_ident() == self.hilo_registro
+        )
+        inicio_tracemalloc = medir_memoria and not tracemalloc.is_tracing()
+        if inicio_tracemalloc:
+            tracemalloc.start()
+        if medir_memoria:
+            tracemalloc.reset_peak()
+
+        def informar_filas_salida(filas_salida):
+            with self.candado:
+                medicion.sumar_filas("filas_salida", filas_salida)
+
+        self.estado_hilos.profundidad = profundidad + 1
+        inicio = time.perf_counter()
+        try:
+            yield informar_filas_salida
+
+        finally:
+            segundos = time.perf_counter() - inicio
+            self.estado_hilos.profundidad = profundidad
+            with self.candado:
+                medicion.segundos += segundos
+                if medir_memoria:
+                    memoria_maxima_mb = tracemalloc.get_traced_memory()[1] / 2**20
+                    medicion.memoria_maxima_mb = round(
+                        max(memoria_maxima_mb, medicion.memoria_maxima_mb or 0), 3
+                    )
+            if inicio_tracemalloc:
+                tracemalloc.stop()
+
+    def medir(self, nombre_etapa, funcion, *args, filas_entrada=None, **kwargs):
+        """
+        Esta función permite medir una etapa que corresponde a una sola función. Las filas de
+        salida se cuentan desde lo que retorna la función.
+        """
+        with self.etapa(nombre_etapa, filas_entrada) as informar_filas_salida:
+            resultado = funcion(*args, **kwargs)
+            informar_filas_salida(contar_filas(resultado))
+
+        return resultado
+
+    def guardar(self):
+        """
+        Esta función permite agregar las etapas medidas al registro de ejecuciones (una línea
+        por etapa), y reiniciar las mediciones.
+        """
+        fecha_ejecucion = datetime.datetime.now().isoformat(timespec="seconds")
+        with self.candado, open(self.ruta_registro, "a", encoding="utf-8") as archivo:
+            for medicion in self.mediciones.values():
+                registro = {
+                    "fecha_ejecucion": fecha_ejecucion,
+                    "programa": self.programa,
+                    **medicion.a_diccionario(),
+                }
+                archivo.write(json.dumps(registro, ensure_ascii=False) + "\n")
+
+        self.mediciones = {}
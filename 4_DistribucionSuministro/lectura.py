@@ -0,0 +1,67 @@
+"""
+Este archivo contiene las funciones de apoyo para leer las entradas de los programas (la
+cartola, el formato 4, la planilla de Farmacia y las hojas de output_producciones.xlsx) a la
+vez. Cada lectura es independiente y pasa la mayor parte del tiempo leyendo el disco o
+descomprimiendo el Excel, por lo que el tiempo total se acerca al de la lectura más lenta y no
+a la suma de todas.
+
+El tiempo máximo es opcional. Los hilos de Python NO se pueden detener desde afuera, por lo que
+una lectura que NO termina a tiempo sigue corriendo en segundo plano: el error se levanta de
+inmediato, pero la lectura sigue usando CPU y memoria, y el programa NO termina hasta que ella
+termine.
+"""
+
+from concurrent.futures import ThreadPoolExecutor, wait
+
+
+class EntradasNoLeidasError(RuntimeError):
+    """
+    Este error se levanta cuando una o más entradas NO se pudieron leer, porque su lectura
+    falló o porque NO terminó dentro del tiempo máximo. El mensaje tiene el error de cada
+    entrada, y quedan en el atributo errores ({nombre_entrada: descripción del error}).
+    """
+
+    def __init__(self, errores):
+        self.errores = errores
+        detalle = "\n".join(f"- {nombre}: {error}" for nombre, error in errores.items())
+        super().__init__(f"NO se pudieron leer {len(errores)} entrada(s):\n{detalle}")
+
+
+def leer_en_paralelo(lecturas, tiempo_maximo=None):
+    """
+    Esta función permite correr varias lecturas independientes a la vez, cada una en un hilo.
+    Recibe un diccionario del tipo {nombre_entrada: (funcion, *argumentos)}, y retorna lo que
+    retorna cada lectura, con los mismos nombres y en el mismo orden.
+
+    Si se entrega un tiempo máximo (en segundos, desde que parten), todas las lecturas lo
+    comparten. Si alguna lectura falla o NO termina a tiempo, entonces se levanta
+    EntradasNoLeidasError con el error de cada una, y NO se espera a las lecturas que siguen
+    corriendo (pero estas NO se detienen, ver arriba). Sin tiempo máximo, se espera a todas.
+    """
+    if not lecturas:
+        return {}
+
+    ejecutor = ThreadPoolExecutor(max_workers=len(lecturas))
+    futuros = {
+        nombre: ejecutor.submit(funcion, *argumentos)
+        for nombre, (funcion, *argumentos) in lecturas.items()
+    }
+    _, pendientes = wait(futuros.values(), timeout=tiempo_maximo)
+    ejecutor.shutdown(wait=not pendientes, cancel_futures=True)
+
+    errores = {}
+    primer_error = None
+    for nombre, futuro in futuros.items():
+        if futuro in pendientes:
+            errores[nombre] = (
+                f"NO terminó en {tiempo_maximo} segundos (sigue corriendo en segundo plano)"
+            )
+        elif futuro.exception() is not None:
+            error = futuro.exception()
+            errores[nombre] = f"{type(error).__name__}: {error}"
+            primer_error = primer_error or error
+
+    if errores:
+        raise EntradasNoLeidasError(errores) from primer_error
+
+    return {nombre: futuro.result() for nombre, futuro in futuros.items()}
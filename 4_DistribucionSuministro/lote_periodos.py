@@ -0,0 +1,154 @@
+"""
+Este archivo permite regenerar los formatos del SIGCOM de varios periodos a la vez. Cada
+periodo tiene su propia carpeta de input, y se corre completo (producciones y suministros, ver
+pipeline.py) en un proceso distinto.
+
+Uso: python lote_periodos.py periodos.csv [cantidad_procesos]
+
+El archivo de periodos tiene las columnas "Mes" y "Carpeta Input", y opcionalmente "Carpeta
+Salida" (por defecto, la misma carpeta de input) y "Archivo Resoluciones". Como los procesos
+NO pueden preguntar destinos por consola, si un periodo NO tiene archivo de resoluciones se
+usan las resoluciones guardadas en su carpeta de input, y si falta alguna el periodo falla.
+
+Si el archivo de periodos tiene las columnas "Año" y "Archivo Historico", los resultados de
+cada periodo se agregan a ese histórico (ver historico.py).
+"""
+
+import os
+import sys
+import time
+import contextlib
+import traceback
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+
+from pipeline import PipelineSIGCOM
+from dimensiones import obtener_centros_de_costo, obtener_items_sigcom
+from maestro_articulos import cargar_indice_maestro, obtener_maestro_articulos
+from resoluciones_destinos import NOMBRE_RESOLUCIONES_DESTINOS
+
+NOMBRE_LOG_PERIODO = "log_lote.txt"
+NOMBRE_RESUMEN_LOTE = "resumen_lote.csv"
+
+
+def inicializar_proceso():
+    """
+    Esta función se corre una vez en cada proceso, antes de correr cualquier periodo. Carga
+    el índice del maestro de artículos (con memory-map, por lo que los procesos comparten las
+    mismas páginas en memoria) y las dimensiones del SIGCOM.
+    """
+    obtener_maestro_articulos()
+    obtener_centros_de_costo()
+    obtener_items_sigcom()
+
+
+def correr_periodo(periodo):
+    """
+    Esta función permite correr el flujo completo de un periodo. Lo que se imprime en consola
+    se guarda en log_lote.txt, en la carpeta de salida del periodo.
+
+    Retorna un diccionario con el resultado del periodo. Si el periodo falla, entonces el
+    error se entrega en el resultado en vez de levantarse.
+    """
+    carpeta_salida = periodo["carpeta_salida"]
+    os.makedirs(carpeta_salida, exist_ok=True)
+
+    resultado = {"mes": periodo["mes"], "carpeta_input": periodo["carpeta_input"]}
+    inicio = time.perf_counter()
+    with open(os.path.join(carpeta_salida, NOMBRE_LOG_PERIODO), "w", encoding="utf-8") as log:
+        with contextlib.redirect_stdout(log):
+            try:
+                pipeline = PipelineSIGCOM(
+                    periodo["mes"],
+                    carpeta_input=periodo["carpeta_input"],
+                    carpeta_salida=carpeta_salida,
+                    archivo_resoluciones=periodo["archivo_resoluciones"],
+                    archivo_historico=periodo["archivo_historico"],
+                    anio=periodo["anio"],
+                )
+                resultados = pipeline.correr(guardar_excel=True)
+
+                resultado["estado"] = "OK"
+                resultado["error"] = None
+                resultado["formato_desglosado"] = resultados["formato_desglosado"]
+
+            except Exception as error:
+                traceback.print_exc(file=log)
+                resultado["estado"] = "ERROR"
+                resultado["error"] = f"{type(error).__name__}: {error}"
+                resultado["formato_desglosado"] = None
+
+    resultado["segundos"] = time.perf_counter() - inicio
+
+    return resultado
+
+
+def leer_periodos(ruta_periodos):
+    """
+    Esta función permite leer el archivo de periodos, y completar la carpeta de salida y el
+    archivo de resoluciones de cada periodo. El histórico y el año son opcionales.
+    """
+    df_periodos = pd.read_csv(ruta_periodos, dtype=str, keep_default_na=False)
+
+    periodos = []
+    for _, fila in df_periodos.iterrows():
+        carpeta_input = fila["Carpeta Input"]
+        periodos.append(
+            {
+                "mes": fila["Mes"],
+                "carpeta_input": carpeta_input,
+                "carpeta_salida": fila.get("Carpeta Salida") or carpeta_input,
+                "archivo_resoluciones": fila.get("Archivo Resoluciones")
+                or os.path.join(carpeta_input, NOMBRE_RESOLUCIONES_DESTINOS),
+                "archivo_historico": fila.get("Archivo Historico") or None,
+                "anio": fila.get("Año") or None,
+            }
+        )
+
+    return periodos
+
+
+def correr_lote(periodos, cantidad_procesos=None):
+    """
+    Esta función permite correr varios periodos en paralelo, cada uno en un proceso. Antes de
+    partir, se compila el índice del maestro de artículos (si hace falta), para que los
+    procesos solamente lo lean.
+
+    Retorna una lista con el resultado de cada periodo, en el mismo orden de los periodos.
+    """
+    cargar_indice_maestro()
+
+    cantidad_procesos = min(len(periodos), cantidad_procesos or os.cpu_count() or 1)
+    with ProcessPoolExecutor(
+        max_workers=cantidad_procesos, initializer=inicializar_proceso
+    ) as ejecutor:
+        return list(ejecutor.map(correr_periodo, periodos))
+
+
+def resumir_lote(resultados):
+    """
+    Esta función permite obtener un resumen del lote, con el estado, el error (si hubo uno) y
+    el tiempo de cada periodo.
+    """
+    return pd.DataFrame(
+        [
+            {
+                "Mes": resultado["mes"],
+                "Carpeta Input": resultado["carpeta_input"],
+                "Estado": resultado["estado"],
+                "Segundos": round(resultado["segundos"], 2),
+                "Error": resultado["error"] or "",
+            }
+            for resultado in resultados
+        ]
+    )
+
+
+if __name__ == "__main__":
+    cantidad_procesos = int(sys.argv[2]) if len(sys.argv) > 2 else None
+    resultados_lote = correr_lote(leer_periodos(sys.argv[1]), cantidad_procesos)
+
+    resumen_lote = resumir_lote(resultados_lote)
+    resumen_lote.to_csv(NOMBRE_RESUMEN_LOTE, index=False)
+    print(resumen_lote.to_markdown(index=False))
@@ -0,0 +1,510 @@
+"""
+Este archivo permite compilar el maestro de artículos (maestro_articulos_sigcom.json) en un
+índice columnar en disco, y cargarlo de forma perezosa la primera vez que se necesite.
+
+El índice guarda los códigos de artículo ordenados, y cada columna utilizada por los programas
+como un arreglo de enteros que apunta a la lista de categorías de esa columna. Los arreglos se
+leen con memory-map, y el índice se vuelve a compilar automáticamente cuando cambia el JSON. Las
+categorías de cada columna se guardan en su propio archivo, y se leen solamente cuando se piden
+(Ej: las descripciones, que solamente se usan para las sugerencias).
+
+Los artículos nuevos o corregidos NO se escriben en el JSON: se agregan al final del archivo de
+cambios (maestro_articulos_cambios.jsonl, una línea por artículo). Al cargar el índice, los
+cambios quedan en un índice pequeño aparte que se revisa primero, por lo que NO se copian los
+arreglos del índice compilado. Cuando el archivo de cambios crece demasiado, se
+compacta: los cambios se escriben en el JSON y el archivo de cambios se vacía.
+
+Uso:
+- python maestro_articulos.py agregar articulos_nuevos.csv
+- python maestro_articulos.py compactar
+"""
+
+import os
+import sys
+import json
+import functools
+
+import numpy as np
+import pandas as pd
+
+from cache import calcular_huella
+
+CARPETA_MODULO = os.path.dirname(os.path.abspath(__file__))
+RUTA_MAESTRO_ARTICULOS = os.path.join(CARPETA_MODULO, "maestro_articulos_sigcom.json")
+CARPETA_INDICE_MAESTRO = os.path.join(CARPETA_MODULO, "indice_maestro_articulos")
+
+VERSION_INDICE = 4
+COLUMNAS_INDICE = ["Total_SIGCOM", "Item SIGFE", "Descripción"]
+NOMBRE_METADATOS = "metadatos.json"
+
+RUTA_CAMBIOS_MAESTRO = os.path.join(CARPETA_MODULO, "maestro_articulos_cambios.jsonl")
+COLUMNA_CODIGO_CAMBIOS = "Codigo Articulo"
+MAXIMO_CAMBIOS_SIN_COMPACTAR = 1000
+
+
+class CategoriasMaestro(dict):
+    """
+    Esta clase representa las categorías de las columnas del índice ({columna: arreglo de
+    categorías}, con NaN al final para los valores vacíos). Las categorías de cada columna se
+    cargan la primera vez que se piden, y después de ellas van las categorías nuevas de los
+    cambios pendientes.
+    """
+
+    def __init__(self, cargar_categorias, cantidades_categorias, categorias_cambios=None):
+        super().__init__()
+        self.cargar_categorias = cargar_categorias
+        self.cantidades_categorias = cantidades_categorias
+        self.categorias_cambios = categorias_cambios or {}
+
+    def con_cambios(self, categorias_cambios):
+        """
+        Esta función permite obtener las mismas categorías, con las categorías nuevas de los
+        cambios pendientes ({columna: lista de valores nuevos}) al final.
+        """
+        return CategoriasMaestro(
+            self.cargar_categorias, self.cantidades_categorias, categorias_cambios
+        )
+
+    def __missing__(self, columna):
+        valores = np.asarray(self.cargar_categorias(columna)).astype(object)
+        cambios = np.array(self.categorias_cambios.get(columna, []), dtype=object)
+        self[columna] = np.concatenate([valores, cambios, [np.nan]]).astype(object)
+        return self[columna]
+
+
+def buscar_codigos(codigos_ordenados, codigos_buscados):
+    """
+    Esta función permite obtener la posición de cada código buscado dentro de un arreglo de
+    códigos ordenados (búsqueda binaria). Los códigos que NO están quedan con la posición -1.
+    """
+    if not len(codigos_ordenados):
+        return np.full(len(codigos_buscados), -1, dtype=np.int64)
+
+    posiciones = np.searchsorted(codigos_ordenados, codigos_buscados)
+    posiciones = np.minimum(posiciones, len(codigos_ordenados) - 1)
+    encontrados = codigos_ordenados[posiciones] == codigos_buscados
+
+    return np.where(encontrados, posiciones, -1)
+
+
+class MaestroArticulos:
+    """
+    Esta clase representa el índice compilado del maestro de artículos. Permite traducir
+    columnas completas de códigos de artículo sin construir los diccionarios del JSON.
+
+    Los cambios pendientes ({codigo_articulo: {columna: valor}}) NO modifican los arreglos del
+    índice (que siguen en memory-map): quedan en un índice pequeño aparte, ordenado por
+    código, que se revisa antes que el índice compilado. Las posiciones 0 a N - 1 son las del
+    índice compilado, y las posiciones N a N + M - 1 son las de los M artículos cambiados.
+    """
+
+    def __init__(self, codigos, columnas, categorias, cambios=None):
+        self.codigos = codigos
+        self.columnas = columnas
+        if not isinstance(categorias, CategoriasMaestro):
+            listas_categorias = {
+                columna: list(valores) for columna, valores in categorias.items()
+            }
+            categorias = CategoriasMaestro(
+                lambda columna: np.array(listas_categorias[columna], dtype=object),
+                {columna: len(valores) for columna, valores in listas_categorias.items()},
+            )
+        self.categorias_base = categorias
+
+        self.cambios = cambios or {}
+        self.codigos_cambios = np.array(sorted(self.cambios), dtype=str)
+        posiciones_base = buscar_codigos(self.codigos, self.codigos_cambios)
+        self.posiciones_reemplazadas = posiciones_base[posiciones_base >= 0]
+
+        self.columnas_cambios = {}
+        categorias_cambios = {}
+        for columna, codigos_columna in self.columnas.items():
+            self.columnas_cambios[columna], categorias_cambios[columna] = self.preparar_cambios(
+                columna, codigos_columna, posiciones_base
+            )
+        self.categorias = categorias.con_cambios(categorias_cambios)
+
+    def preparar_cambios(self, columna, codigos_columna, posiciones_base):
+        """
+        Esta función permite obtener los valores de la columna para los artículos cambiados.
+        Los artículos que ya están en el índice parten con su valor actual, y solamente
+        cambian si la columna viene en el cambio. Los valores nuevos se agregan después de las
+        categorías del índice.
+
+        Retorna los códigos de la columna (alineados con codigos_cambios) y la lista de
+        categorías nuevas.
+        """
+        cantidad_categorias = self.categorias_base.cantidades_categorias[columna]
+        encontrados = posiciones_base >= 0
+        valores_columna = np.full(len(posiciones_base), -1, dtype=np.int32)
+        valores_columna[encontrados] = codigos_columna[posiciones_base[encontrados]]
+
+        categorias_nuevas = {}
+        for i, codigo in enumerate(self.codigos_cambios):
+            articulo = self.cambios[codigo]
+            if columna not in articulo:
+                continue
+
+            valor = articulo[columna]
+            if valor is None:
+                valores_columna[i] = -1
+                continue
+
+            categorias_nuevas.setdefault(valor, len(categorias_nuevas))
+            valores_columna[i] = cantidad_categorias + categorias_nuevas[valor]
+
+        return valores_columna, list(categorias_nuevas)
+
+    def obtener_posiciones(self, codigos_articulo):
+        """
+        Esta función permite obtener la posición de cada código de artículo dentro del índice.
+        Cada código distinto se busca una sola vez (búsqueda binaria), primero entre los
+        artículos cambiados. Los códigos que NO están en el maestro quedan con la posición -1.
+        """
+        codigos_factorizados, codigos_unicos = pd.factorize(codigos_articulo)
+        codigos_unicos = np.asarray(codigos_unicos).astype(str)
+
+        posiciones_cambios = buscar_codigos(self.codigos_cambios, codigos_unicos)
+        posiciones_unicas = np.where(
+            posiciones_cambios >= 0,
+            len(self.codigos) + posiciones_cambios,
+            buscar_codigos(self.codigos, codigos_unicos),
+        )
+        posiciones_unicas = np.append(posiciones_unicas, -1)
+
+        return posiciones_unicas[codigos_factorizados]
+
+    def obtener_codigos_columna(self, posiciones, columna):
+        """
+        Esta función permite obtener, para cada posición, el código de la columna pedida
+        (posición dentro de sus categorías). Las posiciones -1 y los valores vacíos del
+        maestro quedan con el código -1.
+        """
+        posiciones = np.asarray(posiciones)
+        cantidad_base = len(self.codigos)
+        codigos_columna = np.full(len(posiciones), -1, dtype=np.int32)
+
+        en_base = (posiciones >= 0) & (posiciones < cantidad_base)
+        codigos_columna[en_base] = self.columnas[columna][posiciones[en_base]]
+
+        en_cambios = posiciones >= cantidad_base
+        codigos_columna[en_cambios] = self.columnas_cambios[columna][
+            posiciones[en_cambios] - cantidad_base
+        ]
+
+        return codigos_columna
+
+    def obtener_codigos_articulo(self, posiciones):
+        """
+        Esta función permite obtener el código de artículo de cada posición (que NO puede ser
+        -1).
+        """
+        posiciones = np.asarray(posiciones)
+        cantidad_base = len(self.codigos)
+
+        en_cambios = posiciones >= cantidad_base
+        codigos_articulo = np.empty(len(posiciones), dtype=object)
+        codigos_articulo[~en_cambios] = self.codigos[posiciones[~en_cambios]]
+        codigos_articulo[en_cambios] = self.codigos_cambios[posiciones[en_cambios] - cantidad_base]
+
+        return codigos_articulo
+
+    def obtener_posiciones_vigentes(self):
+        """
+        Esta función permite obtener las posiciones de todos los artículos del maestro: las
+        del índice compilado que NO fueron reemplazadas por un cambio, y las de los artículos
+        cambiados.
+        """
+        vigentes = np.ones(len(self.codigos), dtype=bool)
+        vigentes[self.posiciones_reemplazadas] = False
+
+        return np.concatenate(
+            [
+                np.flatnonzero(vigentes),
+                len(self.codigos) + np.arange(len(self.codigos_cambios)),
+            ]
+        )
+
+    def obtener_valores(self, posiciones, columna):
+        """
+        Esta función permite obtener el valor de la columna pedida del maestro (Ej:
+        "Total_SIGCOM") para cada posición. Las posiciones -1 y los valores vacíos del
+        maestro quedan como NaN.
+        """
+        return self.categorias[columna][self.obtener_codigos_columna(posiciones, columna)]
+
+    def obtener_codigos(self, posiciones, columna, dimension):
+        """
+        Esta función permite obtener, para cada posición, el código de la dimensión (ver
+        dimensiones.py) que corresponde al valor de la columna pedida del maestro. Las
+        posiciones -1 y los valores vacíos del maestro quedan con el código -1.
+        """
+        codigos_dimension = dimension.codificar(self.categorias[columna])
+        return codigos_dimension[self.obtener_codigos_columna(posiciones, columna)]
+
+    def aplicar_cambios(self, cambios):
+        """
+        Esta función permite obtener un nuevo índice con los cambios aplicados
+        ({codigo_articulo: {columna: valor}}), sobre los cambios que ya tenía. Los códigos que
+        ya están en el maestro solamente cambian las columnas entregadas, y los códigos nuevos
+        se agregan (las columnas NO entregadas quedan vacías). Los arreglos del índice
+        compilado NO se copian.
+        """
+        cambios_totales = {codigo: dict(articulo) for codigo, articulo in self.cambios.items()}
+        for codigo, articulo in cambios.items():
+            cambios_totales.setdefault(codigo, {}).update(articulo)
+
+        return MaestroArticulos(
+            self.codigos, self.columnas, self.categorias_base, cambios_totales
+        )
+
+
+def compilar_indice_maestro(
+    ruta_maestro=RUTA_MAESTRO_ARTICULOS, carpeta_indice=CARPETA_INDICE_MAESTRO
+):
+    """
+    Esta función permite compilar el índice columnar a partir del JSON del maestro de
+    artículos. Las categorías de cada columna se guardan en su propio archivo (.npy de texto),
+    y NO en los metadatos. Los metadatos se escriben al final, por lo que un índice a medio
+    escribir nunca se considera vigente.
+    """
+    with open(ruta_maestro, encoding="utf-8") as file:
+        maestro = json.load(file)
+
+    os.makedirs(carpeta_indice, exist_ok=True)
+
+    codigos = np.array(sorted(maestro), dtype=str)
+    np.save(os.path.join(carpeta_indice, "codigos.npy"), codigos)
+
+    archivos_columnas = {}
+    archivos_categorias = {}
+    cantidades_categorias = {}
+    for i, columna in enumerate(COLUMNAS_INDICE):
+        valores = pd.Series([maestro[codigo].get(columna) for codigo in codigos], dtype=object)
+        codigos_columna, categorias_columna = pd.factorize(valores)
+
+        nombre_archivo = f"columna_{i}.npy"
+        np.save(os.path.join(carpeta_indice, nombre_archivo), codigos_columna.astype(np.int32))
+        archivos_columnas[columna] = nombre_archivo
+
+        nombre_archivo = f"categorias_{i}.npy"
+        np.save(
+            os.path.join(carpeta_indice, nombre_archivo),
+            np.array([str(valor) for valor in categorias_columna], dtype=str),
+        )
+        archivos_categorias[columna] = nombre_archivo
+        cantidades_categorias[columna] = len(categorias_columna)
+
+    estado = os.stat(ruta_maestro)
+    metadatos = {
+        "version": VERSION_INDICE,
+        "huella": calcular_huella(ruta_maestro),
+        "tamano": estado.st_size,
+        "mtime_ns": estado.st_mtime_ns,
+        "archivos_columnas": archivos_columnas,
+        "archivos_categorias": archivos_categorias,
+        "cantidades_categorias": cantidades_categorias,
+    }
+    with open(os.path.join(carpeta_indice, NOMBRE_METADATOS), "w", encoding="utf-8") as file:
+        json.dump(metadatos, file, ensure_ascii=False)
+
+    return metadatos
+
+
+def leer_metadatos_indice(carpeta_indice=CARPETA_INDICE_MAESTRO):
+    """
+    Esta función permite leer los metadatos del índice. Si el índice no existe, retorna None.
+    """
+    ruta_metadatos = os.path.join(carpeta_indice, NOMBRE_METADATOS)
+    if not os.path.exists(ruta_metadatos):
+        return None
+
+    with open(ruta_metadatos, encoding="utf-8") as file:
+        return json.load(file)
+
+
+def indice_esta_vigente(metadatos, ruta_maestro=RUTA_MAESTRO_ARTICULOS):
+    """
+    Esta función permite saber si el índice corresponde al JSON actual. Primero compara el
+    tamaño y la fecha de modificación, y solamente si cambiaron calcula la huella del JSON.
+    """
+    if metadatos is None or metadatos.get("version") != VERSION_INDICE:
+        return False
+
+    if set(metadatos["archivos_columnas"]) != set(COLUMNAS_INDICE):
+        return False
+
+    estado = os.stat(ruta_maestro)
+    if (metadatos["tamano"], metadatos["mtime_ns"]) == (estado.st_size, estado.st_mtime_ns):
+        return True
+
+    return metadatos["huella"] == calcular_huella(ruta_maestro)
+
+
+def cargar_indice_maestro(
+    ruta_maestro=RUTA_MAESTRO_ARTICULOS,
+    carpeta_indice=CARPETA_INDICE_MAESTRO,
+    ruta_cambios=RUTA_CAMBIOS_MAESTRO,
+):
+    """
+    Esta función permite cargar el índice del maestro de artículos con memory-map. Si el
+    índice no existe, o si el JSON cambió, entonces lo compila nuevamente. Si hay cambios
+    pendientes, quedan en el índice de cambios (sin compilar el índice de nuevo).
+    """
+    metadatos = leer_metadatos_indice(carpeta_indice)
+    if not indice_esta_vigente(metadatos, ruta_maestro):
+        metadatos = compilar_indice_maestro(ruta_maestro, carpeta_indice)
+
+    codigos = np.load(os.path.join(carpeta_indice, "codigos.npy"), mmap_mode="r")
+    columnas = {
+        columna: np.load(os.path.join(carpeta_indice, nombre_archivo), mmap_mode="r")
+        for columna, nombre_archivo in metadatos["archivos_columnas"].items()
+    }
+
+    rutas_categorias = {
+        columna: os.path.join(carpeta_indice, nombre_archivo)
+        for columna, nombre_archivo in metadatos["archivos_categorias"].items()
+    }
+    categorias = CategoriasMaestro(
+        lambda columna: np.load(rutas_categorias[columna]),
+        metadatos["cantidades_categorias"],
+    )
+
+    return MaestroArticulos(codigos, columnas, categorias, leer_cambios_maestro(ruta_cambios))
+
+
+def leer_cambios_maestro(ruta_cambios=RUTA_CAMBIOS_MAESTRO):
+    """
+    Esta función permite leer el archivo de cambios del maestro. Si un código aparece en
+    varias líneas, las columnas de las líneas posteriores reemplazan a las anteriores.
+
+    Retorna un diccionario {codigo_articulo: {columna: valor}}.
+    """
+    cambios = {}
+    if not os.path.exists(ruta_cambios):
+        return cambios
+
+    with open(ruta_cambios, encoding="utf-8") as file:
+        for linea in file:
+            if not linea.strip():
+                continue
+
+            articulo = json.loads(linea)
+            codigo = articulo.pop(COLUMNA_CODIGO_CAMBIOS)
+            cambios.setdefault(codigo, {}).update(articulo)
+
+    return cambios
+
+
+def leer_articulos_csv(ruta_csv):
+    """
+    Esta función permite leer un CSV de artículos nuevos o corregidos. Debe tener la columna
+    "Codigo Articulo", y las columnas del maestro que se quieran cambiar. Las celdas vacías NO
+    cambian el valor del maestro.
+    """
+    df_articulos = pd.read_csv(ruta_csv, dtype=str, keep_default_na=False)
+
+    articulos = {}
+    for articulo in df_articulos.to_dict("records"):
+        codigo = articulo.pop(COLUMNA_CODIGO_CAMBIOS)
+        articulos[codigo] = {columna: valor for columna, valor in articulo.items() if valor}
+
+    return articulos
+
+
+def agregar_articulos(
+    articulos,
+    ruta_cambios=RUTA_CAMBIOS_MAESTRO,
+    ruta_maestro=RUTA_MAESTRO_ARTICULOS,
+    maximo_cambios=MAXIMO_CAMBIOS_SIN_COMPACTAR,
+):
+    """
+    Esta función permite agregar artículos nuevos o corregidos ({codigo_articulo: {columna:
+    valor}}) al final del archivo de cambios, sin reescribir el JSON del maestro. Si el
+    archivo de cambios supera "maximo_cambios" líneas, entonces se compacta.
+    """
+    with open(ruta_cambios, "a", encoding="utf-8") as file:
+        for codigo, articulo in articulos.items():
+            file.write(json.dumps({COLUMNA_CODIGO_CAMBIOS: codigo, **articulo}, ensure_ascii=False))
+            file.write("\n")
+
+    with open(ruta_cambios, encoding="utf-8") as file:
+        cantidad_cambios = sum(1 for linea in file if linea.strip())
+
+    if cantidad_cambios > maximo_cambios:
+        compactar_maestro(ruta_maestro, ruta_cambios)
+
+    limpiar_caches_maestro()
+
+
+def leer_maestro_completo(ruta_maestro=RUTA_MAESTRO_ARTICULOS, ruta_cambios=RUTA_CAMBIOS_MAESTRO):
+    """
+    Esta función permite leer el JSON del maestro de artículos con los cambios pendientes
+    aplicados. Retorna un diccionario {codigo_articulo: {columna: valor}}.
+    """
+    with open(ruta_maestro, encoding="utf-8") as file:
+        maestro = json.load(file)
+
+    for codigo, articulo in leer_cambios_maestro(ruta_cambios).items():
+        maestro.setdefault(codigo, {}).update(articulo)
+
+    return maestro
+
+
+def compactar_maestro(ruta_maestro=RUTA_MAESTRO_ARTICULOS, ruta_cambios=RUTA_CAMBIOS_MAESTRO):
+    """
+    Esta función permite escribir los cambios pendientes en el JSON del maestro de artículos,
+    y vaciar el archivo de cambios. El JSON se escribe en un archivo temporal y luego se
+    reemplaza, por lo que un JSON a medio escribir nunca reemplaza al anterior.
+    """
+    if not leer_cambios_maestro(ruta_cambios):
+        return
+
+    maestro = leer_maestro_completo(ruta_maestro, ruta_cambios)
+
+    ruta_temporal = f"{ruta_maestro}.tmp"
+    with open(ruta_temporal, "w", encoding="utf-8") as file:
+        json.dump(maestro, file, ensure_ascii=False, indent=1, separators=(",", ":"))
+    os.replace(ruta_temporal, ruta_maestro)
+
+    os.remove(ruta_cambios)
+    limpiar_caches_maestro()
+
+
+def limpiar_caches_maestro():
+    """
+    Esta función permite olvidar el índice del maestro cargado y lo que se construyó a partir
+    de él: la dimensión de ítems SIGCOM (dimensiones.py) y el índice de artículos para las
+    sugerencias (sugerencias.py). Se vuelven a construir la próxima vez que se pidan.
+    """
+    # Se importan aquí porque ambos módulos importan este archivo.
+    import dimensiones
+    import sugerencias
+
+    obtener_maestro_articulos.cache_clear()
+    dimensiones.obtener_items_sigcom.cache_clear()
+    sugerencias.obtener_indice_articulos.cache_clear()
+
+
+def obtener_rutas_maestro(ruta_maestro=RUTA_MAESTRO_ARTICULOS, ruta_cambios=RUTA_CAMBIOS_MAESTRO):
+    """
+    Esta función entrega los archivos que definen el maestro de artículos: el JSON y, si
+    existe, el archivo de cambios. Sirve para calcular la huella de los cachés.
+    """
+    return [ruta for ruta in [ruta_maestro, ruta_cambios] if os.path.exists(ruta)]
+
+
+@functools.lru_cache(maxsize=None)
+def obtener_maestro_articulos():
+    """
+    Esta función entrega el índice del maestro de artículos. Se carga la primera vez que se
+    pide, y las siguientes veces se reutiliza el mismo índice.
+    """
+    return cargar_indice_maestro()
+
+
+if __name__ == "__main__":
+    if sys.argv[1] == "agregar":
+        agregar_articulos(leer_articulos_csv(sys.argv[2]))
+    elif sys.argv[1] == "compactar":
+        compactar_maestro()
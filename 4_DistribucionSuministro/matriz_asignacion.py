@@ -0,0 +1,211 @@
+"""
+Este archivo permite expresar los desgloses de DICCIONARIO_UNIDADES_A_DESGLOSAR como una matriz
+de asignación dispersa (centro de costo de origen -> centro de costo de destino), y
+redistribuir el formato 4 completo con un solo producto de matrices.
+
+Cada desglose reemplaza la fila del centro de costo a desglosar por su porcentaje propio, y
+suma a cada subunidad su porcentaje del total. Los desgloses se aplican en orden, por lo que la
+matriz final es el producto de las matrices de cada desglose.
+"""
+
+import numpy as np
+import pandas as pd
+from scipy import sparse
+
+
+def construir_matriz_desglose(posiciones, cc_a_desglosar, porcentajes):
+    """
+    Esta función permite construir la matriz de un desglose. Es la identidad, salvo la columna
+    del centro de costo a desglosar, que contiene el porcentaje de cada subunidad. Si el centro
+    de costo a desglosar NO es una de sus subunidades, entonces conserva su monto.
+    """
+    cantidad_cc = len(posiciones)
+    origen = posiciones[cc_a_desglosar]
+
+    otras_filas = np.delete(np.arange(cantidad_cc), origen)
+    subunidades = [cc for cc in porcentajes.index if cc != cc_a_desglosar]
+
+    filas = np.concatenate(
+        [otras_filas, [origen], [posiciones[cc] for cc in subunidades]]
+    ).astype(int)
+    columnas = np.concatenate(
+        [otras_filas, [origen], np.full(len(subunidades), origen)]
+    ).astype(int)
+    valores = np.concatenate(
+        [
+            np.ones(len(otras_filas)),
+            [porcentajes.get(cc_a_desglosar, 1.0)],
+            porcentajes[subunidades].to_numpy(dtype=float),
+        ]
+    )
+
+    return sparse.csr_matrix((valores, (filas, columnas)), shape=(cantidad_cc, cantidad_cc))
+
+
+def construir_matriz_asignacion(centros_de_costo, desgloses):
+    """
+    Esta función permite construir la matriz de asignación de todos los desgloses. Recibe los
+    centros de costo (filas del formato) y un diccionario ordenado del tipo
+    {cc_a_desglosar: Series de porcentajes por subunidad}.
+
+    Retorna la matriz de asignación, y su estructura (la misma matriz, pero con un 1 en cada
+    peso definido), que sirve para saber qué celdas reciben algún monto.
+    """
+    posiciones = pd.Series(np.arange(len(centros_de_costo)), index=centros_de_costo)
+
+    matriz = sparse.identity(len(centros_de_costo), format="csr")
+    estructura = sparse.identity(len(centros_de_costo), format="csr")
+    for cc_a_desglosar, porcentajes in desgloses.items():
+        matriz_desglose = construir_matriz_desglose(posiciones, cc_a_desglosar, porcentajes)
+        estructura_desglose = matriz_desglose.copy()
+        estructura_desglose.data[:] = 1.0
+
+        matriz = matriz_desglose @ matriz
+        estructura = estructura_desglose @ estructura
+
+    return matriz, estructura
+
+
+def desglosar_formato(formato, desgloses):
+    """
+    Esta función permite redistribuir el formato 4 completo según los desgloses, con un solo
+    producto de matrices. Las subunidades que NO estén en el formato se agregan al final.
+
+    Las celdas que NO reciben monto de ninguna celda con datos quedan vacías (NaN), igual que
+    en el formato original.
+    """
+    subunidades = pd.Index(
+        [cc for porcentajes in desgloses.values() for cc in porcentajes.index]
+        + list(desgloses)
+    ).unique()
+    filas_nuevas = subunidades.difference(formato.index, sort=False)
+    if len(filas_nuevas):
+        formato = formato.reindex(formato.index.append(filas_nuevas).rename(formato.index.name))
+
+    matriz, estructura = construir_matriz_asignacion(formato.index, desgloses)
+
+    valores = formato.to_numpy(dtype=float)
+    con_datos = ~np.isnan(valores)
+
+    desglosado = matriz @ np.where(con_datos, valores, 0.0)
+    recibe_monto = (estructura @ con_datos.astype(float)) > 0
+
+    return pd.DataFrame(
+        np.where(recibe_monto, desglosado, np.nan), index=formato.index, columns=formato.columns
+    )
+
+
+def desglosar_escenarios(formato, desgloses_escenarios):
+    """
+    Esta función permite redistribuir el formato 4 completo según varios escenarios de
+    desglose a la vez. Recibe un diccionario ordenado del tipo {cc_a_desglosar: DataFrame de
+    porcentajes (subunidades x escenarios)}, con los mismos escenarios en todos los desgloses.
+
+    Los montos de todos los escenarios se guardan en un solo arreglo (escenarios x centros de
+    costo x ítems), y cada desglose se aplica a todos los escenarios con una sola operación.
+    Las celdas vacías son las mismas que en desglosar_formato, ya que la estructura de los
+    desgloses NO depende de los porcentajes.
+
+    Retorna un DataFrame con un índice (escenario, centro de costo) y una columna por ítem.
+    """
+    escenarios = next(iter(desgloses_escenarios.values())).columns
+    desgloses_estructura = {
+        cc_a_desglosar: porcentajes.iloc[:, 0]
+        for cc_a_desglosar, porcentajes in desgloses_escenarios.items()
+    }
+
+    subunidades = pd.Index(
+        [cc for porcentajes in desgloses_estructura.values() for cc in porcentajes.index]
+        + list(desgloses_estructura)
+    ).unique()
+    filas_nuevas = subunidades.difference(formato.index, sort=False)
+    if len(filas_nuevas):
+        formato = formato.reindex(formato.index.append(filas_nuevas).rename(formato.index.name))
+
+    posiciones = pd.Series(np.arange(len(formato.index)), index=formato.index)
+    valores = formato.to_numpy(dtype=float)
+    con_datos = ~np.isnan(valores)
+
+    montos = np.repeat(np.where(con_datos, valores, 0.0)[np.newaxis], len(escenarios), axis=0)
+    for cc_a_desglosar, porcentajes in desgloses_escenarios.items():
+        origen = posiciones[cc_a_desglosar]
+        subunidades = [cc for cc in porcentajes.index if cc != cc_a_desglosar]
+
+        monto_origen = montos[:, origen, :].copy()
+        pesos_subunidades = porcentajes.loc[subunidades].to_numpy(dtype=float).T
+        montos[:, posiciones[subunidades].to_numpy(), :] += (
+            pesos_subunidades[:, :, np.newaxis] * monto_origen[:, np.newaxis, :]
+        )
+
+        if cc_a_desglosar in porcentajes.index:
+            peso_origen = porcentajes.loc[cc_a_desglosar].to_numpy(dtype=float)
+            montos[:, origen, :] = peso_origen[:, np.newaxis] * monto_origen
+
+    _, estructura = construir_matriz_asignacion(formato.index, desgloses_estructura)
+    recibe_monto = (estructura @ con_datos.astype(float)) > 0
+    montos = np.where(recibe_monto[np.newaxis], montos, np.nan)
+
+    return pd.DataFrame(
+        montos.reshape(-1, montos.shape[2]),
+        index=pd.MultiIndex.from_product(
+            [escenarios, formato.index], names=["Escenario", formato.index.name]
+        ),
+        columns=formato.columns,
+    )
+
+
+def obtener_centros_de_costo_cambiados(formato, formato_previo):
+    """
+    Esta función permite obtener los centros de costo (filas) con algún monto distinto entre
+    dos formatos con las mismas filas y columnas. Las celdas vacías se consideran 0.
+    """
+    diferencia = formato.fillna(0.0) - formato_previo.fillna(0.0)
+    return diferencia.index[(diferencia != 0).any(axis=1)]
+
+
+def obtener_desgloses_afectados(desgloses, centros_de_costo_cambiados):
+    """
+    Esta función permite obtener los desgloses que se ven afectados por un cambio en los
+    montos de algunos centros de costo. Un desglose se ve afectado si su centro de costo a
+    desglosar cambió, o si recibe monto de un desglose anterior que se vio afectado.
+
+    Retorna un diccionario ordenado con los desgloses afectados.
+    """
+    centros_de_costo_cambiados = set(centros_de_costo_cambiados)
+
+    desgloses_afectados = {}
+    for cc_a_desglosar, porcentajes in desgloses.items():
+        if cc_a_desglosar in centros_de_costo_cambiados:
+            desgloses_afectados[cc_a_desglosar] = porcentajes
+            centros_de_costo_cambiados.update(porcentajes.index)
+
+    return desgloses_afectados
+
+
+def desglosar_cambios(formato, formato_previo, desglosado_previo, desgloses):
+    """
+    Esta función permite actualizar un formato desglosado anteriormente, cuando solamente
+    cambiaron los montos de algunos centros de costo. Como el desglose es lineal, el nuevo
+    desglose es el desglose anterior más el desglose de la diferencia, y la diferencia
+    solamente pasa por los desgloses afectados (ver obtener_desgloses_afectados).
+
+    El formato nuevo y el anterior deben tener las mismas filas y columnas. Si no, entonces
+    se debe usar desglosar_formato.
+    """
+    centros_de_costo_cambiados = obtener_centros_de_costo_cambiados(formato, formato_previo)
+    desgloses_afectados = obtener_desgloses_afectados(desgloses, centros_de_costo_cambiados)
+
+    diferencia = formato.fillna(0.0) - formato_previo.fillna(0.0)
+    diferencia = diferencia.reindex(desglosado_previo.index, fill_value=0.0)
+    matriz_cambios, _ = construir_matriz_asignacion(desglosado_previo.index, desgloses_afectados)
+    desglosado = desglosado_previo.fillna(0.0).to_numpy() + matriz_cambios @ diferencia.to_numpy()
+
+    formato = formato.reindex(desglosado_previo.index)
+    _, estructura = construir_matriz_asignacion(formato.index, desgloses)
+    recibe_monto = (estructura @ formato.notna().to_numpy(dtype=float)) > 0
+
+    return pd.DataFrame(
+        np.where(recibe_monto, desglosado, np.nan),
+        index=desglosado_previo.index,
+        columns=desglosado_previo.columns,
+    )
@@ -20,61 +20,121 @@ from constantes import (
     PORCENTAJES_A_PROCEDIMIENTOS_CARDIOLOGIA,
     PORCENTAJES_A_PROCEDIMIENTOS_ONCOLOGIA,
     VALOR_CONSULTAS_ADMIN_SUMINISTROS,
+    REGLAS_PRODUCCIONES_SIGCOM,
+    MESES,
 )
+from dimensiones import obtener_centros_de_costo
+from escritura import escribir_en_paralelo, escribir_libro
+from instrumentacion import NOMBRE_REGISTRO_EJECUCIONES, RegistroEtapas, contar_filas
 
 pd.options.mode.chained_assignment = None  # default='warn'
 
+PARAMETROS_DESGLOSE = {
+    "VALOR_TAVI_SUMINISTROS": VALOR_TAVI_SUMINISTROS,
+    "VALOR_EBUS_SUMINISTROS": VALOR_EBUS_SUMINISTROS,
+    "VALOR_ECMO_SUMINISTROS": VALOR_ECMO_SUMINISTROS,
+    "PORCENTAJES_A_CONSULTAS_CARDIOLOGIA": PORCENTAJES_A_CONSULTAS_CARDIOLOGIA,
+    "PORCENTAJES_A_PROCEDIMIENTOS_CARDIOLOGIA": PORCENTAJES_A_PROCEDIMIENTOS_CARDIOLOGIA,
+}
+
 
 class ModuloProducciones:
     """
     Esta clase permite obtener el desglose/análisis de cada una de las producciones presentes
-    en el archivo de Producciones del INT.
+    en el archivo de Producciones del INT, para uno o varios meses a la vez.
     """
 
-    def __init__(self):
-        pass
-
-    def correr_programa(self):
+    def __init__(
+        self,
+        meses_a_analizar,
+        carpeta_input="input",
+        carpeta_salida=".",
+        verbose=False,
+        medir_memoria=False,
+        parametros=None,
+    ):
+        self.meses_a_analizar = meses_a_analizar
+        self.carpeta_input = carpeta_input
+        self.carpeta_salida = carpeta_salida
+        self.verbose = verbose
+        self.parametros = {**PARAMETROS_DESGLOSE, **(parametros or {})}
+        self.registro = RegistroEtapas(
+            "producciones",
+            os.path.join(carpeta_salida, NOMBRE_REGISTRO_EJECUCIONES),
+            medir_memoria=medir_memoria,
+        )
+
+    def correr_programa(self, guardar_excel=True):
         """
-        Esta funcion permite correr el programa para analizar las producciones mensuales del INT
+        Esta funcion permite correr el programa para analizar las producciones mensuales del INT.
+        El archivo de producciones se lee una sola vez, y los desgloses de todos los meses se
+        calculan juntos (un mes por columna). Luego, se guarda un resultado por cada mes (si se
+        pide).
+
+        Cada etapa se mide (tiempo, filas y, si se pide, memoria máxima), y las mediciones se
+        agregan al registro de ejecuciones al final, incluso si el programa falla.
+
+        Retorna un diccionario del tipo {mes: {unidad_a_desglosar: DataFrame del desglose}}
         """
-        df_hosp, df_prod = self.cargar_archivo()
-        producciones_por_unidad = self.obtener_desglose_por_unidad(df_prod)
-        self.guardar_archivos(producciones_por_unidad, df_hosp)
+        try:
+            with self.registro.etapa("leer") as informar_filas_salida:
+                df_hosp, df_prod = self.cargar_archivo()
+                informar_filas_salida(len(df_hosp) + len(df_prod))
+
+            producciones_por_unidad = self.registro.medir(
+                "desglose",
+                self.obtener_desglose_por_unidad,
+                df_prod,
+                filas_entrada=len(df_prod),
+            )
+            producciones_por_mes = self.registro.medir(
+                "separar_por_mes",
+                self.separar_por_mes,
+                producciones_por_unidad,
+                filas_entrada=len(producciones_por_unidad),
+            )
+
+            if guardar_excel:
+                escrituras = [
+                    (
+                        self.guardar_archivos,
+                        producciones_del_mes,
+                        df_hosp[["SERVICIOS FINALES", mes]],
+                        self.obtener_nombre_archivo_salida(mes),
+                    )
+                    for mes, producciones_del_mes in producciones_por_mes.items()
+                ]
+                self.registro.medir(
+                    "guardar",
+                    escribir_en_paralelo,
+                    escrituras,
+                    filas_entrada=sum(map(contar_filas, producciones_por_mes.values())),
+                )
+
+        finally:
+            self.registro.guardar()
+
+        return producciones_por_mes
 
     def cargar_archivo(self):
         """
-        Esta función permite cargar el archivo de producciones, y obtener el mes que se
-        quiera analizar.
+        Esta función permite cargar el archivo de producciones, y obtener los meses que se
+        quieran analizar.
         """
-        mes_a_analizar = sys.argv[1]
-
-        nombre_archivo = [nombre for nombre in os.listdir("input") if "Producción" in nombre][0]
-        nombre_archivo = os.path.join("input", nombre_archivo)
+        nombre_archivo = [
+            nombre for nombre in os.listdir(self.carpeta_input) if "Producción" in nombre
+        ][0]
+        nombre_archivo = os.path.join(self.carpeta_input, nombre_archivo)
         producciones = pd.read_excel(nombre_archivo)
 
         producciones = producciones.loc[:, "SERVICIOS FINALES":"TOTAL AÑO"]
-        producciones.columns = [
-            "SERVICIOS FINALES",
-            "ENERO",
-            "FEBRERO",
-            "MARZO",
-            "ABRIL",
-            "MAYO",
-            "JUNIO",
-            "JULIO",
-            "AGOSTO",
-            "SEPTIEMBRE",
-            "OCTUBRE",
-            "NOVIEMBRE",
-            "DICIEMBRE",
-            "TOTAL AÑO",
-        ]
+        producciones.columns = ["SERVICIOS FINALES"] + MESES + ["TOTAL AÑO"]
 
         producciones["SERVICIOS FINALES"] = producciones["SERVICIOS FINALES"].fillna("PLACEHOLDER")
 
-        df_hospitalizaciones = producciones.loc[0:1, ["SERVICIOS FINALES", mes_a_analizar]]
-        df_producciones = producciones.loc[3:, ["SERVICIOS FINALES", mes_a_analizar]]
+        columnas = ["SERVICIOS FINALES"] + self.meses_a_analizar
+        df_hospitalizaciones = producciones.loc[0:1, columnas]
+        df_producciones = producciones.loc[3:, columnas]
 
         return df_hospitalizaciones, df_producciones
 
@@ -84,178 +144,218 @@ class ModuloProducciones:
         en el DICCIONARIO_UNIDADES_A_DESGLOSAR en constantes.py. Si se quiere hacer un nuevo
         desglose, entonces se debe agregar ahí.
 
-        Esta función retorna un diccionario del tipo {unidad_a_desglosar: DataFrame del desglose}
+        Las filas de producción se clasifican una sola vez (ver clasificar_producciones), y
+        cada desglose se obtiene agrupando las filas de sus subunidades, para todos los meses
+        a la vez.
+
+        Esta función retorna un diccionario del tipo
+        {unidad_a_desglosar: (DataFrame de producciones, DataFrame de porcentajes)}, con una
+        columna por mes.
         """
+        clasificacion = self.clasificar_producciones(df_produccion)
+
         producciones_por_unidad = {}
         for unidad_a_desglosar, lista_subunidades in DICCIONARIO_UNIDADES_A_DESGLOSAR.items():
-            for i, produccion_a_pedir in enumerate(lista_subunidades):
-                mask_consulta = self.obtener_mask_de_unidad(df_produccion, produccion_a_pedir)
-                if i == 0:
-                    mask_total = mask_consulta
-
-                else:
-                    mask_total = mask_total | mask_consulta
+            mask_total = clasificacion[lista_subunidades].any(axis=1)
 
             df_unidad = df_produccion[mask_total]
             df_unidad = df_unidad.groupby("SERVICIOS FINALES").sum().reset_index()
-            print(df_unidad)
-            df_unidad["PORCENTAJES"] = self.obtener_porcentajes(df_unidad, unidad_a_desglosar)
+            if self.verbose:
+                print(df_unidad)
+            porcentajes = self.obtener_porcentajes(df_unidad, unidad_a_desglosar)
 
-            suma_producciones = df_unidad.iloc[:, 1].sum()
-            df_unidad.loc[len(df_unidad.index)] = [unidad_a_desglosar, suma_producciones, "1"]
+            producciones_por_unidad[unidad_a_desglosar] = (df_unidad, porcentajes)
 
-            df_unidad["AGRUPACION"] = unidad_a_desglosar
+        return producciones_por_unidad
 
-            producciones_por_unidad[unidad_a_desglosar] = df_unidad
+    def separar_por_mes(self, producciones_por_unidad):
+        """
+        Esta función permite separar los desgloses de todos los meses en un resultado por mes.
+        Cada desglose queda con las columnas SERVICIOS FINALES, el mes, PORCENTAJES y
+        AGRUPACION, y con una última fila con el total de la unidad. AGRUPACION queda como
+        categórico de la dimensión de centros de costo (ver dimensiones.py).
 
-        return producciones_por_unidad
+        Retorna un diccionario del tipo {mes: {unidad_a_desglosar: DataFrame del desglose}}
+        """
+        tipo_agrupacion = obtener_centros_de_costo().tipo
+
+        producciones_por_mes = {}
+        for mes in self.meses_a_analizar:
+            producciones_del_mes = {}
+            for unidad_a_desglosar, (df_unidad, porcentajes) in producciones_por_unidad.items():
+                df_mes = df_unidad[["SERVICIOS FINALES", mes]].copy()
+                df_mes["PORCENTAJES"] = porcentajes[mes]
+
+                suma_producciones = df_mes[mes].sum()
+                df_mes.loc[len(df_mes.index)] = [unidad_a_desglosar, suma_producciones, "1"]
+
+                df_mes["AGRUPACION"] = pd.Categorical(
+                    [unidad_a_desglosar] * len(df_mes), dtype=tipo_agrupacion
+                )
+
+                producciones_del_mes[unidad_a_desglosar] = df_mes
 
-    def obtener_mask_de_unidad(self, df_prod, produccion_pedida):
+            producciones_por_mes[mes] = producciones_del_mes
+
+        return producciones_por_mes
+
+    def clasificar_producciones(self, df_prod):
         """
-        Esta función contiene diversas masks para las producciones que se estén pidiendo.
+        Esta función permite clasificar cada fila de producción en la(s) producción(es) SIGCOM
+        a la(s) que pertenece, según REGLAS_PRODUCCIONES_SIGCOM en constantes.py. Las reglas se
+        evalúan una sola vez por cada nombre distinto de "SERVICIOS FINALES".
+
+        Retorna un DataFrame de booleanos, con una fila por cada fila de producción y una
+        columna por cada producción SIGCOM.
         """
-        diccionario_unidad = {
-            "41107-TOMOGRAFÍA": df_prod["SERVICIOS FINALES"].str.contains("TOMOGRAFIA"),
-            "41108-IMAGENOLOGÍA": df_prod["SERVICIOS FINALES"].str.contains("IMAGENOLOGIA"),
-            "464-QUIRÓFANOS CARDIOVASCULAR": df_prod["SERVICIOS FINALES"]
-            == "QUIROFANOS CARDIOVASCULAR",
-            "484-QUIRÓFANOS TORACICA": df_prod["SERVICIOS FINALES"]
-            == "QUIROFANOS CIRUGIA TORACICA",
-            "51001-BANCO DE SANGRE": df_prod["SERVICIOS FINALES"] == "BANCO DE SANGRE",
-            "518-LABORATORIO CLÍNICO": df_prod["SERVICIOS FINALES"] == "LABORATORIO CLINICO",
-            "90-HOSPITALIZACIÓN QUIRÚRGICA": df_prod["SERVICIOS FINALES"].str.contains(
-                "HOSPITALIZACION QUIRURGICA"
-            ),
-            "66-HOSPITALIZACIÓN MEDICINA INTERNA": df_prod["SERVICIOS FINALES"].str.contains(
-                "HOSPITALIZACION MEDICINA INTERNA"
-            ),
-            "270-PROCEDIMIENTOS TAVI": df_prod["SERVICIOS FINALES"].str.contains("TAVI"),
-            "264-PROCEDIMIENTOS EBUS": df_prod["SERVICIOS FINALES"] == "PROCEDIMIENTO EBUS",
-            "15022-PROCEDIMIENTO DE NEUMOLOGÍA": df_prod["SERVICIOS FINALES"]
-            == "PROCEDIMIENTO DE NEUMOLOGIA (apnea del sueño)",
-            "253-PROCEDIMIENTOS DE HEMODINAMIA": df_prod["SERVICIOS FINALES"]
-            == "PROCEDIMIENTOS DE HEMODINAMIA",
-            "265-PROCEDIMIENTOS ECMO": df_prod["SERVICIOS FINALES"].str.contains(
-                "PROCEDIMIENTO ECMO"
-            ),
-            "15105-CONSULTA CARDIOLOGÍA": df_prod["SERVICIOS FINALES"] == "CONSULTA CARDIOLOGIA",
-            "15220-CONSULTA CIRUGIA CARDIACA": df_prod["SERVICIOS FINALES"]
-            == "CONSULTA CIRUGIA CARDIACA",
-            "15201-CONSULTA CIRUGÍA GENERAL": df_prod["SERVICIOS FINALES"]
-            == "CONSULTA CIRUGIA GENERAL (cirugía torax)",
-            "15026-PROCEDIMIENTOS DE CARDIOLOGÍA": df_prod["SERVICIOS FINALES"]
-            == "PROCEDIMIENTO DE CARDIOLOGIA",
-            "195-UNIDAD DE TRATAMIENTO INTENSIVO ADULTO": (
-                df_prod["SERVICIOS FINALES"].str.contains("UNIDAD DE TRATAMIENTO INTENSIVO")
-                & ~(df_prod["SERVICIOS FINALES"].str.contains("+", regex=False))
-            ),
-            "166-UNIDAD DE CUIDADOS INTENSIVOS": (
-                df_prod["SERVICIOS FINALES"].str.contains("UNIDAD DE CUIDADOS INTENSIVOS")
-                & ~(df_prod["SERVICIOS FINALES"].str.contains("+", regex=False))
-            ),
-            "15123-PROGRAMA MANEJO DEL DOLOR": df_prod["SERVICIOS FINALES"]
-            == "CONSULTA MANEJO DEL DOLOR",
-            "15107-CONSULTA ONCOLOGÍA": df_prod["SERVICIOS FINALES"] == "CONSULTA ONCOLOGIA",
-            "15038-PROCEDIMIENTO ONCOLOGÍA": df_prod["SERVICIOS FINALES"]
-            == "PROCEDIMIENTO ONCOLOGIA",
-            "15008-CONSULTA NUTRICIÓN": df_prod["SERVICIOS FINALES"] == "CONSULTA NUTRICION",
-            "15010-CONSULTA OTROS PROFESIONALES": df_prod["SERVICIOS FINALES"]
-            == "CONSULTA OTROS PROFESIONALES",
-            "15111-CONSULTA NEUMOLOGÍA": df_prod["SERVICIOS FINALES"]
-            == "CONSULTA NEUMOLOGIA (broncopulmonar)",
-        }
+        codigos_nombres, nombres_unicos = pd.factorize(df_prod["SERVICIOS FINALES"])
+        nombres_unicos = pd.Series(nombres_unicos, dtype=object)
+
+        clasificacion_nombres = {}
+        for produccion_sigcom, regla in REGLAS_PRODUCCIONES_SIGCOM.items():
+            if "igual" in regla:
+                mask = nombres_unicos == regla["igual"]
+
+            else:
+                mask = nombres_unicos.str.contains(regla["contiene"], regex=False)
+                if "no_contiene" in regla:
+                    mask &= ~nombres_unicos.str.contains(regla["no_contiene"], regex=False)
 
-        mask = diccionario_unidad[produccion_pedida]
-        return mask
+            clasificacion_nombres[produccion_sigcom] = mask.to_numpy()
+
+        clasificacion_nombres = pd.DataFrame(clasificacion_nombres)
+
+        return pd.DataFrame(
+            clasificacion_nombres.to_numpy()[codigos_nombres],
+            index=df_prod.index,
+            columns=clasificacion_nombres.columns,
+        )
 
     def obtener_porcentajes(self, produccion_unidad, unidad_a_desglosar):
         """
         Esta función permite obtener los porcentajes/valores totales por desglose de centro de
-        costo SIGCOM"""
+        costo SIGCOM. Se calculan para todos los meses a la vez, y se retorna un DataFrame con
+        una columna por mes.
+
+        Los valores y porcentajes de los desgloses se toman de self.parametros (por defecto,
+        los de constantes.py). Cada parámetro puede ser un número, o una Series con un valor
+        por columna (ver escenarios.py)."""
+        producciones = produccion_unidad[self.meses_a_analizar]
+        nombres = produccion_unidad["SERVICIOS FINALES"]
+        porcentajes = pd.DataFrame(
+            index=producciones.index, columns=producciones.columns, dtype=float
+        )
+
         if unidad_a_desglosar in UNIDADES_PROPORCIONALES_A_LA_PRODUCCION:
-            return produccion_unidad.iloc[:, 1] / produccion_unidad.iloc[:, 1].sum()
+            return producciones / producciones.sum()
 
         if unidad_a_desglosar == "253-PROCEDIMIENTOS DE HEMODINAMIA":
             # Aislar los procedimientos
-            series_hemodinamia = produccion_unidad.copy()
             mask_procedimientos = (
-                produccion_unidad["SERVICIOS FINALES"].str.contains("NEUMOLOGIA")
-                | produccion_unidad["SERVICIOS FINALES"].str.contains("HEMODINAMIA")
-                | produccion_unidad["SERVICIOS FINALES"].str.contains("ONCOLOGIA")
+                nombres.str.contains("NEUMOLOGIA")
+                | nombres.str.contains("HEMODINAMIA")
+                | nombres.str.contains("ONCOLOGIA")
             )
 
-            procedimientos_hemo = produccion_unidad[mask_procedimientos]
+            procedimientos_hemo = producciones[mask_procedimientos]
+            porcentajes.loc[mask_procedimientos] = procedimientos_hemo / procedimientos_hemo.sum()
 
-            porcentajes_hemo = procedimientos_hemo.iloc[:, 1] / procedimientos_hemo.iloc[:, 1].sum()
+            if self.verbose:
+                print(f"Hemodinamia se desglosó en:\n{porcentajes.to_markdown()}\n")
 
-            series_hemodinamia.loc[porcentajes_hemo.index, "PORCENTAJES"] = porcentajes_hemo
-
-            print(f"Hemodinamia se desglosó en:\n{series_hemodinamia.to_markdown()}\n")
-
-            return series_hemodinamia["PORCENTAJES"]
+            return porcentajes
 
         if unidad_a_desglosar == "15026-PROCEDIMIENTOS DE CARDIOLOGÍA":
-            series_cardiologia = produccion_unidad.copy()
-
-            mask_consultas_cardio = produccion_unidad["SERVICIOS FINALES"].str.contains("CONSULTA")
-            consultas_cardio = produccion_unidad[mask_consultas_cardio]
+            mask_consultas_cardio = nombres.str.contains("CONSULTA")
+            consultas_cardio = producciones[mask_consultas_cardio]
+            porcentajes.loc[mask_consultas_cardio] = (
+                consultas_cardio / consultas_cardio.sum()
+            ) * self.parametros["PORCENTAJES_A_CONSULTAS_CARDIOLOGIA"]
 
-            porcentajes_consultas_cardio = (
-                consultas_cardio.iloc[:, 1] / consultas_cardio.iloc[:, 1].sum()
-            ) * PORCENTAJES_A_CONSULTAS_CARDIOLOGIA
+            mask_procedimientos_cardio = nombres == "PROCEDIMIENTO DE CARDIOLOGIA"
+            procedimientos_cardio = producciones[mask_procedimientos_cardio]
+            porcentajes.loc[mask_procedimientos_cardio] = (
+                procedimientos_cardio / procedimientos_cardio.sum()
+            ) * self.parametros["PORCENTAJES_A_PROCEDIMIENTOS_CARDIOLOGIA"]
 
-            procedimientos_cardio = produccion_unidad.query(
-                "`SERVICIOS FINALES` == " '"PROCEDIMIENTO DE CARDIOLOGIA"'
-            )
-            porcentajes_proc_cardio = (
-                procedimientos_cardio.iloc[:, 1] / procedimientos_cardio.iloc[:, 1].sum()
-            ) * PORCENTAJES_A_PROCEDIMIENTOS_CARDIOLOGIA
-
-            series_cardiologia.loc[
-                porcentajes_consultas_cardio.index, "PORCENTAJES"
-            ] = porcentajes_consultas_cardio
+            if self.verbose:
+                print(f"Cardiología se desglosó en:\n{porcentajes.to_markdown()}\n")
 
-            series_cardiologia.loc[
-                porcentajes_proc_cardio.index, "PORCENTAJES"
-            ] = porcentajes_proc_cardio
+            return porcentajes
 
-            print(f"Cardiología se desglosó en:\n{series_cardiologia.to_markdown()}\n")
+        if unidad_a_desglosar == "TAVI_ECMO_EBUS":
+            valores_por_procedimiento = {
+                "PROCEDIMIENTO TAVI (4 horas c/u)": self.parametros["VALOR_TAVI_SUMINISTROS"],
+                "PROCEDIMIENTO EBUS": self.parametros["VALOR_EBUS_SUMINISTROS"],
+                "PROCEDIMIENTO ECMO (1,5 horas c/u/)": self.parametros["VALOR_ECMO_SUMINISTROS"],
+            }
+            for procedimiento, valor_suministros in valores_por_procedimiento.items():
+                mask_procedimiento = nombres == procedimiento
+                porcentajes.loc[mask_procedimiento] = (
+                    producciones[mask_procedimiento] * valor_suministros
+                )
 
-            return series_cardiologia["PORCENTAJES"]
+            if self.verbose:
+                print(f"TAVI_ECMO_EBUS se imputaron con:\n{porcentajes.to_markdown()}\n")
 
-        if unidad_a_desglosar == "TAVI_ECMO_EBUS":
-            series_tavi_ecmo_ebus = produccion_unidad.copy()
-            ecmo = produccion_unidad.query(
-                '`SERVICIOS FINALES` == "PROCEDIMIENTO ECMO (1,5 horas c/u/)"'
-            )
-            valor_total_ecmo = ecmo.iloc[:, 1] * VALOR_ECMO_SUMINISTROS
-            tavi = produccion_unidad.query(
-                '`SERVICIOS FINALES` == "PROCEDIMIENTO TAVI (4 horas c/u)"'
-            )
-            ebus = produccion_unidad.query('`SERVICIOS FINALES` == "PROCEDIMIENTO EBUS"')
-            valor_total_tavi = tavi.iloc[:, 1] * VALOR_TAVI_SUMINISTROS
-            valor_total_ebus = ebus.iloc[:, 1] * VALOR_EBUS_SUMINISTROS
+            return porcentajes
 
-            series_tavi_ecmo_ebus.loc[valor_total_tavi.index, "PORCENTAJES"] = valor_total_tavi
-            series_tavi_ecmo_ebus.loc[valor_total_ebus.index, "PORCENTAJES"] = valor_total_ebus
-            series_tavi_ecmo_ebus.loc[valor_total_ecmo.index, "PORCENTAJES"] = valor_total_ecmo
+        return porcentajes
 
-            print(f"TAVI_ECMO_EBUS se imputaron con:\n{series_tavi_ecmo_ebus.to_markdown()}\n")
+    def obtener_nombre_archivo_salida(self, mes):
+        """
+        Esta función permite obtener el nombre del archivo de salida de un mes. Si se analiza
+        un solo mes, entonces se mantiene el nombre output_producciones.xlsx.
+        """
+        if len(self.meses_a_analizar) == 1:
+            return os.path.join(self.carpeta_salida, "output_producciones.xlsx")
 
-            return series_tavi_ecmo_ebus["PORCENTAJES"]
+        return os.path.join(self.carpeta_salida, f"output_producciones_{mes}.xlsx")
 
-    def guardar_archivos(self, produccion_por_unidad, produccion_hospitalizaciones):
+    def guardar_archivos(
+        self, produccion_por_unidad, produccion_hospitalizaciones, nombre_archivo
+    ):
         """
         Esta función guarda el desglose de las producciones!
         """
-        with pd.ExcelWriter("output_producciones.xlsx") as writer:
-            for desglose_por_unidad, df_unidad in produccion_por_unidad.items():
-                df_unidad.to_excel(writer, sheet_name=f"{desglose_por_unidad[:31]}", index=False)
+        hojas = {
+            f"{desglose_por_unidad[:31]}": df_unidad
+            for desglose_por_unidad, df_unidad in produccion_por_unidad.items()
+        }
+        hojas["PORCENTAJES_HOSP"] = produccion_hospitalizaciones
+
+        return escribir_libro(nombre_archivo, hojas, incluir_indice=False)
+
+
+def obtener_meses_a_analizar(argumentos):
+    """
+    Esta función permite obtener los meses a analizar desde los argumentos del programa. Se
+    puede pedir un mes (ENERO), varios meses (ENERO FEBRERO), un rango de meses (ENERO:MARZO)
+    o todo el año (TODOS).
+    """
+    meses_a_analizar = []
+    for argumento in argumentos:
+        if argumento == "TODOS":
+            meses_a_analizar.extend(MESES)
+
+        elif ":" in argumento:
+            mes_inicio, mes_fin = argumento.split(":")
+            meses_a_analizar.extend(MESES[MESES.index(mes_inicio) : MESES.index(mes_fin) + 1])
+
+        else:
+            meses_a_analizar.append(argumento)
+
+    return list(dict.fromkeys(meses_a_analizar))
 
-            produccion_hospitalizaciones.to_excel(
-                writer, sheet_name="PORCENTAJES_HOSP", index=False
-            )
 
+if __name__ == "__main__":
+    verbose = "--verbose" in sys.argv
+    medir_memoria = "--medir_memoria" in sys.argv
+    argumentos = [
+        argumento for argumento in sys.argv[1:] if argumento not in ["--verbose", "--medir_memoria"]
+    ]
 
-modulo_producciones = ModuloProducciones()
-modulo_producciones.correr_programa()
+    modulo_producciones = ModuloProducciones(
+        obtener_meses_a_analizar(argumentos), verbose=verbose, medir_memoria=medir_memoria
+    )
+    modulo_producciones.correr_programa()
@@ -3,27 +3,75 @@ Programa para obtener el formato 4 de Suministros del SIGCOM. Unidad de Finanzas
 Javier Rojas Benítez"""
 
 import os
-import json
+import sys
 
 import numpy as np
 import pandas as pd
 
 import itertools
 
-with open("maestro_articulos_sigcom.json", encoding="utf-8") as file:
-    MAESTRO_ARTICULOS = json.load(file)
-
+import constantes
+import dimensiones
+from cache import calcular_huella, leer_cache, guardar_cache
+from matriz_asignacion import desglosar_formato
+from maestro_articulos import obtener_maestro_articulos, obtener_rutas_maestro
+from dimensiones import (
+    obtener_centros_de_costo,
+    obtener_items_sigcom,
+    obtener_rutas_dimensiones,
+    ordenar_por_etiqueta,
+)
+from escritura import (
+    FORMATOS_DETALLE,
+    escribir_detalle,
+    escribir_en_paralelo,
+    escribir_libro,
+)
+from instrumentacion import NOMBRE_REGISTRO_EJECUCIONES, RegistroEtapas, contar_filas
+from lectura import leer_en_paralelo
+from trazabilidad import CARPETA_TRAZABILIDAD, construir_trazabilidad
+from sugerencias import (
+    FUENTE_RESOLUCIONES,
+    obtener_indice_destinos,
+    seleccionar_sugerencias,
+    sugerir_articulos,
+    sugerir_destinos,
+)
+from resoluciones_destinos import (
+    NOMBRE_RESOLUCIONES_DESTINOS,
+    AlmacenResoluciones,
+    DestinosSinResolverError,
+    leer_resoluciones,
+)
 from constantes import (
     DESTINO_INT_CC_SIGCOM,
     DICCIONARIO_UNIDADES_A_DESGLOSAR,
     WINSIG_SERVICIO_FARMACIA_CC_SIGCOM,
-    DICCIONARIO_PRODUCIONES_SIGCOM
+    DICCIONARIO_PRODUCIONES_SIGCOM,
+    COLUMNAS_CARTOLA,
+    COLUMNAS_CARTOLA_ADICIONALES,
+    TAMANO_CHUNK_CARTOLA,
+    FILA_ENCABEZADO_FARMACIA,
+    COLUMNA_SERVICIO_FARMACIA,
+    COLUMNA_MONTO_FARMACIA,
+    ITEM_SIGCOM_FARMACIA,
 )
 
 DICCIONARIO_UNIDADES_A_DESGLOSAR = dict(
     itertools.islice(DICCIONARIO_UNIDADES_A_DESGLOSAR.items(), 7)
 )
 
+NOMBRE_CARTOLA = "Cartola valorizada.csv"
+NOMBRE_FORMATO = "Formato 4_Distribución Suministro 2022-12.xlsx"
+NOMBRE_CONSUMO_FARMACIA = "Consumo Farmacia.xlsx"
+NOMBRE_PRODUCCIONES = "output_producciones.xlsx"
+NOMBRE_CACHE_CARTOLA = "cartola_valorizada_traducida.parquet"
+NOMBRE_CACHE_NO_TRADUCIDOS = "cartola_no_traducidos.parquet"
+NOMBRE_CACHE_SUGERENCIAS = "cartola_sugerencias.parquet"
+NOMBRE_CACHE_FORMATO = "formato_4.parquet"
+NOMBRE_SALIDA = "output_suministros.xlsx"
+NOMBRE_DETALLE = "output_suministros_detalle"
+
 pd.options.mode.chained_assignment = None  # default='warn'
 
 
@@ -33,158 +81,743 @@ class AnalizadorSuministros:
     el formato 4 de Suministros del SIGCOM.
     """
 
-    def __init__(self):
-        pass
+    def __init__(
+        self,
+        carpeta_input="input",
+        carpeta_salida=".",
+        exportar_cartola_xlsx=False,
+        archivo_resoluciones=None,
+        verbose=False,
+        medir_memoria=False,
+        formato_detalle="xlsx",
+        umbral_sugerencias=None,
+        trazabilidad=False,
+        tiempo_maximo_lectura=None,
+    ):
+        if formato_detalle not in FORMATOS_DETALLE:
+            raise ValueError(
+                f"El formato de detalle {formato_detalle} NO es válido. Debe ser uno de: "
+                f"{', '.join(FORMATOS_DETALLE)}"
+            )
+
+        self.carpeta_input = carpeta_input
+        self.carpeta_salida = carpeta_salida
+        self.exportar_cartola_xlsx = exportar_cartola_xlsx
+        self.archivo_resoluciones = archivo_resoluciones
+        self.almacen_resoluciones = AlmacenResoluciones(
+            os.path.join(carpeta_input, NOMBRE_RESOLUCIONES_DESTINOS)
+        )
+        self.reporte_no_traducidos = pd.DataFrame(columns=["Columna", "Valor", "Movimientos"])
+        self.umbral_sugerencias = umbral_sugerencias
+        self.con_trazabilidad = trazabilidad
+        self.trazabilidad = None
+        self.desgloses = None
+        self.tiempo_maximo_lectura = tiempo_maximo_lectura
+        self.sugerencias_aplicadas = pd.DataFrame(
+            columns=["Columna", "Valor", "Sugerencia", "Texto", "Similitud"]
+        )
+        self.verbose = verbose
+        self.formato_detalle = formato_detalle
+        self.registro = RegistroEtapas(
+            "suministros",
+            os.path.join(carpeta_salida, NOMBRE_REGISTRO_EJECUCIONES),
+            medir_memoria=medir_memoria,
+        )
 
-    def correr_programa(self):
+    def correr_programa(self, producciones_por_unidad=None, guardar_excel=True):
         """
         Esta es la función principal para correr el programa. Ejecuta las siguientes funciones:
 
-        1 - Leer, Traducir y filtrar la cartola valorizada del SCI.
-        2 - Permite rellenar los artículos que NO tengan un destino asociado en el INT.
-        3 - Rellena el formato del SIGCOM.
-        4 - Guarda los archivos generados
+        1 - Leer todas las entradas a la vez (ver leer_entradas): la cartola valorizada del SCI
+        (traducida y filtrada), el formato 4, la planilla de Farmacia y los desgloses de
+        producción. Si se entregan los desgloses de producción (en memoria, desde
+        ModuloProducciones), entonces NO se lee output_producciones.xlsx.
+        2 - Permite rellenar los artículos que NO tengan un destino asociado en el INT. Si se
+        entrega un archivo de resoluciones, entonces se rellenan sin preguntar nada.
+        3 - Traduce el consumo de Farmacia (si existe la planilla), y rellena el formato del
+        SIGCOM con la cartola y el consumo de Farmacia.
+        4 - Desglosa el formato según las producciones.
+        5 - Si se pidió, construye la trazabilidad de cada celda del formato desglosado hasta
+        los movimientos de la cartola (ver trazabilidad.py), y la deja en self.trazabilidad.
+        6 - Guarda los archivos generados (si se pide).
+
+        Cada etapa se mide (tiempo, filas y, si se pide, memoria máxima), y las mediciones se
+        agregan al registro de ejecuciones al final, incluso si el programa falla.
+
+        Retorna un diccionario con los DataFrames generados.
         """
-        df_cartola = self.leer_asociar_y_filtrar_cartola()
-        df_completa = self.rellenar_destinos(df_cartola)
-        formato_relleno = self.convertir_a_tabla_din_y_rellenar_formato(df_completa)
+        try:
+            with self.registro.etapa("leer_entradas") as informar_filas_salida:
+                entradas = self.leer_entradas(producciones_por_unidad)
+                informar_filas_salida(len(entradas["cartola"]))
+
+            df_cartola = entradas["cartola"]
+            df_completa = self.registro.medir(
+                "rellenar_destinos",
+                self.rellenar_destinos,
+                df_cartola,
+                filas_entrada=len(df_cartola),
+            )
+            consumo_farmacia = None
+            if entradas["farmacia"] is not None:
+                consumo_farmacia = self.registro.medir(
+                    "farmacia", self.traducir_consumo_farmacia, entradas["farmacia"]
+                )
+            formato_relleno = self.registro.medir(
+                "tabla_dinamica",
+                self.convertir_a_tabla_din_y_rellenar_formato,
+                df_completa,
+                consumo_farmacia,
+                entradas["formato"],
+                filas_entrada=len(df_completa),
+            )
+            formato_desglosado = self.registro.medir(
+                "desglose",
+                self.desglosar_por_produccion,
+                formato_relleno.copy(),
+                entradas["producciones"],
+                filas_entrada=len(formato_relleno),
+            )
+
+            if self.con_trazabilidad:
+                self.trazabilidad = self.registro.medir(
+                    "trazabilidad",
+                    construir_trazabilidad,
+                    formato_desglosado,
+                    self.desgloses,
+                    df_completa,
+                    consumo_farmacia,
+                    filas_entrada=len(df_completa),
+                )
 
-        formato_desglosado = self.desglosar_por_produccion(formato_relleno.copy())
+            resultados = {
+                "formato_desglosado": formato_desglosado,
+                "formato_relleno": formato_relleno,
+                "df_completa": df_completa,
+                "no_traducidos": self.reporte_no_traducidos,
+            }
+            if consumo_farmacia is not None:
+                resultados["consumo_farmacia"] = consumo_farmacia
+            if not self.sugerencias_aplicadas.empty:
+                resultados["sugerencias_aplicadas"] = self.sugerencias_aplicadas
+            if guardar_excel:
+                self.registro.medir(
+                    "guardar",
+                    self.guardar_archivos,
+                    filas_entrada=contar_filas(resultados),
+                    **resultados,
+                )
+                if self.trazabilidad is not None:
+                    self.trazabilidad.guardar(
+                        os.path.join(self.carpeta_salida, CARPETA_TRAZABILIDAD)
+                    )
 
-        self.guardar_archivos(
-            formato_desglosado=formato_desglosado,
-            formato_relleno=formato_relleno,
-            df_completa=df_completa,
-        )
+        finally:
+            self.registro.guardar()
+
+        return resultados
+
+    def ruta_input(self, nombre_archivo):
+        """
+        Esta función permite obtener la ruta de un archivo dentro de la carpeta de input.
+        """
+        return os.path.join(self.carpeta_input, nombre_archivo)
+
+    def leer_entradas(self, producciones_por_unidad=None):
+        """
+        Esta función permite leer todas las entradas del programa a la vez, cada una en un hilo
+        (ver lectura.py): la cartola traducida, el formato 4, la planilla de Farmacia y
+        output_producciones.xlsx (si NO se entregan los desgloses de producción). Si se entregó
+        un tiempo máximo de lectura, todas las lecturas lo comparten. Si alguna falla se
+        levanta EntradasNoLeidasError con el error de cada entrada.
+
+        Retorna un diccionario con "cartola", "formato", "farmacia" (la planilla sin traducir,
+        o None si NO existe) y "producciones" ({cc_a_desglosar: DataFrame del desglose}).
+        """
+        lecturas = {
+            "cartola": (self.leer_asociar_y_filtrar_cartola,),
+            "formato": (self.leer_formato,),
+            "farmacia": (self.leer_planilla_farmacia,),
+        }
+        if producciones_por_unidad is None:
+            lecturas["producciones"] = (self.leer_producciones,)
+
+        entradas = leer_en_paralelo(lecturas, self.tiempo_maximo_lectura)
+        if producciones_por_unidad is not None:
+            entradas["producciones"] = producciones_por_unidad
+
+        return entradas
 
     def leer_asociar_y_filtrar_cartola(self):
         """
         Esta función controla el flujo de creación de la cartola traducida.
-        Si NO existe la cartola traducida, entonces crea una nueva desde la cartola cruda.
-        Si existe una cartola traducida, entonces lee esta y la trata.
+        Si NO existe la cartola traducida en caché, o si fue generada con otra cartola cruda,
+        otro maestro de artículos u otro constantes.py, entonces crea una nueva desde la
+        cartola cruda y la guarda en caché (Parquet).
+        Si existe una cartola traducida vigente, entonces lee esta desde el caché.
+
+        Si se pidió, además exporta la cartola traducida a Excel para revisarla.
         """
-        if "cartola_valorizada_traducida.xlsx" not in os.listdir("input"):
+        huella = self.obtener_huella_cartola()
+        df_filtrada = self.registro.medir(
+            "leer", leer_cache, self.ruta_input(NOMBRE_CACHE_CARTOLA), huella
+        )
+
+        if df_filtrada is None:
             df_filtrada = self.leer_cartola_desde_cero()
-            df_filtrada.to_excel("input\\cartola_valorizada_traducida.xlsx", index=False)
+            with self.registro.etapa("guardar_cache", len(df_filtrada)):
+                guardar_cache(df_filtrada, self.ruta_input(NOMBRE_CACHE_CARTOLA), huella)
+                guardar_cache(
+                    self.reporte_no_traducidos,
+                    self.ruta_input(NOMBRE_CACHE_NO_TRADUCIDOS),
+                    huella,
+                )
+                guardar_cache(
+                    self.sugerencias_aplicadas,
+                    self.ruta_input(NOMBRE_CACHE_SUGERENCIAS),
+                    huella,
+                )
 
         else:
-            df_filtrada = pd.read_excel("input\\cartola_valorizada_traducida.xlsx")
+            reporte_no_traducidos = leer_cache(self.ruta_input(NOMBRE_CACHE_NO_TRADUCIDOS), huella)
+            if reporte_no_traducidos is not None:
+                self.reporte_no_traducidos = reporte_no_traducidos
+
+            sugerencias_aplicadas = leer_cache(self.ruta_input(NOMBRE_CACHE_SUGERENCIAS), huella)
+            if sugerencias_aplicadas is not None:
+                self.sugerencias_aplicadas = sugerencias_aplicadas
+
+        if self.exportar_cartola_xlsx:
+            df_filtrada.to_excel(
+                self.ruta_input("cartola_valorizada_traducida.xlsx"), index=False
+            )
 
         return df_filtrada
 
+    def obtener_huella_cartola(self):
+        """
+        Esta función permite obtener la huella de los archivos de los que depende la cartola
+        traducida: la cartola cruda, el maestro de artículos, constantes.py, dimensiones.py y
+        el registro de códigos de las dimensiones.
+        Como los códigos de artículo desconocidos se pueden traducir con sugerencias, la huella
+        también incluye el umbral de sugerencias.
+        """
+        huella = calcular_huella(
+            self.ruta_input(NOMBRE_CARTOLA),
+            *obtener_rutas_maestro(),
+            constantes.__file__,
+            dimensiones.__file__,
+            *obtener_rutas_dimensiones(),
+        )
+        if self.umbral_sugerencias is None:
+            return huella
+
+        return f"{huella}:{self.umbral_sugerencias}"
+
     def leer_cartola_desde_cero(self):
         """
-        Esta función permite leer el archivo de la Cartola Valorizada del SCI. Luego, trata
-        este archivo de la siguiente forma:
+        Esta función permite leer el archivo de la Cartola Valorizada del SCI. La cartola se
+        lee por partes (de TAMANO_CHUNK_CARTOLA filas), y solamente con las columnas de
+        COLUMNAS_CARTOLA y COLUMNAS_CARTOLA_ADICIONALES. Cada parte se trata con
+        filtrar_y_traducir_chunk, por lo que la memoria utilizada depende del tamaño de las
+        partes y no del tamaño del archivo.
+
+        Luego, informa los códigos de artículo y destinos que NO se pudieron traducir, y
+        ordena la cartola por centro de costo y nombre del artículo.
+        """
+        partes_filtradas = [
+            self.filtrar_y_traducir_chunk(chunk) for chunk in self.leer_chunks_cartola()
+        ]
+
+        df_filtrada = pd.concat(partes_filtradas)
+        self.informar_no_traducidos()
+
+        with self.registro.etapa("ordenar", len(df_filtrada)):
+            df_filtrada = df_filtrada.sort_values(
+                ["CC SIGCOM", "Nombre"], na_position="first", key=ordenar_por_etiqueta
+            )
+
+        return df_filtrada
+
+    def leer_chunks_cartola(self):
+        """
+        Esta función entrega, una por una, las partes de la cartola cruda. Se leen las
+        columnas de COLUMNAS_CARTOLA (que deben estar), y las de COLUMNAS_CARTOLA_ADICIONALES
+        que estén en la cartola. La lectura de cada parte se mide en la etapa "leer".
+        """
+        ruta_cartola = self.ruta_input(NOMBRE_CARTOLA)
+        encabezado = pd.read_csv(ruta_cartola, nrows=0).columns
+
+        columnas_faltantes = [columna for columna in COLUMNAS_CARTOLA if columna not in encabezado]
+        if columnas_faltantes:
+            raise ValueError(
+                f"A {NOMBRE_CARTOLA} le faltan las columnas: {', '.join(columnas_faltantes)}"
+            )
+
+        tipos_columnas = {
+            columna: tipo
+            for columna, tipo in {**COLUMNAS_CARTOLA, **COLUMNAS_CARTOLA_ADICIONALES}.items()
+            if columna in encabezado
+        }
+        lector_cartola = pd.read_csv(
+            ruta_cartola,
+            usecols=list(tipos_columnas),
+            dtype=tipos_columnas,
+            chunksize=TAMANO_CHUNK_CARTOLA,
+        )
+
+        while True:
+            with self.registro.etapa("leer") as informar_filas_salida:
+                chunk_cartola = next(lector_cartola, None)
+                informar_filas_salida(0 if chunk_cartola is None else len(chunk_cartola))
 
-        1 - Crea una copia de la cartola.
-        2 - Deja solamente los movimientos de salida de los artículos
-        3 - Filtra todos los movimientos que NO tengan FARMACIA en su nombre, exceptuando
+            if chunk_cartola is None:
+                return
+
+            yield chunk_cartola
+
+    def filtrar_y_traducir_chunk(self, chunk_cartola):
+        """
+        Esta función trata una parte de la cartola de la siguiente forma:
+
+        1 - Deja solamente los movimientos de salida de los artículos
+        2 - Filtra todos los movimientos que NO tengan FARMACIA en su nombre, exceptuando
         SECRE. FARMACIA
-        4 - Filtra todos los movimientos que tengan como motivo a "Merma" - "Préstamo" o "Devolución
+        3 - Filtra todos los movimientos que tengan como motivo a "Merma" - "Préstamo" o "Devolución
         al Proveedor".
-        5 - Asocia el código de bodega con el código SIGFE y el código SIGCOM.
-        6 - Asocia el destino INT (destino del artículo dentro del hospital) con un centro
-        de costo.
-        7 - Filtra todos los artículos que sean del tipo Farmacia (ya que estos vienen desde
+        4 - Asocia el código de bodega con el código SIGFE y el código SIGCOM, y el destino
+        INT (destino del artículo dentro del hospital) con un centro de costo.
+        5 - Filtra todos los artículos que sean del tipo Farmacia (ya que estos vienen desde
         la planilla de Juan Pablo).
+
+        Los filtros sobre el destino se evalúan una vez por cada destino distinto.
         """
-        df_cartola = pd.read_csv("input\\Cartola valorizada.csv")
-        df_filtrada = df_cartola.copy()
+        with self.registro.etapa("filtrar", len(chunk_cartola)) as informar_filas_salida:
+            destinos = chunk_cartola["Destino"].cat.categories.to_series()
+            destinos_farmacia = destinos[
+                destinos.str.contains("FARMACIA") & ~destinos.str.contains("SECRE. FARMACIA")
+            ]
+            motivos_a_filtrar = ["Merma", "Préstamo", "Devolución al Proveedor"]
+
+            mask_a_conservar = (
+                (chunk_cartola["Movimiento"] == "Salida")
+                & ~chunk_cartola["Destino"].isin(destinos_farmacia)
+                & ~chunk_cartola["Motivo"].isin(motivos_a_filtrar)
+            )
+            df_filtrada = chunk_cartola[mask_a_conservar]
+            informar_filas_salida(len(df_filtrada))
+
+        with self.registro.etapa("traducir", len(df_filtrada)) as informar_filas_salida:
+            df_filtrada = self.traducir_cartola(df_filtrada)
+            df_filtrada = df_filtrada[df_filtrada["Tipo_Articulo_SIGFE"] != "Farmacia"]
+            informar_filas_salida(len(df_filtrada))
 
-        df_filtrada = df_filtrada.query('Movimiento == "Salida"')
-        mask_farmacia = ~(df_filtrada["Destino"].str.contains("FARMACIA")) | (
-            df_filtrada["Destino"].str.contains("SECRE. FARMACIA")
-        )
-        df_filtrada = df_filtrada[mask_farmacia]
-        motivos_a_filtrar = ["Merma", "Préstamo", "Devolución al Proveedor"]
-        df_filtrada = df_filtrada[~df_filtrada["Motivo"].isin(motivos_a_filtrar)]
+        return df_filtrada
 
-        df_filtrada = self.asociar_codigo_articulo_a_sigcom(df_filtrada)
-        df_filtrada = self.asociar_destino_int_a_sigcom(df_filtrada)
-        df_filtrada = df_filtrada.query('Tipo_Articulo_SIGFE != "Farmacia"')
-        df_filtrada = df_filtrada.sort_values(["CC SIGCOM", "Nombre"], na_position="first")
+    def traducir_cartola(self, df_cartola):
+        """
+        Esta función traduce la cartola al SIGCOM en una sola etapa:
 
-        return df_filtrada
+        1 - Asocia el código de bodega con el código SIGFE y el código SIGCOM.
+        2 - Asocia el destino INT con el centro de costo SIGCOM.
+
+        Las columnas traducidas se agregan sobre la misma cartola (sin copias intermedias). Los
+        códigos de artículo y destinos que NO existen en el maestro o en constantes.py se
+        acumulan en self.reporte_no_traducidos, en vez de detener el programa.
+        """
+        mask_articulos_desconocidos = self.asociar_codigo_articulo_a_sigcom(df_cartola)
+        mask_destinos_desconocidos = self.asociar_destino_int_a_sigcom(df_cartola)
+
+        self.registrar_no_traducidos(
+            "Codigo Articulo", df_cartola.loc[mask_articulos_desconocidos, "Codigo Articulo"]
+        )
+        self.registrar_no_traducidos(
+            "Destino", df_cartola.loc[mask_destinos_desconocidos, "Destino"]
+        )
+
+        return df_cartola
 
     def asociar_codigo_articulo_a_sigcom(self, df_cartola):
         """
         Esta función permite relacionar el código de bodega con el código presupuestario
-        SIGCOM y SIGFE.
+        SIGCOM y SIGFE. Cada código de artículo distinto se busca una sola vez en el índice
+        del maestro. Retorna la mask de los movimientos con códigos que NO están en el maestro.
+
+        Si se entregó un umbral de sugerencias, los códigos que NO están en el maestro se
+        traducen como el artículo del maestro con la descripción más parecida al nombre del
+        artículo, siempre que la similitud sea mayor o igual al umbral.
+
+        El ítem SIGCOM queda como categórico de la dimensión de ítems (ver dimensiones.py).
         """
-        df_filtrada = df_cartola.copy()
-        df_filtrada["Tipo_Articulo_SIGCOM"] = df_filtrada["Codigo Articulo"].apply(
-            lambda x: MAESTRO_ARTICULOS[x]["Total_SIGCOM"]
+        maestro_articulos = obtener_maestro_articulos()
+        items_sigcom = obtener_items_sigcom()
+
+        posiciones = maestro_articulos.obtener_posiciones(df_cartola["Codigo Articulo"])
+        if self.umbral_sugerencias is not None and (posiciones == -1).any():
+            posiciones = self.sugerir_codigos_articulo(df_cartola, posiciones)
+
+        df_cartola["Tipo_Articulo_SIGCOM"] = items_sigcom.categorizar(
+            maestro_articulos.obtener_codigos(posiciones, "Total_SIGCOM", items_sigcom)
+        )
+        df_cartola["Tipo_Articulo_SIGFE"] = maestro_articulos.obtener_valores(
+            posiciones, "Item SIGFE"
         )
 
-        df_filtrada["Tipo_Articulo_SIGFE"] = df_filtrada["Codigo Articulo"].apply(
-            lambda x: MAESTRO_ARTICULOS[x]["Item SIGFE"]
+        return posiciones == -1
+
+    def sugerir_codigos_articulo(self, df_cartola, posiciones):
+        """
+        Esta función permite buscar, de una vez, el artículo del maestro más parecido al nombre
+        de cada artículo con código desconocido. Las sugerencias que superan el umbral
+        reemplazan la posición -1 de esos movimientos, y se agregan a las sugerencias
+        aplicadas.
+        """
+        mask_desconocidos = posiciones == -1
+        nombres_desconocidos = df_cartola.loc[mask_desconocidos, "Nombre"]
+
+        sugerencias = sugerir_articulos(nombres_desconocidos.dropna().unique())
+        codigos_sugeridos = seleccionar_sugerencias(sugerencias, self.umbral_sugerencias)
+        if not codigos_sugeridos:
+            return posiciones
+
+        posiciones = posiciones.copy()
+        posiciones[mask_desconocidos] = obtener_maestro_articulos().obtener_posiciones(
+            nombres_desconocidos.map(codigos_sugeridos)
         )
+        self.registrar_sugerencias("Codigo Articulo", sugerencias, codigos_sugeridos)
 
-        return df_filtrada
+        return posiciones
+
+    def registrar_sugerencias(self, columna, sugerencias, aceptadas):
+        """
+        Esta función permite acumular las sugerencias que se aplicaron automáticamente, para
+        revisarlas en el output del programa.
+        """
+        aplicadas = sugerencias.merge(
+            pd.DataFrame(list(aceptadas.items()), columns=["Consulta", "Sugerencia"])
+        )
+        aplicadas = aplicadas.sort_values("Similitud", ascending=False, kind="stable")
+        aplicadas = aplicadas.drop_duplicates("Consulta").rename(columns={"Consulta": "Valor"})[
+            ["Valor", "Sugerencia", "Texto", "Similitud"]
+        ]
+        aplicadas.insert(0, "Columna", columna)
+
+        if self.verbose:
+            print(f"\n- Sugerencias aplicadas automáticamente ({columna}) - \n")
+            print(f"{aplicadas.to_markdown(index=False)}")
+
+        if not self.sugerencias_aplicadas.empty:
+            aplicadas = pd.concat([self.sugerencias_aplicadas, aplicadas], ignore_index=True)
+        self.sugerencias_aplicadas = aplicadas.reset_index(drop=True)
 
     def asociar_destino_int_a_sigcom(self, df_cartola):
         """
-        Esta función permite asociar el destino INT con el centro de costo SIGCOM.
+        Esta función permite asociar el destino INT con el centro de costo SIGCOM. Cada
+        destino distinto se busca una sola vez en DESTINO_INT_CC_SIGCOM. Retorna la mask de los
+        movimientos con destinos que NO están en constantes.py.
+
+        El centro de costo queda como categórico de la dimensión de centros de costo (ver
+        dimensiones.py).
         """
-        df_filtrada = df_cartola.copy()
-        df_filtrada["CC SIGCOM"] = df_filtrada["Destino"].apply(lambda x: DESTINO_INT_CC_SIGCOM[x])
+        centros_de_costo = obtener_centros_de_costo()
+        codigos_destino, destinos_unicos = pd.factorize(df_cartola["Destino"])
 
-        return df_filtrada
+        cc_sigcom_unicos = centros_de_costo.codificar(
+            [DESTINO_INT_CC_SIGCOM.get(destino) for destino in destinos_unicos]
+        )
+        destinos_conocidos = [destino in DESTINO_INT_CC_SIGCOM for destino in destinos_unicos]
+
+        df_cartola["CC SIGCOM"] = centros_de_costo.categorizar(
+            np.append(cc_sigcom_unicos, -1)[codigos_destino]
+        )
+
+        return ~np.array(destinos_conocidos + [False])[codigos_destino]
+
+    def registrar_no_traducidos(self, columna, valores_no_traducidos):
+        """
+        Esta función permite acumular en el reporte los valores que NO se pudieron traducir,
+        junto con la cantidad de movimientos que tienen cada uno.
+        """
+        if valores_no_traducidos.empty:
+            return
+
+        conteo = valores_no_traducidos.value_counts(dropna=False)
+        conteo = conteo.rename_axis("Valor").reset_index(name="Movimientos")
+        conteo.insert(0, "Columna", columna)
+
+        if not self.reporte_no_traducidos.empty:
+            conteo = pd.concat([self.reporte_no_traducidos, conteo], ignore_index=True)
+
+        self.reporte_no_traducidos = conteo.groupby(
+            ["Columna", "Valor"], as_index=False, sort=False, dropna=False
+        )["Movimientos"].sum()
+
+    def informar_no_traducidos(self):
+        """
+        Esta función permite mostrar los códigos de artículo y destinos que NO se pudieron
+        traducir. Estos movimientos quedan sin ítem o sin centro de costo SIGCOM.
+        """
+        if self.reporte_no_traducidos.empty:
+            return
+
+        print("\n- Códigos de artículo y destinos que NO se pudieron traducir - \n")
+        print(f"{self.reporte_no_traducidos.to_markdown()}")
 
     def rellenar_destinos(self, df_cartola):
         """
         Esta función permite rellenar todos los ítems que tengan algún destino que NO
         tenga relacionado algún centro de costo SIGCOM (Ej: Hospital del Salvador, INT, otros).
+
+        1 - Aplica de una vez todas las resoluciones guardadas en el almacén de resoluciones,
+        y las del archivo de resoluciones (si se entregó uno).
+        2 - Busca, de una vez, los destinos sugeridos para los artículos que falten (ver
+        sugerencias.py). Si se entregó un umbral de sugerencias, aplica las sugerencias de
+        artículos ya resueltos que lo superen, sin guardarlas en el almacén de resoluciones.
+        Los destinos parecidos al destino original solamente se muestran al preguntar.
+        3 - Si se entregó un archivo de resoluciones, entonces NO pregunta nada: si faltan
+        artículos por resolver, levanta un error con la lista completa.
+        4 - Si no, pregunta el destino de cada artículo que falte (mostrando las sugerencias),
+        y agrega cada respuesta al almacén de resoluciones.
+        """
+        mask_sin_cc = df_cartola["CC SIGCOM"].isna()
+        nombres_sin_cc = df_cartola.loc[mask_sin_cc, "Nombre"].unique()
+
+        resoluciones = self.almacen_resoluciones.cargar()
+        if self.archivo_resoluciones is not None:
+            resoluciones_archivo = leer_resoluciones(self.archivo_resoluciones)
+            self.almacen_resoluciones.agregar(
+                {
+                    nombre: destino
+                    for nombre, destino in resoluciones_archivo.items()
+                    if nombre in nombres_sin_cc and resoluciones.get(nombre) != destino
+                }
+            )
+            resoluciones.update(resoluciones_archivo)
+
+        nombres_sin_resolver = [nombre for nombre in nombres_sin_cc if nombre not in resoluciones]
+
+        sugerencias = None
+        if nombres_sin_resolver:
+            sugerencias = sugerir_destinos(
+                df_cartola.loc[mask_sin_cc & df_cartola["Nombre"].isin(nombres_sin_resolver)],
+                resoluciones,
+            )
+
+        if nombres_sin_resolver and self.umbral_sugerencias is not None:
+            destinos_sugeridos = seleccionar_sugerencias(
+                sugerencias, self.umbral_sugerencias, fuente=FUENTE_RESOLUCIONES
+            )
+            if destinos_sugeridos:
+                self.registrar_sugerencias("Destino", sugerencias, destinos_sugeridos)
+                resoluciones.update(destinos_sugeridos)
+                nombres_sin_resolver = [
+                    nombre for nombre in nombres_sin_resolver if nombre not in destinos_sugeridos
+                ]
+
+        if nombres_sin_resolver and self.archivo_resoluciones is not None:
+            raise DestinosSinResolverError(nombres_sin_resolver)
+
+        if nombres_sin_resolver:
+            resoluciones.update(
+                self.preguntar_destinos(df_cartola, nombres_sin_resolver, sugerencias)
+            )
+
+        self.aplicar_resoluciones(df_cartola, mask_sin_cc, resoluciones)
+
+        return df_cartola
+
+    def preguntar_destinos(self, df_cartola, nombres_sin_resolver, sugerencias=None):
         """
-        sin_cc = df_cartola[df_cartola["CC SIGCOM"].isna()]
-        a_printear = sin_cc[["Nombre", "Destino", "Tipo_Articulo_SIGFE", "Tipo_Articulo_SIGCOM"]]
+        Esta función permite preguntar el destino de cada artículo que NO tenga una
+        resolución. Cada respuesta se agrega inmediatamente al almacén de resoluciones.
+
+        Para cada artículo se muestran los destinos sugeridos, numerados: se puede responder
+        con el número de una sugerencia o con el destino completo. Si el destino NO es válido,
+        se muestran los destinos más parecidos a la respuesta.
+        """
+        sin_resolver = df_cartola[df_cartola["Nombre"].isin(nombres_sin_resolver)]
+        if sugerencias is None:
+            sugerencias = sugerir_destinos(sin_resolver, {})
+
+        a_printear = sin_resolver[
+            ["Nombre", "Destino", "Tipo_Articulo_SIGFE", "Tipo_Articulo_SIGCOM"]
+        ]
 
         print("\n- Se rellenarán los centros de costo NO ASIGNADOS asociados a cada artículo - \n")
         print(f"{a_printear.to_markdown()}")
 
-        for nombre_articulo in sin_cc["Nombre"].unique():
+        resoluciones_nuevas = {}
+        for nombre_articulo in nombres_sin_resolver:
+            sugeridos = sugerencias[sugerencias["Consulta"] == nombre_articulo]
+            destinos_sugeridos = dict(zip(sugeridos["Rango"].astype(str), sugeridos["Sugerencia"]))
+
+            print(f"\n{nombre_articulo}")
+            for rango, destino, similitud in sugeridos[["Rango", "Sugerencia", "Similitud"]].values:
+                print(f"  {rango}) {destino} (similitud {similitud:.2f})")
+
             while True:
-                destino = input(
-                    f"\n{nombre_articulo}\n" f"Qué destino crees que es? (están en constantes.py): "
-                )
+                destino = input("Qué destino crees que es? (número de la sugerencia o destino): ")
+                destino = destinos_sugeridos.get(destino.strip(), destino)
 
                 if destino in DESTINO_INT_CC_SIGCOM:
-                    cc_sigcom = DESTINO_INT_CC_SIGCOM[destino]
-
-                    mask_articulos_mismo_nombre = sin_cc["Nombre"] == nombre_articulo
-                    a_cambiar = sin_cc[mask_articulos_mismo_nombre]
-                    df_cartola.loc[a_cambiar.index, "Destino"] = destino
-                    df_cartola.loc[a_cambiar.index, "CC SIGCOM"] = cc_sigcom
+                    resoluciones_nuevas[nombre_articulo] = destino
+                    self.almacen_resoluciones.agregar({nombre_articulo: destino})
                     break
 
                 else:
-                    print("Debes ingresar un destino válido.")
+                    parecidos = obtener_indice_destinos().consultar([destino])["Sugerencia"]
+                    print(
+                        "Debes ingresar un destino válido. Los más parecidos son: "
+                        f"{', '.join(parecidos)}"
+                    )
 
-            df_cartola.to_excel("input\\cartola_valorizada_traducida.xlsx", index=False)
+        return resoluciones_nuevas
 
-        return df_cartola
+    def aplicar_resoluciones(self, df_cartola, mask_sin_cc, resoluciones):
+        """
+        Esta función permite asignar, de una vez, el destino resuelto y su centro de costo
+        SIGCOM a todos los movimientos sin centro de costo.
+        """
+        destinos_resueltos = df_cartola.loc[mask_sin_cc, "Nombre"].map(resoluciones).dropna()
+        if destinos_resueltos.empty:
+            return
+
+        if isinstance(df_cartola["Destino"].dtype, pd.CategoricalDtype):
+            destinos_nuevos = set(destinos_resueltos) - set(df_cartola["Destino"].cat.categories)
+            df_cartola["Destino"] = df_cartola["Destino"].cat.add_categories(
+                sorted(destinos_nuevos)
+            )
+
+        df_cartola.loc[destinos_resueltos.index, "Destino"] = destinos_resueltos
+        df_cartola.loc[destinos_resueltos.index, "CC SIGCOM"] = destinos_resueltos.map(
+            DESTINO_INT_CC_SIGCOM
+        )
+
+    def leer_consumo_farmacia(self):
+        """
+        Esta función permite leer la planilla de consumo de Farmacia (WINSIG), y traducirla
+        (ver traducir_consumo_farmacia). Si la planilla NO existe, entonces retorna None.
+        """
+        consumo = self.leer_planilla_farmacia()
+        if consumo is None:
+            return None
+
+        return self.traducir_consumo_farmacia(consumo)
+
+    def leer_planilla_farmacia(self):
+        """
+        Esta función permite leer la planilla de consumo de Farmacia (WINSIG), sin traducirla.
+        Las columnas que se leen están en constantes.py. Si la planilla NO existe, entonces
+        retorna None.
+        """
+        ruta_farmacia = self.ruta_input(NOMBRE_CONSUMO_FARMACIA)
+        if not os.path.exists(ruta_farmacia):
+            print(f"- No se encontró {NOMBRE_CONSUMO_FARMACIA}, NO se agregará Farmacia -\n")
+            return None
+
+        return pd.read_excel(
+            ruta_farmacia,
+            header=FILA_ENCABEZADO_FARMACIA,
+            usecols=[COLUMNA_SERVICIO_FARMACIA, COLUMNA_MONTO_FARMACIA],
+        )
+
+    def traducir_consumo_farmacia(self, consumo):
+        """
+        Esta función permite traducir cada servicio WINSIG de la planilla de Farmacia a su
+        centro de costo SIGCOM con WINSIG_SERVICIO_FARMACIA_CC_SIGCOM.
 
-    def convertir_a_tabla_din_y_rellenar_formato(self, df_consolidada):
+        Los servicios que NO están en constantes.py se agregan al reporte de no traducidos. Los
+        servicios sin centro de costo (Ej: la fila TOTAL) NO se consideran.
         """
-        Esta función permite convertir la cartola valorizada en una tabla al estilo wide.
+        consumo = consumo.dropna(subset=[COLUMNA_SERVICIO_FARMACIA])
+        servicios = consumo[COLUMNA_SERVICIO_FARMACIA].astype(str).str.strip()
+
+        servicios_desconocidos = ~servicios.isin(list(WINSIG_SERVICIO_FARMACIA_CC_SIGCOM))
+        self.registrar_no_traducidos("Servicio Farmacia", servicios[servicios_desconocidos])
+
+        centros_de_costo = obtener_centros_de_costo()
+        consumo["CC SIGCOM"] = centros_de_costo.categorizar(
+            centros_de_costo.codificar(servicios.map(WINSIG_SERVICIO_FARMACIA_CC_SIGCOM))
+        )
+        consumo[COLUMNA_MONTO_FARMACIA] = pd.to_numeric(
+            consumo[COLUMNA_MONTO_FARMACIA], errors="coerce"
+        )
+
+        return consumo.dropna(subset=["CC SIGCOM"])
+
+    def convertir_a_tabla_din_y_rellenar_formato(
+        self, df_consolidada, consumo_farmacia=None, formato=None
+    ):
+        """
+        Esta función permite convertir la cartola valorizada en una tabla al estilo wide, y
+        rellenar el formato del SIGCOM con esta. La tabla se alinea con el formato en un solo
+        paso: los centros de costo e ítems que NO estén en el formato se agregan al final.
+
+        Si se entrega el consumo de Farmacia (ver leer_consumo_farmacia), entonces se suma a
+        la tabla en el ítem ITEM_SIGCOM_FARMACIA de cada centro de costo.
+
+        La tabla dinámica se calcula sobre los códigos de las dimensiones (solamente con los
+        centros de costo e ítems presentes), y luego se le ponen las etiquetas de texto y se
+        ordena por etiqueta (los códigos NO siguen el orden del texto). Si NO se entrega el
+        formato (ya leído), entonces se lee con leer_formato.
         """
         tabla_dinamica = pd.pivot_table(
             df_consolidada,
             values="Neto Total",
             index="CC SIGCOM",
             columns="Tipo_Articulo_SIGCOM",
-            aggfunc=np.sum,
+            aggfunc="sum",
+            observed=True,
         )
+        tabla_dinamica.index = obtener_centros_de_costo().etiquetar(tabla_dinamica.index)
+        tabla_dinamica.columns = obtener_items_sigcom().etiquetar(tabla_dinamica.columns)
+        tabla_dinamica = tabla_dinamica.sort_index().sort_index(axis=1)
 
-        formato = pd.read_excel("input\\Formato 4_Distribución Suministro 2022-12.xlsx")
-        formato = formato.set_index("Centro de Costo")
+        return self.rellenar_formato(tabla_dinamica, consumo_farmacia, formato)
 
-        for centro_costo in tabla_dinamica.index:
-            for item_sigcom in tabla_dinamica.columns:
-                formato.loc[centro_costo, item_sigcom] = tabla_dinamica.loc[
-                    centro_costo, item_sigcom
-                ]
+    def rellenar_formato(self, tabla_dinamica, consumo_farmacia=None, formato=None):
+        """
+        Esta función permite rellenar el formato del SIGCOM con una tabla dinámica (centros de
+        costo en las filas e ítems SIGCOM en las columnas, con etiquetas de texto), y con el
+        consumo de Farmacia (si se entrega).
+        """
+        if consumo_farmacia is not None and not consumo_farmacia.empty:
+            tabla_farmacia = consumo_farmacia.groupby("CC SIGCOM", observed=True)[
+                COLUMNA_MONTO_FARMACIA
+            ].sum()
+            tabla_farmacia.index = obtener_centros_de_costo().etiquetar(tabla_farmacia.index)
+            tabla_dinamica = tabla_dinamica.add(
+                tabla_farmacia.to_frame(ITEM_SIGCOM_FARMACIA), fill_value=0
+            )
+
+        if formato is None:
+            formato = self.leer_formato()
+
+        filas_nuevas = tabla_dinamica.index.difference(formato.index, sort=False)
+        columnas_nuevas = tabla_dinamica.columns.difference(formato.columns, sort=False)
+        if len(filas_nuevas) or len(columnas_nuevas):
+            formato = formato.reindex(
+                index=formato.index.append(filas_nuevas).rename(formato.index.name),
+                columns=formato.columns.append(columnas_nuevas),
+            )
+
+        formato.loc[tabla_dinamica.index, tabla_dinamica.columns] = tabla_dinamica
+
+        return formato
+
+    def leer_formato(self):
+        """
+        Esta función permite leer el formato 4 del SIGCOM. El formato leído se guarda en caché
+        (Parquet), y solamente se vuelve a leer el Excel si este cambió.
+        """
+        ruta_formato = self.ruta_input(NOMBRE_FORMATO)
+        huella = calcular_huella(ruta_formato)
+
+        formato = leer_cache(self.ruta_input(NOMBRE_CACHE_FORMATO), huella)
+        if formato is None:
+            formato = pd.read_excel(ruta_formato)
+            formato = formato.set_index("Centro de Costo")
+            guardar_cache(formato, self.ruta_input(NOMBRE_CACHE_FORMATO), huella)
 
         return formato
 
@@ -194,43 +827,146 @@ class AnalizadorSuministros:
 
         return con_dinero
 
-    def desglosar_por_produccion(self, formato_relleno):
+    def desglosar_por_produccion(self, formato_relleno, producciones_por_unidad=None):
         """
         Esta función permite hacer el desglose, con los montos respectivos, de cada uno de los
         Centros de Costos que lo requieran. Solamente desglosa los que están en el formato.
+
+        Los porcentajes de cada desglose se obtienen de los desgloses de producción
+        ({unidad_a_desglosar: DataFrame del desglose}, como los entrega ModuloProducciones). Si
+        NO se entregan, entonces se leen desde output_producciones.xlsx. Todos los desgloses
+        se aplican juntos con una matriz de asignación (ver matriz_asignacion.py).
+
+        Los porcentajes quedan en self.desgloses, para construir la trazabilidad.
         """
-        producciones = pd.ExcelFile("input\\output_producciones.xlsx")
+        self.desgloses = self.obtener_desgloses(producciones_por_unidad)
+
+        return desglosar_formato(formato_relleno, self.desgloses)
 
+    def obtener_desgloses(self, producciones_por_unidad=None):
+        """
+        Esta función permite obtener los porcentajes de cada desglose, como un diccionario
+        ordenado del tipo {cc_a_desglosar: Series de porcentajes por subunidad}. Si NO se
+        entregan los desgloses de producción, entonces se leen desde output_producciones.xlsx.
+        """
+        if producciones_por_unidad is None:
+            producciones_por_unidad = self.leer_producciones()
+
+        desgloses = {}
         for cc_a_desglosar, subunidades_a_asignar_dinero in DICCIONARIO_UNIDADES_A_DESGLOSAR.items():
-            nombre_cortado = cc_a_desglosar[:31]
-            print(f"Se va a desglosar {cc_a_desglosar} en {subunidades_a_asignar_dinero}")
-            produccion_cc = pd.read_excel(producciones, sheet_name=nombre_cortado).iloc[:-1]
-            produccion_cc['SIGCOM'] = produccion_cc['SERVICIOS FINALES'].apply(lambda x: DICCIONARIO_PRODUCIONES_SIGCOM[x])
-            resumen_porcentajes = produccion_cc.groupby('SIGCOM')["PORCENTAJES"].sum()
+            resumen_porcentajes = self.obtener_resumen_porcentajes(
+                producciones_por_unidad[cc_a_desglosar]
+            )
+            desgloses[cc_a_desglosar] = resumen_porcentajes
 
-            total = formato_relleno.loc[cc_a_desglosar, :].copy()
-            for cc_subunidad, porcentaje_subunidad in resumen_porcentajes.items():
-                print(f"Se esta asignando dinero a {cc_subunidad}, y tiene un porcentaje de {porcentaje_subunidad}")
-                desglose = total * porcentaje_subunidad
+            if self.verbose:
+                print(f"Se va a desglosar {cc_a_desglosar} en {subunidades_a_asignar_dinero}")
+                for cc_subunidad, porcentaje_subunidad in resumen_porcentajes.items():
+                    print(f"Se esta asignando dinero a {cc_subunidad}, y tiene un porcentaje de {porcentaje_subunidad}")
+                print()
 
-                if cc_subunidad != cc_a_desglosar:
-                    dinero_previo = formato_relleno.loc[cc_subunidad]
-                    desglose = desglose.add(dinero_previo, fill_value=0)
+        return desgloses
+
+    def leer_producciones(self):
+        """
+        Esta función permite leer los desgloses de producción desde output_producciones.xlsx.
+        El libro se abre una sola vez para todas las hojas. Los nombres de las hojas están
+        cortados a 31 caracteres.
+        """
+        producciones = pd.ExcelFile(self.ruta_input(NOMBRE_PRODUCCIONES))
 
-                formato_relleno.loc[cc_subunidad] = desglose
-            
-            print()
+        return {
+            cc_a_desglosar: pd.read_excel(producciones, sheet_name=cc_a_desglosar[:31])
+            for cc_a_desglosar in DICCIONARIO_UNIDADES_A_DESGLOSAR
+        }
 
-        return formato_relleno
+    def obtener_resumen_porcentajes(self, produccion_cc):
+        """
+        Esta función permite obtener el porcentaje que le corresponde a cada centro de costo
+        SIGCOM dentro del desglose. La última fila del desglose (el total) NO se considera.
+        """
+        produccion_cc = produccion_cc.iloc[:-1]
+        return self.sumar_porcentajes_por_centro_de_costo(
+            produccion_cc["SERVICIOS FINALES"], produccion_cc["PORCENTAJES"]
+        )
 
-    def guardar_archivos(self, **kwargs):
+    def sumar_porcentajes_por_centro_de_costo(self, servicios_finales, porcentajes):
         """
-        Esta función permite guardar los archivos generados en el programa.
+        Esta función permite sumar los porcentajes de los servicios finales que corresponden a
+        un mismo centro de costo SIGCOM (según DICCIONARIO_PRODUCIONES_SIGCOM). Los porcentajes
+        pueden ser una Series, o un DataFrame con varias columnas (Ej: una por escenario). Si
+        un servicio NO está en DICCIONARIO_PRODUCIONES_SIGCOM, entonces se levanta un KeyError.
+
+        Se agrupa por el código de cada centro de costo (ver dimensiones.py), y el resultado se
+        entrega con las etiquetas de texto.
         """
-        with pd.ExcelWriter("output_suministros.xlsx") as writer:
-            for nombre_hoja, df in kwargs.items():
-                df.to_excel(writer, sheet_name=nombre_hoja)
+        centros_de_costo = obtener_centros_de_costo()
+
+        codigos_centros_de_costo = centros_de_costo.codificar(
+            servicios_finales.apply(lambda x: DICCIONARIO_PRODUCIONES_SIGCOM[x])
+        )
+        agrupacion = pd.Series(
+            centros_de_costo.categorizar(codigos_centros_de_costo),
+            index=porcentajes.index,
+            name="SIGCOM",
+        )
+
+        resumen_porcentajes = porcentajes.astype(float).groupby(agrupacion, observed=True).sum()
+        resumen_porcentajes.index = centros_de_costo.etiquetar(resumen_porcentajes.index)
 
+        return resumen_porcentajes.sort_index()
 
-analizador = AnalizadorSuministros()
-analizador.correr_programa()
+    def guardar_archivos(self, **kwargs):
+        """
+        Esta función permite guardar los archivos generados en el programa. Cada DataFrame
+        queda en una hoja de output_suministros.xlsx.
+
+        Si el formato de detalle es "csv" o "parquet", entonces la cartola completa
+        (df_completa) NO se incluye en el Excel, y se guarda aparte como
+        output_suministros_detalle.csv/.parquet, al mismo tiempo que el Excel.
+        """
+        hojas = dict(kwargs)
+        escrituras = []
+        if self.formato_detalle != "xlsx" and "df_completa" in hojas:
+            escrituras.append(
+                (
+                    escribir_detalle,
+                    os.path.join(self.carpeta_salida, NOMBRE_DETALLE),
+                    hojas.pop("df_completa"),
+                    self.formato_detalle,
+                )
+            )
+
+        escrituras.append((escribir_libro, os.path.join(self.carpeta_salida, NOMBRE_SALIDA), hojas))
+
+        return escribir_en_paralelo(escrituras)
+
+
+if __name__ == "__main__":
+    verbose = "--verbose" in sys.argv
+    trazabilidad = "--trazabilidad" in sys.argv
+    medir_memoria = "--medir_memoria" in sys.argv
+    formato_detalle = "xlsx"
+    umbral_sugerencias = None
+    tiempo_maximo_lectura = None
+    for argumento in sys.argv[1:]:
+        if argumento.startswith("--detalle="):
+            formato_detalle = argumento.split("=", 1)[1]
+        elif argumento.startswith("--umbral="):
+            umbral_sugerencias = float(argumento.split("=", 1)[1])
+        elif argumento.startswith("--tiempo_maximo="):
+            tiempo_maximo_lectura = float(argumento.split("=", 1)[1])
+
+    argumentos = [argumento for argumento in sys.argv[1:] if not argumento.startswith("--")]
+
+    archivo_resoluciones = argumentos[0] if argumentos else None
+    analizador = AnalizadorSuministros(
+        archivo_resoluciones=archivo_resoluciones,
+        verbose=verbose,
+        formato_detalle=formato_detalle,
+        umbral_sugerencias=umbral_sugerencias,
+        trazabilidad=trazabilidad,
+        tiempo_maximo_lectura=tiempo_maximo_lectura,
+        medir_memoria=medir_memoria,
+    )
+    analizador.correr_programa()
@@ -0,0 +1,115 @@
+"""
+Este archivo permite correr el flujo completo del formato 4 de Suministros del SIGCOM para un
+mes: primero las producciones (modulo_producciones.py) y luego los suministros
+(modulo_suministros.py). Los desgloses de producción se pasan en memoria, sin escribir ni
+volver a leer output_producciones.xlsx.
+
+Si se entrega un archivo de histórico (y el año del mes), los resultados de la ejecución se
+agregan al histórico (ver historico.py).
+"""
+
+import sys
+
+from historico import HistoricoResultados, obtener_periodo
+from modulo_producciones import ModuloProducciones
+from modulo_suministros import AnalizadorSuministros
+
+
+class PipelineSIGCOM:
+    """
+    Esta clase permite componer los programas de producciones y suministros desde otro código.
+    """
+
+    def __init__(
+        self,
+        mes,
+        carpeta_input="input",
+        carpeta_salida=".",
+        archivo_resoluciones=None,
+        verbose=False,
+        formato_detalle="xlsx",
+        umbral_sugerencias=None,
+        archivo_historico=None,
+        anio=None,
+    ):
+        if archivo_historico is not None and anio is None:
+            raise ValueError("Para guardar en el histórico se debe entregar el año del mes")
+
+        self.mes = mes
+        self.carpeta_input = carpeta_input
+        self.carpeta_salida = carpeta_salida
+        self.archivo_resoluciones = archivo_resoluciones
+        self.verbose = verbose
+        self.formato_detalle = formato_detalle
+        self.umbral_sugerencias = umbral_sugerencias
+        self.archivo_historico = archivo_historico
+        self.anio = anio
+
+    def correr(self, guardar_excel=False):
+        """
+        Esta función permite correr el flujo completo. Si se pide, guarda al final los Excel
+        de producciones y de suministros. Si hay un archivo de histórico, los resultados se
+        agregan al histórico como la ejecución vigente del periodo.
+
+        Retorna un diccionario con los desgloses de producción del mes ("producciones") y los
+        DataFrames generados por AnalizadorSuministros.
+        """
+        modulo_producciones = ModuloProducciones(
+            [self.mes],
+            carpeta_input=self.carpeta_input,
+            carpeta_salida=self.carpeta_salida,
+            verbose=self.verbose,
+        )
+        producciones_del_mes = modulo_producciones.correr_programa(guardar_excel=guardar_excel)[
+            self.mes
+        ]
+
+        analizador = AnalizadorSuministros(
+            carpeta_input=self.carpeta_input,
+            carpeta_salida=self.carpeta_salida,
+            archivo_resoluciones=self.archivo_resoluciones,
+            verbose=self.verbose,
+            formato_detalle=self.formato_detalle,
+            umbral_sugerencias=self.umbral_sugerencias,
+        )
+        resultados = analizador.correr_programa(
+            producciones_por_unidad=producciones_del_mes, guardar_excel=guardar_excel
+        )
+
+        if self.archivo_historico is not None:
+            with HistoricoResultados(self.archivo_historico) as historico:
+                historico.guardar_ejecucion(
+                    obtener_periodo(self.mes, self.anio),
+                    resultados,
+                    producciones_del_mes,
+                    origen=self.carpeta_input,
+                )
+
+        return {"producciones": producciones_del_mes, **resultados}
+
+
+if __name__ == "__main__":
+    verbose = "--verbose" in sys.argv
+    umbral_sugerencias = None
+    archivo_historico = None
+    anio = None
+    for argumento in sys.argv[1:]:
+        if argumento.startswith("--umbral="):
+            umbral_sugerencias = float(argumento.split("=", 1)[1])
+        elif argumento.startswith("--historico="):
+            archivo_historico = argumento.split("=", 1)[1]
+        elif argumento.startswith("--anio="):
+            anio = int(argumento.split("=", 1)[1])
+
+    argumentos = [argumento for argumento in sys.argv[1:] if not argumento.startswith("--")]
+
+    archivo_resoluciones = argumentos[1] if len(argumentos) > 1 else None
+    pipeline = PipelineSIGCOM(
+        argumentos[0],
+        archivo_resoluciones=archivo_resoluciones,
+        verbose=verbose,
+        umbral_sugerencias=umbral_sugerencias,
+        archivo_historico=archivo_historico,
+        anio=anio,
+    )
+    pipeline.correr(guardar_excel=True)
@@ -0,0 +1,90 @@
+"""
+Este archivo permite guardar y consultar las resoluciones de destinos (nombre del artículo ->
+destino INT) para los artículos que NO tienen un centro de costo SIGCOM asociado.
+
+Las resoluciones se guardan en un CSV al que solamente se le agregan filas. Si un mismo
+artículo se resolvió más de una vez, entonces vale la última resolución.
+"""
+
+import os
+import csv
+import warnings
+
+import pandas as pd
+
+from constantes import DESTINO_INT_CC_SIGCOM
+
+NOMBRE_RESOLUCIONES_DESTINOS = "resoluciones_destinos.csv"
+COLUMNAS_RESOLUCIONES = ["Nombre", "Destino"]
+
+
+class DestinosSinResolverError(ValueError):
+    """
+    Error que indica que quedaron artículos sin un destino resuelto al correr sin preguntas.
+    Contiene la lista completa de los artículos que faltan.
+    """
+
+    def __init__(self, nombres_sin_resolver):
+        self.nombres_sin_resolver = list(nombres_sin_resolver)
+        super().__init__(
+            "Los siguientes artículos NO tienen un destino resuelto:\n"
+            + "\n".join(self.nombres_sin_resolver)
+        )
+
+
+def leer_resoluciones(ruta_resoluciones):
+    """
+    Esta función permite leer un archivo de resoluciones (columnas Nombre y Destino) como un
+    diccionario {nombre_articulo: destino}. Si un artículo aparece más de una vez, entonces
+    vale la última fila. Las resoluciones con destinos que NO están en constantes.py (Ej: un
+    destino mal escrito o que cambió de nombre) se ignoran, y se avisan con un warning.
+    """
+    if not os.path.exists(ruta_resoluciones):
+        return {}
+
+    resoluciones = pd.read_csv(
+        ruta_resoluciones, usecols=COLUMNAS_RESOLUCIONES, dtype=str, keep_default_na=False
+    )
+    mask_destinos_conocidos = resoluciones["Destino"].isin(list(DESTINO_INT_CC_SIGCOM))
+    if not mask_destinos_conocidos.all():
+        ignoradas = resoluciones[~mask_destinos_conocidos]
+        warnings.warn(
+            f"Las siguientes resoluciones de {ruta_resoluciones} tienen un destino que NO está "
+            f"en constantes.py, por lo que se ignoran:\n"
+            + "\n".join(f"{nombre} -> {destino}" for nombre, destino in ignoradas.to_numpy()),
+            UserWarning,
+        )
+    resoluciones = resoluciones[mask_destinos_conocidos]
+
+    return dict(zip(resoluciones["Nombre"], resoluciones["Destino"]))
+
+
+class AlmacenResoluciones:
+    """
+    Esta clase representa el almacén persistente de resoluciones de destinos.
+    """
+
+    def __init__(self, ruta_resoluciones):
+        self.ruta_resoluciones = ruta_resoluciones
+
+    def cargar(self):
+        """
+        Esta función permite cargar todas las resoluciones guardadas.
+        """
+        return leer_resoluciones(self.ruta_resoluciones)
+
+    def agregar(self, resoluciones):
+        """
+        Esta función permite agregar resoluciones ({nombre_articulo: destino}) al final del
+        almacén, sin volver a escribir las resoluciones anteriores.
+        """
+        if not resoluciones:
+            return
+
+        es_nuevo = not os.path.exists(self.ruta_resoluciones)
+        with open(self.ruta_resoluciones, "a", encoding="utf-8", newline="") as archivo:
+            escritor = csv.writer(archivo)
+            if es_nuevo:
+                escritor.writerow(COLUMNAS_RESOLUCIONES)
+
+            escritor.writerows(resoluciones.items())
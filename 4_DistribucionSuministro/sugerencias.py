@@ -0,0 +1,250 @@
+"""
+Este archivo permite sugerir traducciones para los nombres que NO se pudieron traducir:
+
+- Destinos INT para los artículos sin centro de costo SIGCOM. Se sugieren los destinos de
+artículos parecidos ya resueltos, y los destinos de DESTINO_INT_CC_SIGCOM parecidos al destino
+original (sin traducir) de los movimientos del artículo.
+- Artículos del maestro para los códigos de artículo que NO están en el maestro, según la
+descripción del artículo.
+
+Los textos se comparan con un índice de n-gramas de caracteres (TF-IDF y similitud coseno),
+y todos los nombres se consultan juntos con un solo producto de matrices dispersas.
+"""
+
+import re
+import itertools
+import functools
+import unicodedata
+
+import numpy as np
+import pandas as pd
+from scipy import sparse
+
+from constantes import DESTINO_INT_CC_SIGCOM
+from maestro_articulos import obtener_maestro_articulos
+
+TAMANO_NGRAMA = 3
+CANTIDAD_SUGERENCIAS = 3
+COLUMNAS_SUGERENCIAS = ["Consulta", "Rango", "Sugerencia", "Texto", "Similitud", "Fuente"]
+FUENTE_RESOLUCIONES = "Resoluciones"
+
+
+def normalizar_texto(texto):
+    """
+    Esta función permite normalizar un texto para compararlo: sin tildes, en mayúsculas, y
+    solamente con letras, números y un espacio entre palabras.
+    """
+    texto = unicodedata.normalize("NFKD", str(texto))
+    texto = "".join(caracter for caracter in texto if not unicodedata.combining(caracter))
+    return " ".join(re.sub(r"[^0-9A-Z]+", " ", texto.upper()).split())
+
+
+def obtener_ngramas(texto, tamano_ngrama=TAMANO_NGRAMA):
+    """
+    Esta función permite obtener los n-gramas de caracteres de un texto normalizado. El texto
+    se rodea con espacios, para que los inicios y finales de palabra pesen más.
+    """
+    texto = f" {normalizar_texto(texto)} "
+    return [texto[i : i + tamano_ngrama] for i in range(len(texto) - tamano_ngrama + 1)]
+
+
+class IndiceNGramas:
+    """
+    Esta clase representa un índice de n-gramas sobre una lista de textos. Cada texto tiene un
+    valor asociado (Ej: el destino o el código de artículo), que es lo que se sugiere.
+    """
+
+    def __init__(self, textos, valores=None, fuente=None):
+        self.textos = np.array(list(textos), dtype=object)
+        self.valores = self.textos if valores is None else np.array(list(valores), dtype=object)
+        self.fuente = fuente
+
+        ngramas_textos = [obtener_ngramas(texto) for texto in self.textos]
+        self.vocabulario = pd.Index(
+            pd.unique(np.array(list(itertools.chain.from_iterable(ngramas_textos)), dtype=object))
+        )
+
+        conteos = self.contar_ngramas(ngramas_textos)
+        textos_por_ngrama = np.bincount(conteos.indices, minlength=len(self.vocabulario))
+        self.idf = np.log((1 + len(self.textos)) / (1 + textos_por_ngrama)) + 1
+        self.matriz = self.normalizar_filas(conteos @ sparse.diags(self.idf))
+
+    def contar_ngramas(self, ngramas_textos):
+        """
+        Esta función permite contar los n-gramas conocidos de cada texto, como una matriz
+        dispersa (textos x vocabulario). Los n-gramas que NO están en el vocabulario se
+        ignoran.
+        """
+        filas = np.repeat(
+            np.arange(len(ngramas_textos)), [len(ngramas) for ngramas in ngramas_textos]
+        )
+        columnas = self.vocabulario.get_indexer(
+            np.array(list(itertools.chain.from_iterable(ngramas_textos)), dtype=object)
+        )
+        filas, columnas = filas[columnas >= 0], columnas[columnas >= 0]
+
+        conteos = sparse.csr_matrix(
+            (np.ones(len(filas)), (filas, columnas)),
+            shape=(len(ngramas_textos), len(self.vocabulario)),
+        )
+        conteos.sum_duplicates()
+
+        return conteos
+
+    def normalizar_filas(self, matriz):
+        """
+        Esta función permite dejar cada fila de la matriz con norma 1, para que el producto
+        de dos filas sea su similitud coseno.
+        """
+        normas = np.sqrt(np.asarray(matriz.multiply(matriz).sum(axis=1)).ravel())
+        normas[normas == 0] = 1.0
+        return sparse.csr_matrix(sparse.diags(1 / normas) @ matriz)
+
+    def consultar(self, consultas, cantidad=CANTIDAD_SUGERENCIAS):
+        """
+        Esta función permite obtener los textos más parecidos a cada consulta. Todas las
+        consultas se comparan juntas con un solo producto de matrices.
+
+        Retorna un DataFrame con las columnas de COLUMNAS_SUGERENCIAS, con hasta "cantidad"
+        sugerencias por consulta, ordenadas de mayor a menor similitud.
+        """
+        consultas = list(consultas)
+        if not consultas or not len(self.textos):
+            return pd.DataFrame(columns=COLUMNAS_SUGERENCIAS)
+
+        matriz_consultas = self.normalizar_filas(
+            self.contar_ngramas([obtener_ngramas(consulta) for consulta in consultas])
+            @ sparse.diags(self.idf)
+        )
+        similitudes = sparse.csr_matrix(matriz_consultas @ self.matriz.T)
+
+        filas = []
+        for i, consulta in enumerate(consultas):
+            inicio, fin = similitudes.indptr[i], similitudes.indptr[i + 1]
+            posiciones = similitudes.indices[inicio:fin]
+            valores = similitudes.data[inicio:fin]
+
+            mejores = np.argsort(-valores, kind="stable")[:cantidad]
+            for rango, mejor in enumerate(mejores, start=1):
+                filas.append(
+                    [
+                        consulta,
+                        rango,
+                        self.valores[posiciones[mejor]],
+                        self.textos[posiciones[mejor]],
+                        round(float(valores[mejor]), 4),
+                        self.fuente,
+                    ]
+                )
+
+        return pd.DataFrame(filas, columns=COLUMNAS_SUGERENCIAS)
+
+
+@functools.lru_cache(maxsize=None)
+def obtener_indice_destinos():
+    """
+    Esta función entrega el índice de los destinos INT de DESTINO_INT_CC_SIGCOM que tienen un
+    centro de costo SIGCOM. Se construye la primera vez que se pide.
+    """
+    destinos = [destino for destino, cc in DESTINO_INT_CC_SIGCOM.items() if cc is not None]
+    return IndiceNGramas(destinos, fuente="Destinos")
+
+
+@functools.lru_cache(maxsize=None)
+def obtener_indice_articulos():
+    """
+    Esta función entrega el índice de las descripciones del maestro de artículos que tienen un
+    ítem SIGCOM. Cada descripción sugiere el primer código de artículo que la tiene. Se
+    construye la primera vez que se pide.
+    """
+    maestro_articulos = obtener_maestro_articulos()
+    posiciones = maestro_articulos.obtener_posiciones_vigentes()
+    codigos_descripcion = maestro_articulos.obtener_codigos_columna(posiciones, "Descripción")
+    con_item = maestro_articulos.obtener_codigos_columna(posiciones, "Total_SIGCOM") >= 0
+
+    posiciones_validas = np.flatnonzero(con_item & (codigos_descripcion >= 0))
+    descripciones_unicas, primeras = np.unique(
+        codigos_descripcion[posiciones_validas], return_index=True
+    )
+
+    return IndiceNGramas(
+        maestro_articulos.categorias["Descripción"][descripciones_unicas],
+        maestro_articulos.obtener_codigos_articulo(posiciones[posiciones_validas[primeras]]),
+        fuente="Maestro",
+    )
+
+
+def ordenar_sugerencias(sugerencias, cantidad=CANTIDAD_SUGERENCIAS):
+    """
+    Esta función permite juntar sugerencias de distintos índices: deja la mejor similitud de
+    cada sugerencia, y las primeras "cantidad" sugerencias de cada consulta.
+    """
+    sugerencias = pd.concat(sugerencias, ignore_index=True)
+    if sugerencias.empty:
+        return pd.DataFrame(columns=COLUMNAS_SUGERENCIAS)
+
+    sugerencias = sugerencias.sort_values(
+        ["Consulta", "Similitud"], ascending=[True, False], kind="stable"
+    )
+    sugerencias = sugerencias.drop_duplicates(["Consulta", "Sugerencia"])
+    sugerencias = sugerencias.groupby("Consulta", sort=False).head(cantidad).copy()
+    sugerencias["Rango"] = sugerencias.groupby("Consulta", sort=False).cumcount() + 1
+
+    return sugerencias.reset_index(drop=True)
+
+
+def sugerir_destinos(destinos_articulos, resoluciones_guardadas, cantidad=CANTIDAD_SUGERENCIAS):
+    """
+    Esta función permite sugerir destinos INT para artículos sin centro de costo. Recibe un
+    DataFrame con las columnas "Nombre" y "Destino" (el destino original de los movimientos
+    de cada artículo). Se sugieren:
+
+    - Los destinos de los artículos más parecidos ya resueltos ({nombre_articulo: destino}),
+    comparando los nombres de los artículos.
+    - Los destinos de DESTINO_INT_CC_SIGCOM más parecidos al destino original de los
+    movimientos del artículo.
+
+    En ambos casos la consulta de cada sugerencia es el nombre del artículo.
+    """
+    pares = destinos_articulos[["Nombre", "Destino"]].astype(str).drop_duplicates()
+
+    sugerencias_destinos = obtener_indice_destinos().consultar(pares["Destino"].unique(), cantidad)
+    sugerencias_destinos = pares.merge(
+        sugerencias_destinos, left_on="Destino", right_on="Consulta"
+    )
+    sugerencias_destinos["Consulta"] = sugerencias_destinos["Nombre"]
+    sugerencias = [sugerencias_destinos[COLUMNAS_SUGERENCIAS]]
+
+    if resoluciones_guardadas:
+        indice_resoluciones = IndiceNGramas(
+            resoluciones_guardadas.keys(),
+            resoluciones_guardadas.values(),
+            fuente=FUENTE_RESOLUCIONES,
+        )
+        sugerencias.append(indice_resoluciones.consultar(pares["Nombre"].unique(), cantidad))
+
+    return ordenar_sugerencias(sugerencias, cantidad)
+
+
+def sugerir_articulos(nombres_articulos, cantidad=CANTIDAD_SUGERENCIAS):
+    """
+    Esta función permite sugerir códigos de artículo del maestro, según la descripción de los
+    artículos con códigos desconocidos.
+    """
+    return ordenar_sugerencias([obtener_indice_articulos().consultar(nombres_articulos, cantidad)])
+
+
+def seleccionar_sugerencias(sugerencias, umbral, fuente=None):
+    """
+    Esta función permite obtener la mejor sugerencia de cada consulta, si su similitud es
+    mayor o igual al umbral, como un diccionario {consulta: sugerencia}. Si se entrega una
+    fuente, entonces solamente se consideran las sugerencias de esa fuente.
+    """
+    if fuente is not None:
+        sugerencias = sugerencias[sugerencias["Fuente"] == fuente]
+
+    mejores = sugerencias.sort_values("Similitud", ascending=False, kind="stable")
+    mejores = mejores.drop_duplicates("Consulta")
+    mejores = mejores[mejores["Similitud"] >= umbral]
+
+    return dict(zip(mejores["Consulta"], mejores["Sugerencia"]))
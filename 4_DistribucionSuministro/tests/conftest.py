@@ -0,0 +1,6 @@
+import os
+import sys
+
+# Los módulos del programa de suministros se importan directamente (Ej: import constantes), igual
+# que cuando se corren desde 4_DistribucionSuministro.
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,17 @@
+from dimensiones import obtener_ruta_registro_local, registrar_etiquetas
+
+
+def test_registrar_etiquetas_agrega_las_nuevas_al_registro_local(tmp_path):
+    ruta_registro = tmp_path / "centros_de_costo.txt"
+    ruta_registro.write_text("CC B\nCC A\n", encoding="utf-8")
+    ruta_registro_local = obtener_ruta_registro_local(str(ruta_registro))
+
+    etiquetas = registrar_etiquetas(str(ruta_registro), ["CC A", "CC D", "CC C", None])
+
+    assert etiquetas == ["CC B", "CC A", "CC C", "CC D"]
+    assert ruta_registro.read_text(encoding="utf-8") == "CC B\nCC A\n"
+    with open(ruta_registro_local, encoding="utf-8") as archivo:
+        assert archivo.read() == "CC C\nCC D\n"
+
+    # Las etiquetas ya registradas mantienen su código en las siguientes ejecuciones.
+    assert registrar_etiquetas(str(ruta_registro), ["CC E", "CC C"]) == etiquetas + ["CC E"]
@@ -0,0 +1,69 @@
+import os
+
+import pandas as pd
+import pytest
+
+import incremental
+from generador_sintetico import generar_entradas
+from incremental import ActualizadorIncremental
+from modulo_producciones import ModuloProducciones
+from modulo_suministros import NOMBRE_CARTOLA, AnalizadorSuministros
+
+CANTIDAD_MOVIMIENTOS = 3_000
+TAMANO_CHUNK = 500
+MES = "DICIEMBRE"
+
+
+@pytest.fixture
+def entradas(tmp_path, monkeypatch):
+    """
+    Genera entradas sintéticas con la cartola ordenada por destino, para que cada parte se lea
+    con categorías distintas. La cartola se lee en partes de TAMANO_CHUNK movimientos.
+    """
+    monkeypatch.setattr(incremental, "TAMANO_CHUNK_CARTOLA", TAMANO_CHUNK)
+
+    carpeta_input = str(tmp_path / "input")
+    ruta_resoluciones = generar_entradas(carpeta_input, CANTIDAD_MOVIMIENTOS)
+    ruta_cartola = os.path.join(carpeta_input, NOMBRE_CARTOLA)
+    pd.read_csv(ruta_cartola).sort_values("Destino").to_csv(ruta_cartola, index=False)
+
+    modulo = ModuloProducciones([MES], carpeta_input=carpeta_input, carpeta_salida=str(tmp_path))
+    _, df_prod = modulo.cargar_archivo()
+    producciones = modulo.separar_por_mes(modulo.obtener_desglose_por_unidad(df_prod))[MES]
+
+    return carpeta_input, ruta_resoluciones, producciones
+
+
+def correr(entradas, modo_incremental):
+    carpeta_input, ruta_resoluciones, producciones = entradas
+    analizador = AnalizadorSuministros(
+        carpeta_input=carpeta_input,
+        carpeta_salida=os.path.dirname(carpeta_input),
+        archivo_resoluciones=ruta_resoluciones,
+    )
+    if modo_incremental:
+        return ActualizadorIncremental(analizador).correr(producciones, guardar_excel=False)
+
+    return analizador.correr_programa(producciones, guardar_excel=False)
+
+
+def comparar_con_ejecucion_completa(entradas):
+    obtenido = correr(entradas, modo_incremental=True)
+    esperado = correr(entradas, modo_incremental=False)
+
+    for nombre in ["formato_relleno", "formato_desglosado"]:
+        pd.testing.assert_frame_equal(obtenido[nombre], esperado[nombre])
+
+
+def test_incremental_igual_a_ejecucion_completa(entradas):
+    comparar_con_ejecucion_completa(entradas)
+
+    # Se modifican movimientos de todas las partes, se eliminan otros, y se agregan repetidos.
+    ruta_cartola = os.path.join(entradas[0], NOMBRE_CARTOLA)
+    cartola = pd.read_csv(ruta_cartola)
+    cartola.loc[::7, "Neto Total"] *= 2
+    cartola = cartola.drop(cartola.index[3::11])
+    cartola = pd.concat([cartola, cartola.iloc[:40]])
+    cartola.to_csv(ruta_cartola, index=False)
+
+    comparar_con_ejecucion_completa(entradas)
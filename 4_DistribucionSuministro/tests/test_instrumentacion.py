@@ -0,0 +1,48 @@
+import json
+import threading
+import tracemalloc
+
+from instrumentacion import RegistroEtapas
+
+
+def leer_registro(ruta_registro):
+    with open(ruta_registro, encoding="utf-8") as archivo:
+        return {registro["etapa"]: registro for registro in map(json.loads, archivo)}
+
+
+def test_registro_sin_memoria_por_defecto(tmp_path):
+    ruta_registro = tmp_path / "registro.jsonl"
+    registro = RegistroEtapas("prueba", ruta_registro)
+
+    with registro.etapa("leer", 10) as informar_filas_salida:
+        assert not tracemalloc.is_tracing()
+        informar_filas_salida(4)
+    registro.guardar()
+
+    medicion = leer_registro(ruta_registro)["leer"]
+    assert (medicion["filas_entrada"], medicion["filas_salida"]) == (10, 4)
+    assert medicion["memoria_maxima_mb"] is None
+
+
+def test_registro_con_memoria_detiene_tracemalloc(tmp_path):
+    ruta_registro = tmp_path / "registro.jsonl"
+    registro = RegistroEtapas("prueba", ruta_registro, medir_memoria=True)
+
+    def etapa_en_otro_hilo():
+        with registro.etapa("hilo"):
+            bytearray(2**20)
+
+    with registro.etapa("externa"):
+        with registro.etapa("anidada"):
+            datos = bytearray(4 * 2**20)
+        hilo = threading.Thread(target=etapa_en_otro_hilo)
+        hilo.start()
+        hilo.join()
+        assert tracemalloc.is_tracing()
+    registro.guardar()
+
+    assert not tracemalloc.is_tracing()
+    mediciones = leer_registro(ruta_registro)
+    assert mediciones["externa"]["memoria_maxima_mb"] >= len(datos) / 2**20
+    assert mediciones["anidada"]["memoria_maxima_mb"] is None
+    assert mediciones["hilo"]["memoria_maxima_mb"] is None
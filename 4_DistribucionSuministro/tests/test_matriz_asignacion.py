@@ -0,0 +1,81 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from matriz_asignacion import desglosar_cambios, desglosar_formato, obtener_desgloses_afectados
+
+CENTROS_DE_COSTO = ["ORIGEN 1", "ORIGEN 2", "SUB A", "SUB B", "SUB C", "OTRO"]
+ITEMS = ["ITEM 1", "ITEM 2", "ITEM 3"]
+
+# El segundo desglose reparte el monto que el primero le dejó a SUB A, y el tercero conserva
+# parte del monto en su propio centro de costo.
+DESGLOSES = {
+    "ORIGEN 1": pd.Series({"SUB A": 0.6, "SUB B": 0.4}),
+    "SUB A": pd.Series({"SUB B": 0.25, "SUB C": 0.75}),
+    "ORIGEN 2": pd.Series({"ORIGEN 2": 0.5, "SUB C": 0.3, "OTRO": 0.2}),
+}
+
+
+def desglosar_con_ciclo(formato, desgloses):
+    """
+    Esta función aplica los desgloses con el ciclo original del programa de suministros (un
+    desglose y una subunidad a la vez), para comparar.
+    """
+    formato = formato.copy()
+    for cc_a_desglosar, resumen_porcentajes in desgloses.items():
+        total = formato.loc[cc_a_desglosar, :].copy()
+        for cc_subunidad, porcentaje_subunidad in resumen_porcentajes.items():
+            desglose = total * porcentaje_subunidad
+
+            if cc_subunidad != cc_a_desglosar:
+                dinero_previo = formato.loc[cc_subunidad]
+                desglose = desglose.add(dinero_previo, fill_value=0)
+            formato.loc[cc_subunidad] = desglose
+
+    return formato
+
+
+def generar_formato(semilla):
+    generador = np.random.default_rng(semilla)
+    valores = generador.uniform(0, 1000, size=(len(CENTROS_DE_COSTO), len(ITEMS)))
+    valores[generador.random(valores.shape) < 0.4] = np.nan
+
+    return pd.DataFrame(valores, index=CENTROS_DE_COSTO, columns=ITEMS)
+
+
+@pytest.mark.parametrize("semilla", range(10))
+def test_desglosar_formato_igual_al_ciclo_original(semilla):
+    formato = generar_formato(semilla)
+
+    esperado = desglosar_con_ciclo(formato, DESGLOSES)
+    obtenido = desglosar_formato(formato, DESGLOSES)
+
+    pd.testing.assert_frame_equal(obtenido, esperado)
+
+
+@pytest.mark.parametrize(
+    "cambios",
+    [
+        {("ORIGEN 2", "ITEM 1"): 123.0},
+        {("SUB A", "ITEM 2"): 50.0, ("OTRO", "ITEM 3"): -20.0},
+        {("ORIGEN 1", "ITEM 1"): 0.0, ("ORIGEN 1", "ITEM 3"): 999.0},
+    ],
+)
+def test_desglosar_cambios_igual_a_recalcular(cambios):
+    formato_previo = generar_formato(3)
+    desglosado_previo = desglosar_formato(formato_previo, DESGLOSES)
+
+    formato = formato_previo.copy()
+    for (centro_de_costo, item), monto in cambios.items():
+        formato.loc[centro_de_costo, item] = monto
+
+    esperado = desglosar_formato(formato, DESGLOSES)
+    obtenido = desglosar_cambios(formato, formato_previo, desglosado_previo, DESGLOSES)
+
+    pd.testing.assert_frame_equal(obtenido, esperado)
+
+
+def test_obtener_desgloses_afectados_sigue_los_desgloses_encadenados():
+    afectados = obtener_desgloses_afectados(DESGLOSES, ["ORIGEN 1"])
+
+    assert list(afectados) == ["ORIGEN 1", "SUB A"]
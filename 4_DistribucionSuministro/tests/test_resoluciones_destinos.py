@@ -0,0 +1,23 @@
+import pytest
+
+from constantes import DESTINO_INT_CC_SIGCOM
+from resoluciones_destinos import leer_resoluciones
+
+
+def test_leer_resoluciones_avisa_destinos_desconocidos(tmp_path):
+    destino = next(iter(DESTINO_INT_CC_SIGCOM))
+    ruta_resoluciones = tmp_path / "resoluciones.csv"
+    ruta_resoluciones.write_text(
+        "Nombre,Destino\n"
+        f"GASA,{destino}\n"
+        "JERINGA,DESTINO MAL ESCRITO\n"
+        "SUERO,DESTINO MAL ESCRITO\n"
+        f"SUERO,{destino}\n",
+        encoding="utf-8",
+    )
+
+    with pytest.warns(UserWarning, match="JERINGA -> DESTINO MAL ESCRITO") as avisos:
+        resoluciones = leer_resoluciones(ruta_resoluciones)
+
+    assert "SUERO -> DESTINO MAL ESCRITO" in str(avisos[0].message)
+    assert resoluciones == {"GASA": destino, "SUERO": destino}
@@ -0,0 +1,78 @@
+import pandas as pd
+import pytest
+
+from constantes import DESTINO_INT_CC_SIGCOM
+from sugerencias import (
+    COLUMNAS_SUGERENCIAS,
+    FUENTE_RESOLUCIONES,
+    normalizar_texto,
+    seleccionar_sugerencias,
+    sugerir_destinos,
+)
+
+SUGERENCIAS = pd.DataFrame(
+    [
+        ["GASA", 1, "BODEGA UCI", "GASAS", 0.95, "Destinos"],
+        ["GASA", 2, "BODEGA PABELLON", "GASA ESTERIL", 0.70, FUENTE_RESOLUCIONES],
+        ["SUERO", 1, "BODEGA UCI", "SUERO FISIOLOGICO", 0.60, FUENTE_RESOLUCIONES],
+        ["JERINGA", 1, "ESTERILIZACION", "JERINGA 10 ML", 0.59, FUENTE_RESOLUCIONES],
+    ],
+    columns=COLUMNAS_SUGERENCIAS,
+)
+
+
+def test_normalizar_texto():
+    assert normalizar_texto("  Esterilización, 2do piso ") == "ESTERILIZACION 2DO PISO"
+
+
+@pytest.mark.parametrize(
+    "umbral, esperado",
+    [
+        (0.0, {"GASA": "BODEGA UCI", "SUERO": "BODEGA UCI", "JERINGA": "ESTERILIZACION"}),
+        (0.6, {"GASA": "BODEGA UCI", "SUERO": "BODEGA UCI"}),
+        (0.96, {}),
+    ],
+)
+def test_seleccionar_sugerencias_respeta_el_umbral(umbral, esperado):
+    assert seleccionar_sugerencias(SUGERENCIAS, umbral) == esperado
+
+
+@pytest.mark.parametrize(
+    "umbral, esperado",
+    [
+        (0.6, {"GASA": "BODEGA PABELLON", "SUERO": "BODEGA UCI"}),
+        (0.8, {}),
+    ],
+)
+def test_seleccionar_sugerencias_de_una_fuente(umbral, esperado):
+    obtenido = seleccionar_sugerencias(SUGERENCIAS, umbral, fuente=FUENTE_RESOLUCIONES)
+
+    assert obtenido == esperado
+
+
+def test_sugerir_destinos_compara_el_destino_original():
+    destino = next(
+        destino for destino, cc in DESTINO_INT_CC_SIGCOM.items() if cc is not None
+    )
+    destinos_articulos = pd.DataFrame(
+        {"Nombre": ["ARTICULO SIN RELACION"], "Destino": [destino.lower()]}
+    )
+
+    sugerencias = sugerir_destinos(destinos_articulos, {})
+    mejor = sugerencias.iloc[0]
+
+    assert (mejor["Consulta"], mejor["Sugerencia"]) == ("ARTICULO SIN RELACION", destino)
+    assert mejor["Similitud"] == pytest.approx(1.0)
+    assert set(sugerencias["Fuente"]) == {"Destinos"}
+
+
+def test_sugerir_destinos_usa_los_articulos_resueltos():
+    destinos_articulos = pd.DataFrame(
+        {"Nombre": ["GUANTE QUIRURGICO 7.5"], "Destino": ["DESTINO DESCONOCIDO"]}
+    )
+    resoluciones = {"GUANTE QUIRURGICO 7": "BODEGA UCI"}
+
+    sugerencias = sugerir_destinos(destinos_articulos, resoluciones)
+    seleccionadas = seleccionar_sugerencias(sugerencias, 0.5, fuente=FUENTE_RESOLUCIONES)
+
+    assert seleccionadas == {"GUANTE QUIRURGICO 7.5": "BODEGA UCI"}
@@ -0,0 +1,261 @@
+"""
+Este archivo permite rastrear el origen de cada celda del formato 4 desglosado: qué movimientos
+de la cartola (y qué filas del consumo de Farmacia) aportan a la celda, cuánto aporta cada uno,
+y por qué desgloses pasó el monto para llegar a esa celda.
+
+La trazabilidad es una matriz dispersa (movimientos x celdas del formato desglosado), donde
+cada valor es el monto que el movimiento aporta a la celda después de los desgloses. Se guarda
+por columnas y por filas, por lo que consultar una celda (o un movimiento) es leer solamente
+sus valores distintos de 0.
+
+Uso: python trazabilidad.py "CENTRO DE COSTO" "ITEM SIGCOM" [carpeta_trazabilidad]
+"""
+
+import os
+import sys
+import json
+
+import numpy as np
+import pandas as pd
+from scipy import sparse
+
+from matriz_asignacion import construir_matriz_asignacion
+from constantes import (
+    COLUMNA_MONTO_FARMACIA,
+    COLUMNA_SERVICIO_FARMACIA,
+    COLUMNAS_CARTOLA_ADICIONALES,
+    ITEM_SIGCOM_FARMACIA,
+)
+
+CARPETA_TRAZABILIDAD = "trazabilidad"
+NOMBRE_MATRIZ_TRAZABILIDAD = "matriz.npz"
+NOMBRE_MOVIMIENTOS_TRAZABILIDAD = "movimientos.parquet"
+NOMBRE_METADATOS_TRAZABILIDAD = "metadatos.json"
+
+COLUMNAS_MOVIMIENTOS = ["Fuente", "Fila", "Nombre", "Destino", "CC Origen", "Item SIGCOM", "Monto"]
+
+
+class Trazabilidad:
+    """
+    Esta clase representa la matriz de trazabilidad de un formato desglosado, y permite
+    consultar los aportes de cada celda y de cada movimiento.
+    """
+
+    def __init__(self, matriz, movimientos, centros_de_costo, items_sigcom, desgloses):
+        self.matriz_por_celda = sparse.csc_matrix(matriz)
+        self.matriz_por_movimiento = sparse.csr_matrix(matriz)
+        self.movimientos = movimientos.reset_index(drop=True)
+        self.centros_de_costo = pd.Index(centros_de_costo)
+        self.items_sigcom = pd.Index(items_sigcom)
+        self.desgloses = desgloses
+
+    def obtener_celda(self, centro_de_costo, item_sigcom):
+        """
+        Esta función permite obtener la columna de la matriz que corresponde a una celda del
+        formato desglosado.
+        """
+        posicion_cc = self.centros_de_costo.get_loc(centro_de_costo)
+        posicion_item = self.items_sigcom.get_loc(item_sigcom)
+
+        return posicion_cc * len(self.items_sigcom) + posicion_item
+
+    def consultar_celda(self, centro_de_costo, item_sigcom):
+        """
+        Esta función permite obtener los movimientos que aportan a una celda del formato
+        desglosado, ordenados de mayor a menor aporte. Cada movimiento trae su aporte a la
+        celda, el porcentaje de su monto que llega a la celda, y la ruta de desgloses.
+        """
+        celda = self.obtener_celda(centro_de_costo, item_sigcom)
+        inicio, fin = self.matriz_por_celda.indptr[celda], self.matriz_por_celda.indptr[celda + 1]
+        filas = self.matriz_por_celda.indices[inicio:fin]
+
+        aportes = self.movimientos.iloc[filas].copy()
+        aportes["Aporte"] = self.matriz_por_celda.data[inicio:fin]
+        aportes["Porcentaje"] = aportes["Aporte"] / aportes["Monto"]
+
+        rutas = {
+            cc_origen: self.obtener_ruta(cc_origen, centro_de_costo)
+            for cc_origen in aportes["CC Origen"].unique()
+        }
+        aportes["Ruta"] = aportes["CC Origen"].map(rutas)
+
+        return aportes.sort_values("Aporte", ascending=False, key=np.abs)
+
+    def consultar_movimiento(self, posicion_movimiento):
+        """
+        Esta función permite obtener las celdas del formato desglosado a las que aporta un
+        movimiento (su posición en self.movimientos), y cuánto aporta a cada una.
+        """
+        inicio = self.matriz_por_movimiento.indptr[posicion_movimiento]
+        fin = self.matriz_por_movimiento.indptr[posicion_movimiento + 1]
+        celdas = self.matriz_por_movimiento.indices[inicio:fin]
+
+        posiciones_cc, posiciones_item = np.divmod(celdas, len(self.items_sigcom))
+        return pd.DataFrame(
+            {
+                "Centro de Costo": self.centros_de_costo[posiciones_cc],
+                "Item SIGCOM": self.items_sigcom[posiciones_item],
+                "Aporte": self.matriz_por_movimiento.data[inicio:fin],
+            }
+        )
+
+    def obtener_ruta(self, cc_origen, cc_destino):
+        """
+        Esta función permite obtener la ruta de desgloses por la que pasa el monto de un centro
+        de costo hasta otro (Ej: "15026-PROCEDIMIENTOS DE CARDIOLOGÍA -> 15105-CONSULTA
+        CARDIOLOGÍA (12.50%)"). Si hay varias rutas, se separan con " | ".
+        """
+        rutas = {cc_origen: [("", 1.0)]}
+        for cc_a_desglosar, porcentajes in self.desgloses.items():
+            if cc_a_desglosar not in rutas:
+                continue
+
+            rutas_origen = rutas.pop(cc_a_desglosar)
+            for subunidad, porcentaje in porcentajes.items():
+                paso = f"{cc_a_desglosar} -> {subunidad} ({porcentaje:.2%})"
+                rutas.setdefault(subunidad, []).extend(
+                    (f"{ruta}; {paso}" if ruta else paso, peso * porcentaje)
+                    for ruta, peso in rutas_origen
+                )
+            if cc_a_desglosar not in porcentajes.index:
+                rutas.setdefault(cc_a_desglosar, []).extend(rutas_origen)
+
+        return " | ".join(ruta or "Directo" for ruta, _ in rutas.get(cc_destino, []))
+
+    def guardar(self, carpeta):
+        """
+        Esta función permite guardar la trazabilidad en una carpeta, para consultarla después
+        sin volver a correr el programa (ver cargar_trazabilidad).
+        """
+        os.makedirs(carpeta, exist_ok=True)
+        sparse.save_npz(os.path.join(carpeta, NOMBRE_MATRIZ_TRAZABILIDAD), self.matriz_por_celda)
+        self.movimientos.to_parquet(os.path.join(carpeta, NOMBRE_MOVIMIENTOS_TRAZABILIDAD))
+
+        metadatos = {
+            "centros_de_costo": list(self.centros_de_costo),
+            "items_sigcom": list(self.items_sigcom),
+            "desgloses": {
+                cc_a_desglosar: porcentajes.to_dict()
+                for cc_a_desglosar, porcentajes in self.desgloses.items()
+            },
+        }
+        ruta_metadatos = os.path.join(carpeta, NOMBRE_METADATOS_TRAZABILIDAD)
+        with open(ruta_metadatos, "w", encoding="utf-8") as file:
+            json.dump(metadatos, file, ensure_ascii=False)
+
+
+def obtener_movimientos(df_completa, consumo_farmacia=None):
+    """
+    Esta función permite juntar los movimientos de la cartola y las filas del consumo de
+    Farmacia en una sola tabla, con las columnas de COLUMNAS_MOVIMIENTOS. "Fila" es el índice
+    original de cada movimiento en su archivo. Las columnas adicionales de la cartola (Ej:
+    "Fecha"), si están, se agregan al final (vacías para Farmacia).
+    """
+    columnas_adicionales = [
+        columna for columna in COLUMNAS_CARTOLA_ADICIONALES if columna in df_completa
+    ]
+    movimientos = [
+        pd.DataFrame(
+            {
+                "Fuente": "Cartola",
+                "Fila": df_completa.index,
+                "Nombre": df_completa["Nombre"].astype(object),
+                "Destino": df_completa["Destino"].astype(object),
+                "CC Origen": df_completa["CC SIGCOM"].astype(object),
+                "Item SIGCOM": df_completa["Tipo_Articulo_SIGCOM"].astype(object),
+                "Monto": df_completa["Neto Total"].astype(float),
+                **{
+                    columna: df_completa[columna].astype(object)
+                    for columna in columnas_adicionales
+                },
+            }
+        )
+    ]
+
+    if consumo_farmacia is not None and not consumo_farmacia.empty:
+        movimientos.append(
+            pd.DataFrame(
+                {
+                    "Fuente": "Farmacia",
+                    "Fila": consumo_farmacia.index,
+                    "Nombre": consumo_farmacia[COLUMNA_SERVICIO_FARMACIA].astype(object),
+                    "Destino": consumo_farmacia[COLUMNA_SERVICIO_FARMACIA].astype(object),
+                    "CC Origen": consumo_farmacia["CC SIGCOM"].astype(object),
+                    "Item SIGCOM": ITEM_SIGCOM_FARMACIA,
+                    "Monto": consumo_farmacia[COLUMNA_MONTO_FARMACIA].astype(float),
+                }
+            )
+        )
+
+    movimientos = pd.concat(movimientos, ignore_index=True)[
+        COLUMNAS_MOVIMIENTOS + columnas_adicionales
+    ]
+    return movimientos.dropna(subset=["CC Origen", "Item SIGCOM", "Monto"])
+
+
+def construir_trazabilidad(formato_desglosado, desgloses, df_completa, consumo_farmacia=None):
+    """
+    Esta función permite construir la matriz de trazabilidad. El monto de cada movimiento
+    llega a su centro de costo e ítem en el formato relleno, y luego se reparte según la
+    matriz de asignación de los desgloses (ver matriz_asignacion.py): el aporte del movimiento
+    a la celda (cc, ítem) es su monto por el peso de su centro de costo de origen en cc.
+
+    Las celdas que reciben monto son las mismas del formato desglosado, por lo que la suma de
+    cada columna es el monto de la celda que viene de la cartola y de Farmacia.
+    """
+    centros_de_costo = formato_desglosado.index
+    items_sigcom = formato_desglosado.columns
+    movimientos = obtener_movimientos(df_completa, consumo_farmacia)
+
+    posiciones_cc = centros_de_costo.get_indexer(movimientos["CC Origen"])
+    posiciones_item = items_sigcom.get_indexer(movimientos["Item SIGCOM"])
+    en_formato = (posiciones_cc >= 0) & (posiciones_item >= 0)
+    movimientos = movimientos[en_formato]
+    posiciones_cc, posiciones_item = posiciones_cc[en_formato], posiciones_item[en_formato]
+
+    matriz_asignacion, _ = construir_matriz_asignacion(centros_de_costo, desgloses)
+    movimiento_a_origen = sparse.csr_matrix(
+        (np.ones(len(movimientos)), (np.arange(len(movimientos)), posiciones_cc)),
+        shape=(len(movimientos), len(centros_de_costo)),
+    )
+    pesos = sparse.coo_matrix(movimiento_a_origen @ matriz_asignacion.T)
+
+    filas = pesos.row
+    columnas = pesos.col * len(items_sigcom) + posiciones_item[filas]
+    aportes = pesos.data * movimientos["Monto"].to_numpy()[filas]
+    con_aporte = np.isfinite(aportes) & (aportes != 0)
+
+    matriz = sparse.csc_matrix(
+        (aportes[con_aporte], (filas[con_aporte], columnas[con_aporte])),
+        shape=(len(movimientos), len(centros_de_costo) * len(items_sigcom)),
+    )
+
+    return Trazabilidad(matriz, movimientos, centros_de_costo, items_sigcom, desgloses)
+
+
+def cargar_trazabilidad(carpeta=CARPETA_TRAZABILIDAD):
+    """
+    Esta función permite cargar una trazabilidad guardada con Trazabilidad.guardar.
+    """
+    with open(os.path.join(carpeta, NOMBRE_METADATOS_TRAZABILIDAD), encoding="utf-8") as file:
+        metadatos = json.load(file)
+
+    return Trazabilidad(
+        sparse.load_npz(os.path.join(carpeta, NOMBRE_MATRIZ_TRAZABILIDAD)),
+        pd.read_parquet(os.path.join(carpeta, NOMBRE_MOVIMIENTOS_TRAZABILIDAD)),
+        metadatos["centros_de_costo"],
+        metadatos["items_sigcom"],
+        {
+            cc_a_desglosar: pd.Series(porcentajes, dtype=float)
+            for cc_a_desglosar, porcentajes in metadatos["desgloses"].items()
+        },
+    )
+
+
+if __name__ == "__main__":
+    carpeta_trazabilidad = sys.argv[3] if len(sys.argv) > 3 else CARPETA_TRAZABILIDAD
+    trazabilidad = cargar_trazabilidad(carpeta_trazabilidad)
+
+    aportes_celda = trazabilidad.consultar_celda(sys.argv[1], sys.argv[2])
+    print(aportes_celda.to_markdown(index=False))
+    print(f"\nTotal: {aportes_celda['Aporte'].sum()}")
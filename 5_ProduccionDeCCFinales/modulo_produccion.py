@@ -0,0 +1,191 @@
+"""
+Este archivo permite obtener el costo por unidad de producción de los centros de costo finales
+del SIGCOM: el costo asignado a cada centro de costo (formato 4 desglosado, ver
+AnalizadorSuministros) dividido por su producción del mes (ver ModuloProducciones).
+
+Los costos de todos los meses se ordenan en un solo arreglo (meses x centros de costo x ítems
+SIGCOM), y se dividen por la producción (meses x centros de costo) en una sola operación.
+
+Solamente se calculan los centros de costo finales: los centros de costo de apoyo
+(CENTROS_DE_COSTO_DE_APOYO) distribuyen su costo a los finales (ver
+6_DistribucionDeProduccionDeCCDeApoyo). Los centros de costo finales sin producción en un mes
+quedan sin costo unitario (NaN), y los que además tienen costo se informan, ya que ese costo NO
+queda en ningún costo unitario.
+
+Uso: python modulo_produccion.py MES=output_suministros.xlsx [MES=output_suministros.xlsx ...]
+"""
+
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+CARPETA_SUMINISTROS = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), "..", "4_DistribucionSuministro"
+)
+sys.path.append(CARPETA_SUMINISTROS)
+
+from constantes import DICCIONARIO_PRODUCIONES_SIGCOM  # noqa: E402
+from escritura import escribir_libro  # noqa: E402
+from modulo_producciones import ModuloProducciones  # noqa: E402
+
+# Los egresos y traslados de las unidades de pacientes críticos se miden en otra unidad que
+# los días cama, por lo que NO se suman a la producción del centro de costo.
+SERVICIOS_PRODUCCION_SIGCOM = {
+    servicio: cc
+    for servicio, cc in DICCIONARIO_PRODUCIONES_SIGCOM.items()
+    if "(Egresos)" not in servicio and "(Traslados)" not in servicio
+}
+
+# Centros de costo de apoyo: su costo se distribuye a los centros de costo finales, por lo que
+# NO tienen costo unitario propio.
+CENTROS_DE_COSTO_DE_APOYO = [
+    "652-SERVICIO DE ALIMENTACIÓN",
+    "670-ADMINISTRACIÓN",
+    "95301-CENTRAL DE ESTERILIZACIÓN",
+]
+
+NOMBRE_SALIDA = "output_costos_unitarios.xlsx"
+NOMBRE_HOJA_SIN_PRODUCCION = "sin_produccion"
+
+
+class CalculadoraCostosUnitarios:
+    """
+    Esta clase permite calcular el costo por unidad de producción de cada centro de costo
+    final, ítem SIGCOM y mes.
+    """
+
+    def __init__(self, carpeta_input="input", carpeta_salida="."):
+        self.carpeta_input = carpeta_input
+        self.carpeta_salida = carpeta_salida
+        self.costos_sin_produccion = pd.DataFrame(columns=["Mes", "Centro de Costo", "Costo"])
+
+    def correr_programa(self, formatos_por_mes, guardar_excel=True):
+        """
+        Esta es la función principal del programa. Recibe el formato 4 desglosado de cada mes
+        ({mes: DataFrame con un centro de costo por fila y un ítem SIGCOM por columna}), lee la
+        producción de esos meses, y calcula los costos unitarios.
+
+        Los centros de costo finales con costo y sin producción quedan en
+        self.costos_sin_produccion (y en la hoja sin_produccion del Excel).
+
+        Retorna un diccionario del tipo {mes: DataFrame de costos unitarios}.
+        """
+        meses = list(formatos_por_mes)
+        produccion = self.leer_produccion(meses)
+        costos_unitarios = self.calcular_costos_unitarios(formatos_por_mes, produccion)
+        self.informar_costos_sin_produccion()
+
+        if guardar_excel:
+            escribir_libro(
+                os.path.join(self.carpeta_salida, NOMBRE_SALIDA),
+                {**costos_unitarios, NOMBRE_HOJA_SIN_PRODUCCION: self.costos_sin_produccion},
+            )
+
+        return costos_unitarios
+
+    def leer_produccion(self, meses):
+        """
+        Esta función permite leer la producción de los meses pedidos (ver
+        ModuloProducciones.cargar_archivo), y sumarla por centro de costo SIGCOM.
+
+        Retorna un DataFrame con un centro de costo por fila y un mes por columna.
+        """
+        modulo_producciones = ModuloProducciones(
+            meses, carpeta_input=self.carpeta_input, medir_memoria=False
+        )
+        _, df_produccion = modulo_producciones.cargar_archivo()
+
+        centros_de_costo = df_produccion["SERVICIOS FINALES"].map(SERVICIOS_PRODUCCION_SIGCOM)
+        df_produccion = df_produccion[centros_de_costo.notna()]
+
+        return (
+            df_produccion[meses]
+            .astype(float)
+            .groupby(centros_de_costo[centros_de_costo.notna()].to_numpy())
+            .sum()
+        )
+
+    def calcular_costos_unitarios(self, formatos_por_mes, produccion):
+        """
+        Esta función permite dividir los costos de todos los meses por la producción de cada
+        centro de costo en una sola operación. Los formatos se alinean a los mismos centros de
+        costo finales e ítems SIGCOM, y se agrega la columna TOTAL con el costo unitario de
+        todos los ítems.
+
+        Los centros de costo sin producción (o con producción 0) quedan con NaN. Los que además
+        tienen costo quedan en self.costos_sin_produccion.
+        """
+        meses = list(formatos_por_mes)
+        centros_de_costo = pd.Index(
+            sorted(set().union(*(formato.index for formato in formatos_por_mes.values()))),
+            name="Centro de Costo",
+        )
+        centros_de_costo = centros_de_costo[~centros_de_costo.isin(CENTROS_DE_COSTO_DE_APOYO)]
+        items_sigcom = pd.Index(
+            sorted(set().union(*(formato.columns for formato in formatos_por_mes.values())))
+        )
+
+        costos = np.stack(
+            [
+                formato.reindex(index=centros_de_costo, columns=items_sigcom).to_numpy(float)
+                for formato in formatos_por_mes.values()
+            ]
+        )
+        costos = np.concatenate([costos, np.nansum(costos, axis=2, keepdims=True)], axis=2)
+
+        volumenes = produccion.reindex(index=centros_de_costo, columns=meses).to_numpy().T
+        volumenes = np.nan_to_num(volumenes)[:, :, np.newaxis]
+
+        costos_unitarios = np.divide(
+            costos, volumenes, out=np.full_like(costos, np.nan), where=volumenes > 0
+        )
+
+        costo_total = costos[:, :, -1]
+        sin_produccion = (volumenes[:, :, 0] <= 0) & (np.abs(costo_total) > 0)
+        posiciones_meses, posiciones_cc = np.nonzero(sin_produccion)
+        self.costos_sin_produccion = pd.DataFrame(
+            {
+                "Mes": np.array(meses, dtype=object)[posiciones_meses],
+                "Centro de Costo": centros_de_costo[posiciones_cc],
+                "Costo": costo_total[sin_produccion],
+            }
+        )
+
+        columnas = items_sigcom.append(pd.Index(["TOTAL"]))
+        return {
+            mes: pd.DataFrame(costos_unitarios[i], index=centros_de_costo, columns=columnas)
+            for i, mes in enumerate(meses)
+        }
+
+    def informar_costos_sin_produccion(self):
+        """
+        Esta función permite mostrar los centros de costo finales que tienen costo en un mes
+        sin producción. Su costo NO queda en ningún costo unitario.
+        """
+        if self.costos_sin_produccion.empty:
+            return
+
+        print("\n- Centros de costo finales con costo y sin producción (sin costo unitario) - \n")
+        print(f"{self.costos_sin_produccion.to_markdown(index=False)}")
+
+
+def leer_formatos(argumentos):
+    """
+    Esta función permite leer el formato 4 desglosado de cada mes, desde los argumentos del
+    tipo MES=ruta_output_suministros.xlsx.
+    """
+    formatos_por_mes = {}
+    for argumento in argumentos:
+        mes, ruta_output = argumento.split("=", 1)
+        formatos_por_mes[mes] = pd.read_excel(
+            ruta_output, sheet_name="formato_desglosado", index_col=0
+        )
+
+    return formatos_por_mes
+
+
+if __name__ == "__main__":
+    calculadora = CalculadoraCostosUnitarios()
+    calculadora.correr_programa(leer_formatos(sys.argv[1:]))
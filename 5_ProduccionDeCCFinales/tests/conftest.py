@@ -0,0 +1,6 @@
+import os
+import sys
+
+# modulo_produccion.py se importa directamente, igual que cuando se corre desde
+# 5_ProduccionDeCCFinales. Al importarlo, agrega 4_DistribucionSuministro al path.
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
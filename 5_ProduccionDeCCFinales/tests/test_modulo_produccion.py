@@ -0,0 +1,71 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from modulo_produccion import CENTROS_DE_COSTO_DE_APOYO, CalculadoraCostosUnitarios
+from constantes import MESES
+
+UCI = "166-UNIDAD DE CUIDADOS INTENSIVOS"
+MEDICINA = "66-HOSPITALIZACIÓN MEDICINA INTERNA"
+CONSULTA = "15105-CONSULTA CARDIOLOGÍA"
+APOYO = CENTROS_DE_COSTO_DE_APOYO[0]
+
+
+def test_calcular_costos_unitarios():
+    formatos_por_mes = {
+        "ENERO": pd.DataFrame(
+            {"ITEM 1": [100.0, 30.0, 50.0, 7.0], "ITEM 2": [300.0, np.nan, 0.0, 1.0]},
+            index=[UCI, MEDICINA, CONSULTA, APOYO],
+        ),
+        "FEBRERO": pd.DataFrame({"ITEM 1": [80.0]}, index=[UCI]),
+    }
+    produccion = pd.DataFrame(
+        {"ENERO": [4.0, 0.0], "FEBRERO": [8.0, 2.0]}, index=[UCI, MEDICINA]
+    )
+
+    calculadora = CalculadoraCostosUnitarios()
+    costos_unitarios = calculadora.calcular_costos_unitarios(formatos_por_mes, produccion)
+
+    enero = costos_unitarios["ENERO"]
+    assert list(enero.index) == sorted([UCI, MEDICINA, CONSULTA])
+    assert list(enero.columns) == ["ITEM 1", "ITEM 2", "TOTAL"]
+    assert enero.loc[UCI].to_list() == [25.0, 75.0, 100.0]
+    # Medicina tiene producción 0 y Consulta NO tiene producción: quedan sin costo unitario.
+    assert enero.loc[[MEDICINA, CONSULTA]].isna().all().all()
+
+    febrero = costos_unitarios["FEBRERO"]
+    assert febrero.loc[UCI, "TOTAL"] == 10.0
+    # Medicina tiene producción y NO tiene costo: su costo unitario total es 0.
+    assert febrero.loc[MEDICINA].to_list()[-1] == 0.0
+
+    esperado = pd.DataFrame(
+        {
+            "Mes": ["ENERO", "ENERO"],
+            "Centro de Costo": [CONSULTA, MEDICINA],
+            "Costo": [50.0, 30.0],
+        }
+    )
+    pd.testing.assert_frame_equal(
+        calculadora.costos_sin_produccion, esperado, check_index_type=False
+    )
+
+
+def test_leer_produccion_excluye_egresos_y_traslados(tmp_path):
+    servicios = [
+        "UNIDAD DE CUIDADOS INTENSIVOS",
+        "UNIDAD DE CUIDADOS INTENSIVOS (Egresos)",
+        "UNIDAD DE CUIDADOS INTENSIVOS (Traslados)",
+        "HOSPITALIZACION MEDICINA INTERNA",
+    ]
+    df_produccion = pd.DataFrame(
+        {"SERVICIOS FINALES": ["DIAS CAMA OCUPADOS", "EGRESOS", None] + servicios}
+    )
+    for mes in MESES:
+        df_produccion[mes] = [0, 0, 0, 10, 1_000, 100_000, 7]
+    df_produccion["TOTAL AÑO"] = df_produccion[MESES].sum(axis=1)
+    df_produccion.to_excel(tmp_path / "Producción 2022.xlsx", index=False)
+
+    calculadora = CalculadoraCostosUnitarios(carpeta_input=str(tmp_path))
+    produccion = calculadora.leer_produccion(["MARZO"])
+
+    assert produccion["MARZO"].to_dict() == pytest.approx({UCI: 10.0, MEDICINA: 7.0})
@@ -1,19 +1,54 @@
 # -*- coding: utf-8 -*-
+"""
+Uso (desde 6_DistribucionDeProduccionDeCCDeApoyo):
+python -m src.data.make_dataset data/raw data/processed
+
+data/raw debe tener produccion_cc_apoyo.csv (ver COLUMNAS_PRODUCCION en
+src/features/build_features.py) y costos_directos.csv (columnas "Mes",
+"Centro de Costo" y una columna por ítem de costo).
+"""
 import click
 import logging
 from pathlib import Path
 from dotenv import find_dotenv, load_dotenv
 
+import pandas as pd
+
+from src.models.distribucion_reciproca import distribuir_costos_apoyo
+
+NOMBRE_PRODUCCION_APOYO = "produccion_cc_apoyo.csv"
+NOMBRE_COSTOS_DIRECTOS = "costos_directos.csv"
+
+
+def leer_entradas(carpeta_input):
+    """
+    Esta función permite leer la producción de los centros de costo de
+    apoyo y los costos directos de todos los centros de costo.
+    """
+    produccion = pd.read_csv(Path(carpeta_input) / NOMBRE_PRODUCCION_APOYO)
+    costos = pd.read_csv(Path(carpeta_input) / NOMBRE_COSTOS_DIRECTOS)
+
+    return produccion, costos
+
 
 @click.command()
 @click.argument('input_filepath', type=click.Path(exists=True))
 @click.argument('output_filepath', type=click.Path())
 def main(input_filepath, output_filepath):
-    """ Runs data processing scripts to turn raw data from (../raw) into
-        cleaned data ready to be analyzed (saved in ../processed).
+    """ Distribuye los costos de los centros de costo de apoyo (data/raw)
+        a los centros de costo finales, y guarda el resultado en
+        data/processed.
     """
     logger = logging.getLogger(__name__)
-    logger.info('making final data set from raw data')
+    logger.info('distribuyendo los costos de los centros de costo de apoyo')
+
+    produccion, costos = leer_entradas(input_filepath)
+    resultados = distribuir_costos_apoyo(produccion, costos)
+
+    Path(output_filepath).mkdir(parents=True, exist_ok=True)
+    for nombre, df in resultados.items():
+        df.to_csv(Path(output_filepath) / f"{nombre}.csv")
+        logger.info(f'{nombre}: {len(df)} filas')
 
 
 if __name__ == '__main__':
@@ -0,0 +1,112 @@
+"""
+Este archivo permite construir la matriz de servicios entre centros de costo
+a partir de la producción de los centros de costo de apoyo (Ej: "670-
+ADMINISTRACIÓN", "95301-CENTRAL DE ESTERILIZACIÓN" o "652-SERVICIO DE
+ALIMENTACIÓN").
+
+La producción viene en formato largo, con las columnas de
+COLUMNAS_PRODUCCION: cuánto produjo cada centro de costo de apoyo para cada
+centro de costo de destino (de apoyo o final), en cada mes.
+"""
+
+import numpy as np
+import pandas as pd
+from scipy import sparse
+
+COLUMNAS_PRODUCCION = ["Mes", "CC Apoyo", "CC Destino", "Produccion"]
+
+
+def obtener_indice_centros_de_costo(produccion, costos):
+    """
+    Esta función permite obtener la lista ordenada de meses y de centros de
+    costo que aparecen en la producción o en los costos. Cada par (mes,
+    centro de costo) es una fila del sistema de distribución.
+    """
+    meses = pd.Index(
+        pd.concat([produccion["Mes"], costos["Mes"]]).unique(), name="Mes"
+    )
+    centros_de_costo = pd.Index(
+        sorted(
+            set(produccion["CC Apoyo"])
+            | set(produccion["CC Destino"])
+            | set(costos["Centro de Costo"])
+        ),
+        name="Centro de Costo",
+    )
+
+    return meses, centros_de_costo
+
+
+def calcular_porcentajes_servicio(produccion):
+    """
+    Esta función permite obtener el porcentaje de la producción de cada
+    centro de costo de apoyo que recibe cada destino, en cada mes. La
+    producción de un centro de costo para sí mismo NO se considera, ya que
+    NO cambia la distribución.
+    """
+    produccion = produccion[COLUMNAS_PRODUCCION]
+    produccion = produccion[
+        (produccion["CC Apoyo"] != produccion["CC Destino"])
+        & (produccion["Produccion"] > 0)
+    ]
+    produccion = produccion.groupby(
+        ["Mes", "CC Apoyo", "CC Destino"], as_index=False, sort=False
+    )["Produccion"].sum()
+
+    total_apoyo = produccion.groupby(["Mes", "CC Apoyo"])[
+        "Produccion"
+    ].transform("sum")
+
+    return produccion.assign(Porcentaje=produccion["Produccion"] / total_apoyo)
+
+
+def construir_matriz_servicios(porcentajes, meses, centros_de_costo):
+    """
+    Esta función permite construir la matriz de servicios de todos los meses
+    a la vez. Es una matriz dispersa diagonal por bloques (un bloque por
+    mes), donde la celda (destino, apoyo) es el porcentaje de la producción
+    del centro de costo de apoyo que recibe el destino.
+    """
+    cantidad_cc = len(centros_de_costo)
+    desplazamiento = meses.get_indexer(porcentajes["Mes"]) * cantidad_cc
+
+    filas = desplazamiento + centros_de_costo.get_indexer(
+        porcentajes["CC Destino"]
+    )
+    columnas = desplazamiento + centros_de_costo.get_indexer(
+        porcentajes["CC Apoyo"]
+    )
+    tamano = len(meses) * cantidad_cc
+
+    return sparse.csr_matrix(
+        (porcentajes["Porcentaje"].to_numpy(dtype=float), (filas, columnas)),
+        shape=(tamano, tamano),
+    )
+
+
+def construir_costos_directos(costos, meses, centros_de_costo):
+    """
+    Esta función permite ordenar los costos directos (una fila por mes y
+    centro de costo, una columna por ítem de costo) en el mismo orden de las
+    filas de la matriz de servicios. Los pares sin costo quedan en 0.
+    """
+    indice = pd.MultiIndex.from_product([meses, centros_de_costo])
+    costos = costos.groupby(["Mes", "Centro de Costo"], sort=False).sum()
+
+    return costos.reindex(indice, fill_value=0.0).astype(float)
+
+
+def obtener_cc_de_apoyo(porcentajes, meses, centros_de_costo):
+    """
+    Esta función permite obtener una máscara (mes, centro de costo) con los
+    centros de costo de apoyo que distribuyen su costo en cada mes.
+    """
+    cantidad_cc = len(centros_de_costo)
+    posiciones = meses.get_indexer(
+        porcentajes["Mes"]
+    ) * cantidad_cc + centros_de_costo.get_indexer(porcentajes["CC Apoyo"])
+
+    es_apoyo = np.zeros(len(meses) * cantidad_cc, dtype=bool)
+    es_apoyo[posiciones] = True
+
+    return es_apoyo
@@ -0,0 +1,246 @@
+"""
+Este archivo permite distribuir los costos de los centros de costo de apoyo
+con el método recíproco: los centros de costo de apoyo se prestan servicios
+entre ellos (Ej: Administración a Esterilización, y Esterilización a
+Administración), por lo que el costo total de cada uno depende del resto.
+
+En vez de distribuir escalonadamente (un centro de costo de apoyo a la vez),
+se resuelve un solo sistema lineal disperso para todos los centros de costo
+de apoyo, todos los meses y todos los ítems de costo a la vez:
+
+    costo_total = costo_directo + matriz_servicios @ costo_total
+
+Luego, el costo de cada centro de costo final es su costo total.
+
+Antes de resolver, se buscan los grupos de centros de costo de apoyo cuyo
+costo NO llega a ningún centro de costo final (Ej: dos centros de costo de
+apoyo que solamente se prestan servicios entre ellos). Esos grupos se
+informan y quedan fuera del sistema, con su costo directo y lo que reciben
+de los otros centros de costo de apoyo, y el resto se resuelve igual.
+"""
+
+import warnings
+
+import numpy as np
+import pandas as pd
+from scipy import sparse
+from scipy.sparse import csgraph
+from scipy.sparse.linalg import MatrixRankWarning, spsolve
+
+from src.features.build_features import (
+    calcular_porcentajes_servicio,
+    construir_costos_directos,
+    construir_matriz_servicios,
+    obtener_cc_de_apoyo,
+    obtener_indice_centros_de_costo,
+)
+
+
+def obtener_apoyos_sin_salida(matriz_servicios, es_apoyo):
+    """
+    Esta función permite obtener una máscara (mes, centro de costo) con los
+    centros de costo de apoyo cuyo costo NO llega a ningún centro de costo
+    final, ni directamente ni a través de otros centros de costo de apoyo.
+
+    Se recorre el grafo de servicios al revés (de cada destino a los apoyos
+    que le prestan servicios), partiendo desde todos los centros de costo
+    que NO distribuyen a la vez (un nodo extra conectado a todos ellos).
+    """
+    tamano = matriz_servicios.shape[0]
+    servicios = sparse.coo_matrix(matriz_servicios)
+    finales = np.flatnonzero(~es_apoyo)
+
+    grafo = sparse.csr_matrix(
+        (
+            np.ones(servicios.nnz + len(finales)),
+            (
+                np.concatenate([servicios.row, np.full(len(finales), tamano)]),
+                np.concatenate([servicios.col, finales]),
+            ),
+        ),
+        shape=(tamano + 1, tamano + 1),
+    )
+    alcanzados = csgraph.breadth_first_order(
+        grafo, tamano, directed=True, return_predecessors=False
+    )
+
+    llega_a_final = np.zeros(tamano + 1, dtype=bool)
+    llega_a_final[alcanzados] = True
+
+    return es_apoyo & ~llega_a_final[:tamano]
+
+
+def agrupar_apoyos_sin_salida(matriz_servicios, sin_salida):
+    """
+    Esta función permite numerar los grupos de centros de costo de apoyo sin
+    salida que se prestan servicios entre ellos (componentes conexas del
+    grafo de servicios). Retorna el número de grupo de cada apoyo sin
+    salida, en el orden de sus filas.
+    """
+    posiciones = np.flatnonzero(sin_salida)
+    _, grupos = csgraph.connected_components(
+        matriz_servicios[posiciones][:, posiciones], directed=False
+    )
+
+    return grupos + 1
+
+
+def resolver_distribucion_reciproca(matriz_servicios, costos_directos):
+    """
+    Esta función permite resolver el sistema (I - matriz_servicios) @
+    costo_total = costo_directos, para todas las columnas de costo a la vez.
+    El costo de todos los centros de costo de apoyo del sistema debe llegar
+    a algún centro de costo final (ver obtener_apoyos_sin_salida).
+
+    Retorna un arreglo con el costo total de cada fila y columna.
+    """
+    identidad = sparse.identity(matriz_servicios.shape[0], format="csc")
+    sistema = sparse.csc_matrix(identidad - matriz_servicios)
+
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", MatrixRankWarning)
+        costos_totales = spsolve(sistema, costos_directos)
+
+    return np.asarray(costos_totales).reshape(costos_directos.shape)
+
+
+def distribuir_costos_apoyo(produccion, costos):
+    """
+    Esta función permite distribuir los costos de los centros de costo de
+    apoyo a los centros de costo finales.
+
+    Recibe la producción de los centros de costo de apoyo (ver
+    COLUMNAS_PRODUCCION en build_features.py) y los costos directos (las
+    columnas "Mes" y "Centro de Costo", y una columna por ítem de costo).
+
+    Retorna un diccionario con:
+    - "costos_finales": el costo de cada centro de costo que NO distribuye
+    (mes, centro de costo), después de la distribución.
+    - "costos_totales_apoyo": el costo total recíproco de cada centro de
+    costo de apoyo (su costo directo más lo que recibe de otros apoyos).
+    - "apoyos_sin_salida": el grupo y el costo que queda en los centros de
+    costo de apoyo cuyo costo NO llega a ningún centro de costo final: su
+    costo directo más lo que reciben de los apoyos que sí se distribuyen.
+    Su costo NO se distribuye, y NO están en los otros resultados.
+
+    El costo de los centros de costo finales más el que queda en los apoyos
+    sin salida es igual al costo directo total (ver
+    verificar_conservacion_costos).
+    """
+    meses, centros_de_costo = obtener_indice_centros_de_costo(
+        produccion, costos
+    )
+    porcentajes = calcular_porcentajes_servicio(produccion)
+
+    matriz_servicios = construir_matriz_servicios(
+        porcentajes, meses, centros_de_costo
+    )
+    costos_directos = construir_costos_directos(
+        costos, meses, centros_de_costo
+    )
+    es_apoyo = obtener_cc_de_apoyo(porcentajes, meses, centros_de_costo)
+
+    sin_salida = obtener_apoyos_sin_salida(matriz_servicios, es_apoyo)
+    resolubles = np.flatnonzero(~sin_salida)
+    costos_totales = pd.DataFrame(
+        resolver_distribucion_reciproca(
+            matriz_servicios[resolubles][:, resolubles],
+            costos_directos.to_numpy()[resolubles],
+        ),
+        index=costos_directos.index[resolubles],
+        columns=costos_directos.columns,
+    )
+
+    # Lo que los apoyos que se distribuyen le prestan a los apoyos sin salida
+    # también queda sin distribuir.
+    costos_recibidos = matriz_servicios[np.flatnonzero(sin_salida)][
+        :, resolubles
+    ] @ costos_totales.to_numpy()
+    apoyos_sin_salida = costos_directos[sin_salida] + costos_recibidos
+    apoyos_sin_salida.insert(
+        0, "Grupo", agrupar_apoyos_sin_salida(matriz_servicios, sin_salida)
+    )
+    informar_apoyos_sin_salida(apoyos_sin_salida)
+
+    es_apoyo = es_apoyo[resolubles]
+    informar_apoyos_sin_produccion(costos_totales, es_apoyo, porcentajes)
+
+    costos_finales = costos_totales[~es_apoyo]
+    verificar_conservacion_costos(
+        costos_directos, costos_finales, apoyos_sin_salida
+    )
+
+    return {
+        "costos_finales": costos_finales,
+        "costos_totales_apoyo": costos_totales[es_apoyo],
+        "apoyos_sin_salida": apoyos_sin_salida,
+    }
+
+
+def verificar_conservacion_costos(
+    costos_directos, costos_finales, apoyos_sin_salida
+):
+    """
+    Esta función permite verificar que la distribución NO pierda ni cree
+    costo: en cada mes e ítem, el costo de los centros de costo finales más
+    el que queda en los apoyos sin salida debe ser igual al costo directo
+    total. Si NO se cumple, entonces levanta un ValueError con los meses
+    que NO cuadran.
+    """
+    costo_directo = costos_directos.groupby(level="Mes").sum()
+    costo_repartido = (
+        pd.concat(
+            [costos_finales, apoyos_sin_salida[costos_directos.columns]]
+        )
+        .groupby(level="Mes")
+        .sum()
+        .reindex(costo_directo.index, fill_value=0.0)
+    )
+
+    cuadra = np.isclose(costo_repartido, costo_directo).all(axis=1)
+    if not cuadra.all():
+        raise ValueError(
+            "La distribución NO conserva el costo directo total en los "
+            f"meses: {', '.join(map(str, costo_directo.index[~cuadra]))}"
+        )
+
+
+def informar_apoyos_sin_salida(apoyos_sin_salida):
+    """
+    Esta función permite mostrar los grupos de centros de costo de apoyo
+    cuyo costo NO llega a ningún centro de costo final (Ej: dos centros de
+    costo de apoyo que solamente se prestan servicios entre ellos).
+    """
+    if apoyos_sin_salida.empty:
+        return
+
+    print(
+        "\n- Centros de costo de apoyo cuyo costo NO llega a ningún centro "
+        "de costo final (su costo NO se distribuye) - \n"
+    )
+    print(apoyos_sin_salida.reset_index())
+
+
+def informar_apoyos_sin_produccion(costos_totales, es_apoyo, porcentajes):
+    """
+    Esta función permite mostrar los centros de costo de apoyo que tienen
+    costo en un mes sin producción. Su costo NO se puede distribuir, por lo
+    que queda en el mismo centro de costo.
+    """
+    centros_de_apoyo = set(porcentajes["CC Apoyo"])
+    con_costo = (costos_totales != 0).any(axis=1).to_numpy()
+    mask_sin_produccion = (
+        costos_totales.index.get_level_values("Centro de Costo").isin(
+            centros_de_apoyo
+        )
+        & ~es_apoyo
+        & con_costo
+    )
+    if not mask_sin_produccion.any():
+        return
+
+    print(
+        "\n- Centros de costo de apoyo con costo y sin producción (su costo "
+        "NO se distribuye) - \n"
+    )
+    print(costos_totales.index[mask_sin_produccion].to_frame(index=False))
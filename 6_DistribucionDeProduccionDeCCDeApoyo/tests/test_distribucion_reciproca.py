@@ -0,0 +1,113 @@
+import pandas as pd
+import pytest
+
+from src.models.distribucion_reciproca import (
+    distribuir_costos_apoyo,
+    verificar_conservacion_costos,
+)
+
+
+def construir_produccion(filas):
+    return pd.DataFrame(
+        filas, columns=["Mes", "CC Apoyo", "CC Destino", "Produccion"]
+    )
+
+
+def construir_costos(filas):
+    return pd.DataFrame(filas, columns=["Mes", "Centro de Costo", "Item"])
+
+
+def test_distribucion_reciproca_igual_a_la_solucion_cerrada():
+    # A -> B, F; B -> C, G; C -> A, F (mitad y mitad). Con A = 100:
+    # A = 100 + C / 2, B = A / 2, C = B / 2, por lo que A = 800 / 7.
+    produccion = construir_produccion(
+        [
+            [1, "A", "B", 10],
+            [1, "A", "F", 10],
+            [1, "B", "C", 10],
+            [1, "B", "G", 10],
+            [1, "C", "A", 10],
+            [1, "C", "F", 10],
+        ]
+    )
+    costos = construir_costos(
+        [[1, "A", 100.0], [1, "B", 0.0], [1, "C", 0.0]]
+    )
+
+    resultado = distribuir_costos_apoyo(produccion, costos)
+
+    costos_apoyo = resultado["costos_totales_apoyo"]["Item"].xs(1)
+    costos_finales = resultado["costos_finales"]["Item"].xs(1)
+    assert costos_apoyo.to_dict() == pytest.approx(
+        {"A": 800 / 7, "B": 400 / 7, "C": 200 / 7}
+    )
+    assert costos_finales.to_dict() == pytest.approx(
+        {"F": 500 / 7, "G": 200 / 7}
+    )
+    assert costos_finales.sum() == pytest.approx(100)
+    assert resultado["apoyos_sin_salida"].empty
+
+
+def test_distribucion_reciproca_separa_apoyos_sin_salida():
+    # A y B solo se prestan servicios entre ellos; C distribuye a F.
+    produccion = construir_produccion(
+        [
+            [1, "A", "B", 5],
+            [1, "B", "A", 5],
+            [1, "C", "F", 5],
+        ]
+    )
+    costos = construir_costos(
+        [[1, "A", 30.0], [1, "B", 20.0], [1, "C", 40.0]]
+    )
+
+    resultado = distribuir_costos_apoyo(produccion, costos)
+
+    apoyos_sin_salida = resultado["apoyos_sin_salida"]
+    assert list(apoyos_sin_salida.index) == [(1, "A"), (1, "B")]
+    assert apoyos_sin_salida["Grupo"].nunique() == 1
+    assert apoyos_sin_salida["Item"].to_list() == [30.0, 20.0]
+
+    costos_finales = resultado["costos_finales"]["Item"].xs(1)
+    assert costos_finales.to_dict() == pytest.approx({"F": 40.0})
+    assert list(resultado["costos_totales_apoyo"].index) == [(1, "C")]
+
+
+def test_distribucion_reciproca_informa_costo_recibido_sin_salida():
+    # A distribuye a F y a B, pero B y C solo se prestan servicios entre
+    # ellos: la mitad del costo de A queda en B y C.
+    produccion = construir_produccion(
+        [
+            [1, "A", "F", 5],
+            [1, "A", "B", 5],
+            [1, "B", "C", 5],
+            [1, "C", "B", 5],
+        ]
+    )
+    costos = construir_costos(
+        [[1, "A", 100.0], [1, "B", 0.0], [1, "C", 7.0]]
+    )
+
+    resultado = distribuir_costos_apoyo(produccion, costos)
+
+    costos_finales = resultado["costos_finales"]["Item"].xs(1)
+    apoyos_sin_salida = resultado["apoyos_sin_salida"]["Item"].xs(1)
+    assert costos_finales.to_dict() == pytest.approx({"F": 50.0})
+    assert apoyos_sin_salida.to_dict() == pytest.approx({"B": 50.0, "C": 7.0})
+    assert costos_finales.sum() + apoyos_sin_salida.sum() == pytest.approx(
+        costos["Item"].sum()
+    )
+
+
+def test_verificar_conservacion_costos_detecta_costo_perdido():
+    indice = pd.MultiIndex.from_tuples(
+        [(1, "A"), (1, "F"), (2, "F")], names=["Mes", "Centro de Costo"]
+    )
+    costos_directos = pd.DataFrame({"Item": [100.0, 0.0, 10.0]}, index=indice)
+    costos_finales = pd.DataFrame({"Item": [50.0, 10.0]}, index=indice[1:])
+    apoyos_sin_salida = costos_directos.iloc[:0].assign(Grupo=[])
+
+    with pytest.raises(ValueError, match="meses: 1$"):
+        verificar_conservacion_costos(
+            costos_directos, costos_finales, apoyos_sin_salida
+        )